@@ -20,25 +20,101 @@ function getAlias(filename) {
     return alias;
 }
 
-let aliasMap = {}; // alias -> filename
-let imagesList = []; // Liste ordonnée des images
+let aliasMap = {}; // alias -> entrée (avec son index global)
 let currentImageIndex = -1; // Index de l'image actuellement affichée
 
-// Load gallery images from manifest or fallback
+// Largeur affichée d'une tuile (cf. .gallery-item dans styles.css) pour choisir la variante
+const GRID_SIZES = "(max-width: 480px) 100vw, (max-width: 768px) 50vw, min(33vw, 600px)"
+
+// Index du manifest v3: { total, page_size, pages } ; les entrées sont dans gallery/pages/<n>.json
+let manifestIndex = { total: 0, page_size: 1, pages: 0 }
+const pageRequests = {} // page -> Promise<entrées>
+const aliasRequests = {} // premier caractère -> Promise<{ alias: page }>
+
+let gridContainer = null
+let msnry = null
+let sentinel = null
+let observer = null
+let nextPage = 0 // Prochaine page à ajouter à la grille
+let appending = false
+let failedLoads = 0 // Échecs consécutifs du chargement d'une page (backoff)
+const RETRY_MAX_DELAY = 30000
+
+// Entrée du manifest: "nom.webp" (ancien format) ou
+// { file, width, height, bytes, color, placeholder, variants: { largeur: chemin } }
+function normalizeEntry(entry, index) {
+  if (typeof entry === "string") return { file: entry, variants: {}, index }
+  return { ...entry, variants: entry.variants || {}, index }
+}
+
+// Normalise les entrées d'une page et les enregistre dans la table des alias
+function registerPage(page, images) {
+  const offset = page * manifestIndex.page_size
+  const entries = images.map((entry, i) => normalizeEntry(entry, offset + i))
+  entries.forEach(entry => {
+    aliasMap[getAlias(entry.file)] = entry
+  })
+  return entries
+}
+
+// Charge une page du manifest (une seule requête par page, même en appels concurrents)
+function fetchPage(page) {
+  if (!pageRequests[page]) {
+    pageRequests[page] = fetch(`gallery/pages/${page}.json`)
+      .then(response => {
+        if (!response.ok) throw new Error(`page ${page} not found`)
+        return response.json()
+      })
+      .then(data => registerPage(page, data.images))
+      .catch(error => {
+        delete pageRequests[page]
+        throw error
+      })
+  }
+  return pageRequests[page]
+}
+
+// Entrée à un index global, en chargeant sa page si besoin
+async function entryAt(index) {
+  const entries = await fetchPage(Math.floor(index / manifestIndex.page_size))
+  return entries[index % manifestIndex.page_size]
+}
+
+// Retrouve l'entrée d'un alias: déjà chargée, sinon via la table alias -> page
+// (gallery/pages/alias-<c>.json) puis la seule page qui la contient
+async function resolveAlias(alias) {
+  if (aliasMap[alias]) return aliasMap[alias]
+  const key = alias.charAt(0)
+  if (!/^[a-z0-9]$/.test(key)) return null
+  if (!aliasRequests[key]) {
+    aliasRequests[key] = fetch(`gallery/pages/alias-${key}.json`)
+      .then(response => (response.ok ? response.json() : {}))
+      .catch(() => ({}))
+  }
+  const page = (await aliasRequests[key])[alias]
+  if (page === undefined) return null
+  await fetchPage(page)
+  return aliasMap[alias] || null
+}
+
+// Load gallery index from manifest or fallback
 async function loadGallery() {
   try {
     const response = await fetch("gallery/manifest.json")
     if (!response.ok) {
       throw new Error("manifest.json not found")
     }
-    const manifest = await response.json()
-    
-    // Build alias map
-    manifest.forEach(file => {
-        aliasMap[getAlias(file)] = file;
-    });
+    const data = await response.json()
+    if (data.pages !== undefined) {
+      manifestIndex = data
+    } else {
+      // Manifest v2 ({ version, images }) ou liste de noms: une seule page déjà chargée
+      const images = Array.isArray(data) ? data : data.images
+      manifestIndex = { total: images.length, page_size: Math.max(images.length, 1), pages: 1 }
+      pageRequests[0] = Promise.resolve(registerPage(0, images))
+    }
 
-    displayGallery(manifest)
+    displayGallery()
   } catch (error) {
     console.error("Error loading manifest:", error)
     gallery.innerHTML =
@@ -46,15 +122,14 @@ async function loadGallery() {
   }
 }
 
-// Open modal for a specific image
-function openImage(filename) {
-  if (!filename) return
-  const alias = getAlias(filename);
+// Open modal for a specific entry
+function openImage(entry) {
+  if (!entry) return
+  const alias = getAlias(entry.file);
   
-  // Trouver l'index de l'image dans la liste
-  currentImageIndex = imagesList.indexOf(filename);
+  currentImageIndex = entry.index;
   
-  modalImage.src = `gallery/${filename}`
+  modalImage.src = `gallery/${entry.file}`
   modalImage.alt = "Image Galerie"
   modal.style.display = "block"
   document.body.style.overflow = "hidden"
@@ -70,83 +145,172 @@ function openImage(filename) {
 function closeModal() {
   modal.style.display = "none"
   document.body.style.overflow = "auto"
+  currentImageIndex = -1
   if (window.location.hash) {
       history.pushState("", document.title, window.location.pathname + window.location.search);
   }
 }
 
-// Check URL hash and open image if needed
-function checkHash() {
+// Check URL hash and open image if needed (ne charge que la page de l'image visée)
+async function checkHash() {
   const hash = window.location.hash.substring(1)
-  if (hash && aliasMap[hash]) {
-    openImage(aliasMap[hash])
+  if (!hash) {
+    closeModal()
+    return
+  }
+  let entry = null
+  try {
+    entry = await resolveAlias(hash)
+  } catch (error) {
+    console.error("Error loading gallery page:", error)
+  }
+  // Le hash a pu changer pendant le chargement de la page
+  if (window.location.hash.substring(1) !== hash) return
+  if (entry) {
+    openImage(entry)
   } else {
     closeModal()
   }
 }
 
-// Display gallery grid with images
-function displayGallery(images) {
-  gallery.innerHTML = ""
-  imagesList = images; // Stocker la liste pour la navigation
+// Build one grid tile
+function createItem({ file: image, variants, width, height, color, placeholder, index }) {
+  const item = document.createElement("div")
+  item.className = "gallery-item"
+
+  // La grille ne charge que les variantes réduites, la pleine taille reste pour la modale
+  const img = document.createElement("img")
+  const widths = Object.keys(variants).map(Number).sort((a, b) => a - b)
+  if (widths.length > 0) {
+    img.srcset = widths.map(w => `gallery/${variants[w]} ${w}w`).join(", ")
+    img.sizes = GRID_SIZES
+    img.src = `gallery/${variants[widths[0]]}`
+  } else {
+    img.src = `gallery/${image}`
+  }
+  img.alt = `Galerie ${index + 1}`
+  img.loading = "lazy"
 
-  if (!images || images.length === 0) {
-    gallery.innerHTML =
-      '<p class="no-images">Aucune image dans la galerie pour le moment.</p>'
-    return
+  // Dimensions connues: la tuile a sa taille finale avant le chargement (pas de reflow)
+  if (width && height) {
+    img.width = width
+    img.height = height
+  }
+  // Placeholder flou (ou couleur dominante) affiché jusqu'au chargement de l'image
+  if (placeholder || color) {
+    img.style.background = placeholder
+      ? `${color || ""} url("${placeholder}") center / cover no-repeat`
+      : color
+    img.addEventListener("load", () => { img.style.background = "" }, { once: true })
   }
 
-  const gridContainer = document.createElement("div")
-  gridContainer.className = "gallery-grid gallery-fade-in"
+  const overlay = document.createElement("div")
+  overlay.className = "gallery-overlay"
 
-  images.forEach((image, index) => {
-    const item = document.createElement("div")
-    item.className = "gallery-item"
+  const btn = document.createElement("button")
+  btn.className = "gallery-btn"
+  btn.textContent = "Voir"
 
-    const img = document.createElement("img")
-    img.src = `gallery/${image}`
-    img.alt = `Galerie ${index + 1}`
-    img.loading = "lazy"
+  overlay.appendChild(btn)
+  item.appendChild(img)
+  item.appendChild(overlay)
+
+  // Open via hash change using alias
+  img.addEventListener("click", () => {
+    window.location.hash = getAlias(image)
+  })
 
-    const overlay = document.createElement("div")
-    overlay.className = "gallery-overlay"
+  btn.addEventListener("click", (e) => {
+    e.stopPropagation()
+    window.location.hash = getAlias(image)
+  })
 
-    const btn = document.createElement("button")
-    btn.className = "gallery-btn"
-    btn.textContent = "Voir"
+  return item
+}
 
-    overlay.appendChild(btn)
-    item.appendChild(img)
-    item.appendChild(overlay)
+// Append the next manifest page to the grid (infinite scroll)
+async function appendNextPage() {
+  if (appending || nextPage >= manifestIndex.pages) return
+  appending = true
+  try {
+    const entries = await fetchPage(nextPage)
+    const items = entries.map(createItem)
+    items.forEach(item => gridContainer.appendChild(item))
+
+    if (!msnry) {
+      // Initialize Masonry with horizontal order (left to right reading)
+      msnry = new Masonry(gridContainer, {
+        itemSelector: '.gallery-item',
+        columnWidth: '.gallery-item',
+        gutter: 20,
+        percentPosition: true,
+        horizontalOrder: true  // Read left to right (row order)
+      });
+    } else {
+      msnry.appended(items)
+    }
 
-    // Open via hash change using alias
-    img.addEventListener("click", () => {
-      window.location.hash = getAlias(image)
-    })
+    // Re-layout once when all images of the page are loaded (instead of per-image)
+    imagesLoaded(items).on('always', function() {
+      msnry.layout();
+    });
+    nextPage++
+    failedLoads = 0
+  } catch (error) {
+    console.error("Error loading gallery page:", error)
+    failedLoads++
+  } finally {
+    appending = false
+  }
 
-    btn.addEventListener("click", (e) => {
-      e.stopPropagation()
-      window.location.hash = getAlias(image)
-    })
+  if (failedLoads) {
+    // Page en erreur (404, hors ligne): nouvel essai plus tard, pas en boucle
+    setTimeout(rearmScroll, Math.min(1000 * 2 ** (failedLoads - 1), RETRY_MAX_DELAY))
+  } else if (nextPage >= manifestIndex.pages) {
+    if (observer) observer.disconnect()
+    if (sentinel) sentinel.remove()
+  } else {
+    rearmScroll()
+  }
+}
 
-    gridContainer.appendChild(item)
-  })
+// Relance le chargement de la page suivante si la sentinelle est (encore) proche
+function rearmScroll() {
+  if (nextPage >= manifestIndex.pages) return
+  if (observer) {
+    // Ré-observer relance le callback si la sentinelle est encore visible
+    observer.unobserve(sentinel)
+    observer.observe(sentinel)
+  } else {
+    appendNextPage()
+  }
+}
+
+// Display gallery grid: first page now, the next ones when the sentinel nears the viewport
+function displayGallery() {
+  gallery.innerHTML = ""
 
+  if (manifestIndex.total === 0) {
+    gallery.innerHTML =
+      '<p class="no-images">Aucune image dans la galerie pour le moment.</p>'
+    return
+  }
+
+  gridContainer = document.createElement("div")
+  gridContainer.className = "gallery-grid gallery-fade-in"
   gallery.appendChild(gridContainer)
-  
-  // Initialize Masonry with horizontal order (left to right reading)
-  const msnry = new Masonry(gridContainer, {
-    itemSelector: '.gallery-item',
-    columnWidth: '.gallery-item',
-    gutter: 20,
-    percentPosition: true,
-    horizontalOrder: true  // Read left to right (row order)
-  });
-  
-  // Re-layout once when ALL images are loaded (instead of per-image)
-  imagesLoaded(gridContainer).on('always', function() {
-    msnry.layout();
-  });
+
+  sentinel = document.createElement("div")
+  sentinel.className = "gallery-sentinel"
+  sentinel.style.height = "1px"
+  gallery.appendChild(sentinel)
+
+  if ("IntersectionObserver" in window) {
+    observer = new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) appendNextPage()
+    }, { rootMargin: "800px 0px" })
+  }
+  appendNextPage()
   
   // Initial check on load
   checkHash()
@@ -155,17 +319,24 @@ function displayGallery(images) {
   window.addEventListener('hashchange', checkHash)
 }
 
-// Navigation functions
+// Navigation functions (la page voisine est chargée si elle ne l'est pas encore)
+async function navigateTo(index) {
+  try {
+    const entry = await entryAt(index)
+    if (entry) window.location.hash = getAlias(entry.file)
+  } catch (error) {
+    console.error("Error loading gallery page:", error)
+  }
+}
+
 function navigatePrev() {
-  if (imagesList.length === 0 || currentImageIndex === -1) return;
-  const newIndex = (currentImageIndex - 1 + imagesList.length) % imagesList.length;
-  window.location.hash = getAlias(imagesList[newIndex]);
+  if (manifestIndex.total === 0 || currentImageIndex === -1) return;
+  navigateTo((currentImageIndex - 1 + manifestIndex.total) % manifestIndex.total);
 }
 
 function navigateNext() {
-  if (imagesList.length === 0 || currentImageIndex === -1) return;
-  const newIndex = (currentImageIndex + 1) % imagesList.length;
-  window.location.hash = getAlias(imagesList[newIndex]);
+  if (manifestIndex.total === 0 || currentImageIndex === -1) return;
+  navigateTo((currentImageIndex + 1) % manifestIndex.total);
 }
 
 // Close modal events
@@ -0,0 +1,132 @@
+const gallery=document.getElementById("gallery")
+const modal=document.getElementById("modal")
+const modalImage=document.getElementById("modalImage")
+const closeBtn=document.querySelector(".close")
+function getAlias(filename){let hash=0;for(let i=0;i<filename.length;i++){hash=((hash<<5)-hash)+filename.charCodeAt(i);hash|=0;}
+let seed=Math.abs(hash);const chars="abcdefghijklmnopqrstuvwxyz0123456789";let alias="";for(let i=0;i<8;i++){seed=(seed*1664525+1013904223)%4294967296;alias+=chars[seed%chars.length];}
+return alias;}
+let aliasMap={};let currentImageIndex=-1;const GRID_SIZES="(max-width: 480px) 100vw, (max-width: 768px) 50vw, min(33vw, 600px)"
+let manifestIndex={total:0,page_size:1,pages:0}
+const pageRequests={}
+const aliasRequests={}
+let gridContainer=null
+let msnry=null
+let sentinel=null
+let observer=null
+let nextPage=0
+let appending=false
+let failedLoads=0
+const RETRY_MAX_DELAY=30000
+function normalizeEntry(entry,index){if(typeof entry==="string")return{file:entry,variants:{},index}
+return{...entry,variants:entry.variants||{},index}}
+function registerPage(page,images){const offset=page*manifestIndex.page_size
+const entries=images.map((entry,i)=>normalizeEntry(entry,offset+i))
+entries.forEach(entry=>{aliasMap[getAlias(entry.file)]=entry})
+return entries}
+function fetchPage(page){if(!pageRequests[page]){pageRequests[page]=fetch(`gallery/pages/${page}.json`).then(response=>{if(!response.ok)throw new Error(`page ${page} not found`)
+return response.json()}).then(data=>registerPage(page,data.images)).catch(error=>{delete pageRequests[page]
+throw error})}
+return pageRequests[page]}
+async function entryAt(index){const entries=await fetchPage(Math.floor(index/manifestIndex.page_size))
+return entries[index%manifestIndex.page_size]}
+async function resolveAlias(alias){if(aliasMap[alias])return aliasMap[alias]
+const key=alias.charAt(0)
+if(!/^[a-z0-9]$/.test(key))return null
+if(!aliasRequests[key]){aliasRequests[key]=fetch(`gallery/pages/alias-${key}.json`).then(response=>(response.ok?response.json():{})).catch(()=>({}))}
+const page=(await aliasRequests[key])[alias]
+if(page===undefined)return null
+await fetchPage(page)
+return aliasMap[alias]||null}
+async function loadGallery(){try{const response=await fetch("gallery/manifest.json")
+if(!response.ok){throw new Error("manifest.json not found")}
+const data=await response.json()
+if(data.pages!==undefined){manifestIndex=data}else{const images=Array.isArray(data)?data:data.images
+manifestIndex={total:images.length,page_size:Math.max(images.length,1),pages:1}
+pageRequests[0]=Promise.resolve(registerPage(0,images))}
+displayGallery()}catch(error){console.error("Error loading manifest:",error)
+gallery.innerHTML='<p class="no-images">Pour ajouter des images, créez un fichier gallery/manifest.json avec la liste des noms de fichiers.</p>'}}
+function openImage(entry){if(!entry)return
+const alias=getAlias(entry.file);currentImageIndex=entry.index;modalImage.src=`gallery/${entry.file}`
+modalImage.alt="Image Galerie"
+modal.style.display="block"
+document.body.style.overflow="hidden"
+const currentHash=window.location.hash.substring(1)
+if(currentHash!==alias){window.location.hash=alias}}
+function closeModal(){modal.style.display="none"
+document.body.style.overflow="auto"
+currentImageIndex=-1
+if(window.location.hash){history.pushState("",document.title,window.location.pathname+window.location.search);}}
+async function checkHash(){const hash=window.location.hash.substring(1)
+if(!hash){closeModal()
+return}
+let entry=null
+try{entry=await resolveAlias(hash)}catch(error){console.error("Error loading gallery page:",error)}
+if(window.location.hash.substring(1)!==hash)return
+if(entry){openImage(entry)}else{closeModal()}}
+function createItem({file:image,variants,width,height,color,placeholder,index}){const item=document.createElement("div")
+item.className="gallery-item"
+const img=document.createElement("img")
+const widths=Object.keys(variants).map(Number).sort((a,b)=>a-b)
+if(widths.length>0){img.srcset=widths.map(w=>`gallery/${variants[w]} ${w}w`).join(", ")
+img.sizes=GRID_SIZES
+img.src=`gallery/${variants[widths[0]]}`}else{img.src=`gallery/${image}`}
+img.alt=`Galerie ${index + 1}`
+img.loading="lazy"
+if(width&&height){img.width=width
+img.height=height}
+if(placeholder||color){img.style.background=placeholder?`${color || ""} url("${placeholder}") center / cover no-repeat`:color
+img.addEventListener("load",()=>{img.style.background=""},{once:true})}
+const overlay=document.createElement("div")
+overlay.className="gallery-overlay"
+const btn=document.createElement("button")
+btn.className="gallery-btn"
+btn.textContent="Voir"
+overlay.appendChild(btn)
+item.appendChild(img)
+item.appendChild(overlay)
+img.addEventListener("click",()=>{window.location.hash=getAlias(image)})
+btn.addEventListener("click",(e)=>{e.stopPropagation()
+window.location.hash=getAlias(image)})
+return item}
+async function appendNextPage(){if(appending||nextPage>=manifestIndex.pages)return
+appending=true
+try{const entries=await fetchPage(nextPage)
+const items=entries.map(createItem)
+items.forEach(item=>gridContainer.appendChild(item))
+if(!msnry){msnry=new Masonry(gridContainer,{itemSelector:'.gallery-item',columnWidth:'.gallery-item',gutter:20,percentPosition:true,horizontalOrder:true});}else{msnry.appended(items)}
+imagesLoaded(items).on('always',function(){msnry.layout();});nextPage++
+failedLoads=0}catch(error){console.error("Error loading gallery page:",error)
+failedLoads++}finally{appending=false}
+if(failedLoads){setTimeout(rearmScroll,Math.min(1000*2**(failedLoads-1),RETRY_MAX_DELAY))}else if(nextPage>=manifestIndex.pages){if(observer)observer.disconnect()
+if(sentinel)sentinel.remove()}else{rearmScroll()}}
+function rearmScroll(){if(nextPage>=manifestIndex.pages)return
+if(observer){observer.unobserve(sentinel)
+observer.observe(sentinel)}else{appendNextPage()}}
+function displayGallery(){gallery.innerHTML=""
+if(manifestIndex.total===0){gallery.innerHTML='<p class="no-images">Aucune image dans la galerie pour le moment.</p>'
+return}
+gridContainer=document.createElement("div")
+gridContainer.className="gallery-grid gallery-fade-in"
+gallery.appendChild(gridContainer)
+sentinel=document.createElement("div")
+sentinel.className="gallery-sentinel"
+sentinel.style.height="1px"
+gallery.appendChild(sentinel)
+if("IntersectionObserver"in window){observer=new IntersectionObserver(entries=>{if(entries.some(entry=>entry.isIntersecting))appendNextPage()},{rootMargin:"800px 0px"})}
+appendNextPage()
+checkHash()
+window.addEventListener('hashchange',checkHash)}
+async function navigateTo(index){try{const entry=await entryAt(index)
+if(entry)window.location.hash=getAlias(entry.file)}catch(error){console.error("Error loading gallery page:",error)}}
+function navigatePrev(){if(manifestIndex.total===0||currentImageIndex===-1)return;navigateTo((currentImageIndex-1+manifestIndex.total)%manifestIndex.total);}
+function navigateNext(){if(manifestIndex.total===0||currentImageIndex===-1)return;navigateTo((currentImageIndex+1)%manifestIndex.total);}
+closeBtn.addEventListener("click",(e)=>{e.stopPropagation();closeModal();})
+modal.addEventListener("click",(e)=>{if(e.target===modalImage||e.target===closeBtn||e.target.closest('.close')){return;}
+if(modal.style.display==="block"){const rect=modal.getBoundingClientRect();const clickX=e.clientX;const modalCenterX=rect.left+rect.width/2;if(clickX<modalCenterX){navigatePrev();}else{navigateNext();}}})
+document.addEventListener("click",(e)=>{if(e.target.closest('.modal-nav-prev')){e.stopPropagation();navigatePrev();}else if(e.target.closest('.modal-nav-next')){e.stopPropagation();navigateNext();}})
+document.addEventListener("keydown",(e)=>{if(modal.style.display==="block"){if(e.key==="Escape"){closeModal();}else if(e.key==="ArrowLeft"){e.preventDefault();navigatePrev();}else if(e.key==="ArrowRight"){e.preventDefault();navigateNext();}}})
+document.addEventListener('contextmenu',function(e){if(e.target.tagName==='IMG'){e.preventDefault();return false;}});document.addEventListener('dragstart',function(e){if(e.target.tagName==='IMG'){e.preventDefault();}});loadGallery()
+const mobileMenuToggle=document.getElementById('mobile-menu-toggle');const navLinks=document.getElementById('nav-links');if(mobileMenuToggle&&navLinks){mobileMenuToggle.addEventListener('click',()=>{mobileMenuToggle.classList.toggle('active');navLinks.classList.toggle('active');});navLinks.querySelectorAll('.nav-link').forEach(link=>{link.addEventListener('click',()=>{mobileMenuToggle.classList.remove('active');navLinks.classList.remove('active');});});}
+let parallaxTicking=false;function updateGalleryParallax(){const scrollTop=window.scrollY;const docHeight=document.body.scrollHeight-window.innerHeight;if(docHeight>0){const scrollPercent=scrollTop/docHeight;const bgPosY=scrollPercent*100;document.body.style.setProperty('--bg-pos-y',`${bgPosY}%`);}
+parallaxTicking=false;}
+window.addEventListener('scroll',()=>{if(!parallaxTicking){requestAnimationFrame(updateGalleryParallax);parallaxTicking=true;}},{passive:true});updateGalleryParallax();
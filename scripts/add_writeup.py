@@ -4,6 +4,7 @@ Script de conversion des writeups Notion HTML vers le format du site.
 
 Usage: 
     python3 add_writeup.py <dossier_export_notion> <nom_writeup> [description]
+    python3 add_writeup.py --batch <dossier_contenant_les_exports>
 
 Exemple: 
     python3 add_writeup.py "ExportBlock-173f88f7-a364-414c-833e-35a77a29b1e2-Part-1" trickster "PrestaShop XSS, changedetection.io SSTI"
@@ -11,7 +12,7 @@ Exemple:
 Le script va :
 1. Trouver le fichier HTML dans le dossier d'export
 2. Extraire et nettoyer le contenu
-3. Copier les images
+3. Copier les images (et en tirer des variantes AVIF/WebP, voir writeup_images.py)
 4. Créer le writeup avec le template du site
 5. Ajouter le writeup à l'index
 6. Supprimer le dossier d'export (optionnel, avec --cleanup)
@@ -20,16 +21,34 @@ Le script va :
 import sys
 import os
 import re
+import json
 import shutil
+import hashlib
+import inspect
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from html import unescape
 
+import fonts
+import highlight
+import hints
+import navbar
+import writeup_images
+
 # Chemins relatifs au script
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 WRITEUPS_DIR = PROJECT_ROOT / "writeups"
 INDEX_FILE = WRITEUPS_DIR / "index.html"
 
+# Cache de build incrémental (empreintes des sources, assets et règles)
+CACHE_FILE = SCRIPT_DIR / ".writeups_cache.json"
+# À incrémenter pour invalider tous les writeups ; le code de nettoyage est déjà
+# pris en compte par rules_fingerprint (voir _cleaning_source)
+CACHE_VERSION = 2
+
 # Template HTML pour les writeups
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="fr" class="dark">
@@ -39,7 +58,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     <meta name="viewport" content="width=device-width,initial-scale=1">
     <title>{title} - Writeup HTB</title>
     <!-- Preload background image -->
-    <link rel="preload" href="../../assets/labalsa.jpg" as="image">
+    <link rel="preload" href="../../assets/labalsa.webp" as="image" type="image/webp" fetchpriority="high">
 
     <meta name="description" content="Writeup Hack The Box - {title}">
 
@@ -47,33 +66,13 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <link href="https://fonts.googleapis.com/css2?family=Zalando+Sans:ital,wght@0,200..900;1,200..900&display=swap" rel="stylesheet">
     <link href="https://fonts.googleapis.com/css2?family=Zalando+Sans+Expanded:ital,wght@0,200..900;1,200..900&display=swap" rel="stylesheet">
-    <link rel="stylesheet" href="../../static/styles.css">
-    <link rel="stylesheet" href="../writeups.css">
+    <link rel="stylesheet" href="../../static/styles.min.css">
+    <link rel="stylesheet" href="../writeups.min.css">
     <link rel="icon" type="image/jpeg" href="../../assets/favi.png">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/prism.min.js" defer></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-bash.min.js" defer></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-python.min.js" defer></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-sql.min.js" defer></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-json.min.js" defer></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-php.min.js" defer></script>
-</head>
+{scripts}</head>
 
 <body class="writeups-mode">
-    <nav class="navbar">
-        <div class="container">
-            <div class="nav-content">
-                <a href="../../" class="nav-logo-link">
-                    <img src="../../assets/c8e38298-4426-4ed7-ab6b-1c8c5c263f64 (1).png" class="nav-logo"
-                        alt="logo signature Raphaël">
-                </a>
-                <div class="nav-links">
-                    <a href="../../" class="nav-link">Accueil</a>
-                    <a href="../" class="nav-link active">Writeups</a>
-                    <a href="../../Portfolio/" class="nav-link">Galerie</a>
-                </div>
-            </div>
-        </div>
-    </nav>
+    <div id="navbar-placeholder"></div>
 
     <main class="min-h-screen">
         <div class="writeups-container">
@@ -89,6 +88,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             </div>
         </div>
     </main>
+    <script src="../../static/script.js" defer></script>
 </body>
 
 </html>
@@ -210,8 +210,201 @@ def extract_title(html_content):
     return None
 
 
+def slugify(title):
+    """Nom de dossier d'un writeup: 'Code Part/Two' -> 'code-part-two' (ASCII, sans séparateur de chemin)."""
+    name = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii').lower()
+    return re.sub(r'[^a-z0-9]+', '-', name).strip('-')
+
+
+# Classes Notion de couleur/highlight (on utilise notre CSS)
+NOTION_COLOR_CLASSES = [
+    'highlight-default', 'highlight-gray', 'highlight-brown', 'highlight-orange',
+    'highlight-yellow', 'highlight-teal', 'highlight-blue', 'highlight-purple',
+    'highlight-pink', 'highlight-red', 'highlight-default_background',
+    'highlight-gray_background', 'highlight-brown_background', 'highlight-orange_background',
+    'highlight-yellow_background', 'highlight-teal_background', 'highlight-blue_background',
+    'highlight-purple_background', 'highlight-pink_background', 'highlight-red_background',
+    'block-color-default', 'block-color-gray', 'block-color-brown', 'block-color-orange',
+    'block-color-yellow', 'block-color-teal', 'block-color-blue', 'block-color-purple',
+    'block-color-pink', 'block-color-red', 'block-color-default_background',
+    'block-color-gray_background', 'block-color-brown_background', 'block-color-orange_background',
+    'block-color-yellow_background', 'block-color-teal_background', 'block-color-blue_background',
+    'block-color-purple_background', 'block-color-pink_background', 'block-color-red_background',
+]
+
+# Classes Notion de structure qu'on n'utilise pas
+NOTION_STRUCT_CLASSES = [
+    'sans', 'serif', 'mono', 'page-title', 'page-description', 'page-header-icon',
+    'page-header-icon-with-cover', 'page-cover-image', 'collection-content',
+    'collection-title', 'column-list', 'column', 'table_of_contents-item',
+    'table_of_contents-indent-1', 'table_of_contents-indent-2', 'table_of_contents-indent-3',
+    'table_of_contents-link', 'toggle', 'to-do-list', 'to-do-children-checked',
+    'checkbox', 'checkbox-on', 'checkbox-off', 'user-icon', 'user-icon-inner',
+    'text-icon', 'pdf-relative-link-path', 'selected-value', 'indented',
+]
+
+# Classes de code Notion -> classes Prism (lowercase)
+PRISM_LANGUAGES = {
+    'language-Bash': 'language-bash',
+    'language-JSON': 'language-json',
+    'language-SQL': 'language-sql',
+    'language-Python': 'language-python',
+    'language-PHP': 'language-php',
+    'language-JavaScript': 'language-javascript',
+    'language-HTML': 'language-html',
+    'language-CSS': 'language-css',
+    'language-Plain text': 'language-text',
+}
+
+# ========== TOKENIZER ==========
+
+# Un seul scan du document : commentaires, balises ouvrantes/fermantes, texte
+_TOKEN_RE = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][^\s/>]*)([^>]*)>|[^<]+|<', re.DOTALL)
+
+# Attributs supprimés : style inline, dir, IDs Notion (longs UUIDs)
+_DROPPED_ATTR_RE = re.compile(r'\s+(?:style="[^"]*"|dir="[^"]*"|id="[a-f0-9-]{36}")')
+_CLASS_ATTR_RE = re.compile(r'(\s+)class="([^"]*)"')
+_STRIPPED_CLASS_RES = [re.compile(rf'\s*{cls}')
+                       for cls in NOTION_COLOR_CLASSES + NOTION_STRUCT_CLASSES]
+
+_CODE_PRE_RE = re.compile(r'<pre[^>]*class="code[^"]*"[^>]*>')
+_EXTERNAL_A_RE = re.compile(r'<a href="(http[^"]*)"(?![^>]*target=)')
+# Images cassées des bookmarks (bookmark-icon, bookmark-image, icon)
+_ICON_IMG_RE = re.compile(r'<img[^>]*class="[^"]*(?:icon|bookmark-image)[^"]*"[^>]*/?\s*>')
+_IMG_SRC_RE = re.compile(r'<img[^>]*src="([^"]+)"[^>]*>')
+_HREF_RE = re.compile(r'href="([^"]+)"')
+_BOOKMARK_A_RE = re.compile(r'<a[^>]*class="bookmark[^"]*"')
+_BOOKMARK_TITLE_RE = re.compile(r'<div class="bookmark-title">([^<]+)</div>')
+_SOURCE_FIGURE_RE = re.compile(r'\s*<div class="source">([^<]+)</div>\s*')
+
+_LINK_INTEGRATION = '''<p class="link-integration">
+                        <img src="https://www.google.com/s2/favicons?domain={domain}&sz=64" class="site-favicon" alt="">
+                        <a href="{href}" target="_blank" rel="noopener">{title}</a>
+                    </p>'''
+_SOURCE_INTEGRATION = '''<p class="link-integration">
+                            <img src="https://www.google.com/s2/favicons?domain={domain}&sz=64" class="site-favicon" alt="">
+                            <a href="{href}" target="_blank" rel="noopener">{title}</a>
+                        </p>'''
+
+# Table des classes déjà résolues : valeur de l'attribut class -> valeur nettoyée
+_CLASS_TABLE = {}
+
+
+class _Removed(str):
+    """Marqueur vide laissé à la place d'un <div>/<p> vide supprimé."""
+
+
+_REMOVED_DIV = _Removed()
+_REMOVED_P = _Removed()
+
+
+def _clean_class(value):
+    """Nettoie la valeur d'un attribut class (résultat mémorisé par valeur)."""
+    cleaned = _CLASS_TABLE.get(value)
+    if cleaned is None:
+        cleaned = value
+        for pattern in _STRIPPED_CLASS_RES:
+            cleaned = pattern.sub('', cleaned)
+        cleaned = PRISM_LANGUAGES.get(cleaned, cleaned)
+        _CLASS_TABLE[value] = cleaned
+    return cleaned
+
+
+def _rewrite_attrs(attrs):
+    """Retire les attributs Notion inutiles et nettoie les classes."""
+    attrs = _DROPPED_ATTR_RE.sub('', attrs)
+    if 'class="' in attrs:
+        def replace_class(match):
+            cleaned = _clean_class(match.group(2))
+            if not cleaned.strip():
+                return ''
+            return f'{match.group(1)}class="{cleaned}"'
+        attrs = _CLASS_ATTR_RE.sub(replace_class, attrs)
+    return attrs
+
+
+def _get_domain(url):
+    from urllib.parse import urlparse
+    try:
+        return urlparse(url).netloc
+    except ValueError:
+        return ""
+
+
+def _truncate(title, limit=57):
+    if len(title) > limit:
+        return title[:limit - 3] + "..."
+    return title
+
+
+def _convert_figure(open_tag, inner):
+    """Convertit une <figure> Notion (bookmark, source, image) ou la garde telle quelle."""
+    # Bookmarks Notion -> format standardisé (Favicon + Titre)
+    if _BOOKMARK_A_RE.search(inner):
+        href_match = _HREF_RE.search(inner)
+        if not href_match:
+            return ''
+        href = href_match.group(1)
+        title_match = _BOOKMARK_TITLE_RE.search(inner)
+        title = _truncate(title_match.group(1) if title_match else href)
+        block = _LINK_INTEGRATION.format(domain=_get_domain(href), href=href, title=title)
+        # Comme les <img> source, le favicon passe par le filtre des icônes
+        return _ICON_IMG_RE.sub('', block)
+
+    # Figures avec source (liens GitHub, etc.)
+    source_match = _SOURCE_FIGURE_RE.fullmatch(inner)
+    if source_match:
+        url = source_match.group(1).strip()
+        if url.startswith('http') and len(url) > 57:
+            block = _SOURCE_INTEGRATION.format(domain=_get_domain(url), href=url,
+                                               title=_truncate(url))
+            return _ICON_IMG_RE.sub('', block)
+        return f'<p><a href="{url}" target="_blank" rel="noopener">{url}</a></p>'
+
+    # Figures d'images -> format simple (garde juste le nom de fichier)
+    class_match = _CLASS_ATTR_RE.search(open_tag)
+    if class_match and 'image' in class_match.group(2):
+        img_match = _IMG_SRC_RE.search(inner)
+        if img_match:
+            src = re.sub(r'^.*/', '', img_match.group(1))
+            return f'<figure class="image"><img src="{src}" alt="" style="max-width:100%;"></figure>'
+        return ''
+
+    return open_tag + inner + '</figure>'
+
+
+def _drop_empty(out, is_open, marker, transparent=None):
+    """Retire une balise ouvrante suivie uniquement de blancs en fin de sortie.
+
+    Un bloc déjà retiré laisse un marqueur qui empêche de vider son parent,
+    comme le faisaient les anciens passages re.sub non récursifs.
+    """
+    i = len(out) - 1
+    while i >= 0 and (out[i] is transparent
+                      or (not isinstance(out[i], _Removed) and not out[i].strip())):
+        i -= 1
+    if i >= 0 and is_open(out[i]):
+        del out[i:]
+        out.append(marker)
+        return True
+    return False
+
+
+def _is_open_div(piece):
+    return piece == '<div>'
+
+
+def _is_open_p(piece):
+    return piece.startswith('<p>') or piece.startswith('<p ')
+
+
 def clean_content(html_content):
-    """Extrait et nettoie le contenu du writeup, retire le CSS Notion et adapte à la DA du site."""
+    """Extrait et nettoie le contenu du writeup, retire le CSS Notion et adapte à la DA du site.
+
+    Le contenu est parcouru une seule fois : chaque balise est réécrite à la volée
+    (attributs, classes, langages Prism), les <figure> sont converties dès leur
+    fermeture et les blocs vides sont retirés au fil de l'eau.
+    """
     # Cherche le contenu du page-body
     match = re.search(r'<div class="page-body">(.*?)</div>\s*</article>', html_content, re.DOTALL)
     if match:
@@ -225,184 +418,67 @@ def clean_content(html_content):
             # Dernier recours: prend le body
             match = re.search(r'<body[^>]*>(.*?)</body>', html_content, re.DOTALL)
             content = match.group(1) if match else html_content
-    
-    # ========== SUPPRESSION DU CSS NOTION ==========
-    
-    # Supprime les balises <style> complètes
-    content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL)
-    
-    # Supprime les scripts Prism inline (on les charge dans le head)
-    content = re.sub(r'<script[^>]*prism[^>]*>.*?</script>', '', content, flags=re.DOTALL)
-    content = re.sub(r'<link[^>]*prism[^>]*/?\s*>', '', content)
-    
-    # Supprime TOUS les attributs style inline
-    content = re.sub(r'\s+style="[^"]*"', '', content)
-    
-    # Supprime les classes Notion de couleur/highlight (on utilise notre CSS)
-    notion_color_classes = [
-        'highlight-default', 'highlight-gray', 'highlight-brown', 'highlight-orange',
-        'highlight-yellow', 'highlight-teal', 'highlight-blue', 'highlight-purple',
-        'highlight-pink', 'highlight-red', 'highlight-default_background',
-        'highlight-gray_background', 'highlight-brown_background', 'highlight-orange_background',
-        'highlight-yellow_background', 'highlight-teal_background', 'highlight-blue_background',
-        'highlight-purple_background', 'highlight-pink_background', 'highlight-red_background',
-        'block-color-default', 'block-color-gray', 'block-color-brown', 'block-color-orange',
-        'block-color-yellow', 'block-color-teal', 'block-color-blue', 'block-color-purple',
-        'block-color-pink', 'block-color-red', 'block-color-default_background',
-        'block-color-gray_background', 'block-color-brown_background', 'block-color-orange_background',
-        'block-color-yellow_background', 'block-color-teal_background', 'block-color-blue_background',
-        'block-color-purple_background', 'block-color-pink_background', 'block-color-red_background',
-    ]
-    for cls in notion_color_classes:
-        content = re.sub(rf'\s*{cls}', '', content)
-    
-    # Supprime les classes Notion de structure qu'on n'utilise pas
-    notion_struct_classes = [
-        'sans', 'serif', 'mono', 'page-title', 'page-description', 'page-header-icon',
-        'page-header-icon-with-cover', 'page-cover-image', 'collection-content',
-        'collection-title', 'column-list', 'column', 'table_of_contents-item',
-        'table_of_contents-indent-1', 'table_of_contents-indent-2', 'table_of_contents-indent-3',
-        'table_of_contents-link', 'toggle', 'to-do-list', 'to-do-children-checked',
-        'checkbox', 'checkbox-on', 'checkbox-off', 'user-icon', 'user-icon-inner',
-        'text-icon', 'pdf-relative-link-path', 'selected-value', 'indented',
-    ]
-    for cls in notion_struct_classes:
-        content = re.sub(rf'\s*{cls}', '', content)
-    
-    # ========== NETTOYAGE DE LA STRUCTURE HTML ==========
-    
-    # Supprime les div style="display:contents" en gardant le contenu
-    content = re.sub(r'<div[^>]*display:\s*contents[^>]*>', '', content)
-    content = re.sub(r'<div style="display:contents"[^>]*>', '', content)
-    
-    # Ferme les div orphelins (après avoir supprimé les ouvertures)
-    # Compte les div ouverts/fermés pour équilibrer
-    
-    # Supprime les attributs dir
-    content = re.sub(r'\s+dir="[^"]*"', '', content)
-    
-    # Nettoie les IDs Notion (longs UUIDs)
-    content = re.sub(r'\s+id="[a-f0-9-]{36}"', '', content)
-    
-    # Supprime les classes vides après nettoyage
-    content = re.sub(r'\s+class="\s*"', '', content)
-    
-    # ========== CONVERSION DES ÉLÉMENTS NOTION ==========
-    
-    # Helper to get domain
-    def get_domain(url):
-        from urllib.parse import urlparse
-        try:
-            return urlparse(url).netloc
-        except:
-            return ""
-
-    # Convertit les bookmarks Notion en format standardisé (Favicon + Titre)
-    def convert_bookmark(match):
-        full_match = match.group(0)
-        href_match = re.search(r'href="([^"]+)"', full_match)
-        title_match = re.search(r'<div class="bookmark-title">([^<]+)</div>', full_match)
-        
-        if href_match:
-            href = href_match.group(1)
-            title = title_match.group(1) if title_match else href
-            domain = get_domain(href)
-            
-            # Truncate title to 57 chars
-            if len(title) > 57:
-                title = title[:54] + "..."
-            
-            return f'''<p class="link-integration">
-                        <img src="https://www.google.com/s2/favicons?domain={domain}&sz=64" class="site-favicon" alt="">
-                        <a href="{href}" target="_blank" rel="noopener">{title}</a>
-                    </p>'''
-        return ''
-    
-    content = re.sub(r'<figure[^>]*>.*?<a[^>]*class="bookmark[^"]*"[^>]*>.*?</a>.*?</figure>', 
-                     convert_bookmark, content, flags=re.DOTALL)
-    
-    # Simplifie les figures avec source (liens GitHub, etc.)
-    def convert_source(match):
-        source_match = re.search(r'<div class="source">([^<]+)</div>', match.group(0))
-        if source_match:
-            url = source_match.group(1).strip()
-            # Si c'est une URL valide
-            if url.startswith('http'):
-                domain = get_domain(url)
-                title = url
-            # Truncate title to 57 chars
-            if len(title) > 57:
-                title = title[:54] + "..."
-                    
-                return f'''<p class="link-integration">
-                            <img src="https://www.google.com/s2/favicons?domain={domain}&sz=64" class="site-favicon" alt="">
-                            <a href="{url}" target="_blank" rel="noopener">{title}</a>
-                        </p>'''
-            return f'<p><a href="{url}" target="_blank" rel="noopener">{url}</a></p>'
-        return ''
-    
-    content = re.sub(r'<figure[^>]*>\s*<div class="source">[^<]+</div>\s*</figure>', 
-                     convert_source, content, flags=re.DOTALL)
-    
-    # Convertit les figures d'images en format simple
-    def convert_image_figure(match):
-        img_match = re.search(r'<img[^>]*src="([^"]+)"[^>]*>', match.group(0))
-        if img_match:
-            src = img_match.group(1)
-            # Garde juste le nom de fichier
-            src = re.sub(r'^.*/', '', src)
-            return f'<figure class="image"><img src="{src}" alt="" style="max-width:100%;"></figure>'
-        return ''
-    
-    content = re.sub(r'<figure[^>]*class="[^"]*image[^"]*"[^>]*>.*?</figure>', 
-                     convert_image_figure, content, flags=re.DOTALL)
-    
-    # ========== NETTOYAGE DES BLOCS DE CODE ==========
-    
-    # Convertit les classes de code Notion en classes Prism (lowercase)
-    content = re.sub(r'class="language-Bash"', 'class="language-bash"', content)
-    content = re.sub(r'class="language-JSON"', 'class="language-json"', content)
-    content = re.sub(r'class="language-SQL"', 'class="language-sql"', content)
-    content = re.sub(r'class="language-Python"', 'class="language-python"', content)
-    content = re.sub(r'class="language-PHP"', 'class="language-php"', content)
-    content = re.sub(r'class="language-JavaScript"', 'class="language-javascript"', content)
-    content = re.sub(r'class="language-HTML"', 'class="language-html"', content)
-    content = re.sub(r'class="language-CSS"', 'class="language-css"', content)
-    content = re.sub(r'class="language-Plain text"', 'class="language-text"', content)
-    
-    # Simplifie les blocs de code (garde pre > code avec la bonne classe)
-    content = re.sub(r'<pre[^>]*class="code[^"]*"[^>]*>', '<pre class="code code-wrap">', content)
-    
-    # ========== NETTOYAGE DES LIENS ==========
-    
-    # Ajoute target="_blank" aux liens externes
-    def add_target_blank(match):
-        href = match.group(1)
-        if href.startswith('http'):
-            return f'<a href="{href}" target="_blank" rel="noopener"'
-        return match.group(0)
-    
-    content = re.sub(r'<a href="([^"]+)"(?![^>]*target=)', add_target_blank, content)
-    
-    # Supprime les images cassées des bookmarks
-    content = re.sub(r'<img[^>]*class="[^"]*bookmark-icon[^"]*"[^>]*/?\s*>', '', content)
-    content = re.sub(r'<img[^>]*class="[^"]*bookmark-image[^"]*"[^>]*/?\s*>', '', content)
-    content = re.sub(r'<img[^>]*class="[^"]*icon[^"]*"[^>]*/?\s*>', '', content)
-    
-    # ========== NETTOYAGE FINAL ==========
-    
-    # Supprime les header Notion (page-title est dans notre template)
-    content = re.sub(r'<header>.*?</header>', '', content, flags=re.DOTALL)
-    
-    # Supprime les divs vides
-    content = re.sub(r'<div>\s*</div>', '', content)
-    
-    # Supprime les paragraphes vides
-    content = re.sub(r'<p[^>]*>\s*</p>', '', content)
-    
+
+    out = []
+    skip_until = None   # balise fermante attendue pour un bloc ignoré (style, script, header)
+    figure = None       # [balise ouvrante, morceaux] de la <figure> en cours
+
+    for token in _TOKEN_RE.finditer(content):
+        closing, name, attrs = token.group(1, 2, 3)
+        raw = token.group(0)
+        lname = name.lower() if name else None
+
+        if skip_until:
+            if closing and lname == skip_until:
+                skip_until = None
+            continue
+
+        if name is None:
+            piece = raw
+        elif closing:
+            piece = raw
+            if lname == 'figure' and figure is not None:
+                piece = _convert_figure(figure[0], ''.join(figure[1]))
+                figure = None
+            elif lname == 'div' and figure is None and _drop_empty(out, _is_open_div, _REMOVED_DIV):
+                continue
+            elif lname == 'p' and figure is None and _drop_empty(out, _is_open_p, _REMOVED_P, _REMOVED_DIV):
+                continue
+        else:
+            # Supprime les balises <style> et les scripts/links Prism inline
+            if lname == 'style' or (lname == 'script' and 'prism' in attrs):
+                skip_until = lname
+                continue
+            if lname == 'link' and 'prism' in attrs:
+                continue
+
+            piece = f'<{name}{_rewrite_attrs(attrs)}>'
+
+            # Supprime les header Notion (page-title est dans notre template)
+            if piece == '<header>':
+                skip_until = 'header'
+                continue
+            if lname == 'figure' and figure is None:
+                figure = [piece, []]
+                continue
+            if lname == 'pre':
+                piece = _CODE_PRE_RE.sub('<pre class="code code-wrap">', piece)
+            elif lname == 'a':
+                # Ajoute target="_blank" aux liens externes
+                piece = _EXTERNAL_A_RE.sub(r'<a href="\1" target="_blank" rel="noopener"', piece)
+            elif lname == 'img' and _ICON_IMG_RE.fullmatch(piece):
+                continue
+
+        if figure is not None:
+            figure[1].append(piece)
+        else:
+            out.append(piece)
+
+    content = ''.join(out)
+
     # Supprime les espaces multiples
     content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
-    
+
     # Supprime les </div> orphelins en trop (causés par la suppression des div display:contents)
     # On compte et équilibre
     open_divs = len(re.findall(r'<div[^>]*>', content))
@@ -411,7 +487,7 @@ def clean_content(html_content):
         # Supprime les </div> en trop à la fin
         for _ in range(close_divs - open_divs):
             content = re.sub(r'</div>\s*$', '', content.rstrip())
-    
+
     return content.strip()
 
 
@@ -422,21 +498,20 @@ def fix_spelling(content):
     return content
 
 
-def add_to_index(name, title, description):
-    """Ajoute le writeup à la page d'index."""
-    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-        index_content = f.read()
-    
+def update_index(index_content, name, title, description, overwrite=True):
+    """Ajoute (ou met à jour) la carte d'un writeup dans le HTML de l'index.
+
+    Renvoie le nouveau contenu ; `overwrite=False` garde la description existante.
+    """
     # Vérifie si le writeup existe déjà
     if f'href="{name}/"' in index_content:
+        if not overwrite:
+            return index_content
         print(f"⚠️  Le writeup '{name}' existe déjà dans l'index, mise à jour de la description...")
         # Met à jour la description existante
         pattern = rf'(<a href="{name}/" class="writeup-card">.*?<p>)(.*?)(</p>)'
         replacement = rf'\1{description}\3'
-        index_content = re.sub(pattern, replacement, index_content, flags=re.DOTALL)
-        with open(INDEX_FILE, 'w', encoding='utf-8') as f:
-            f.write(index_content)
-        return True
+        return re.sub(pattern, replacement, index_content, flags=re.DOTALL)
     
     # Crée la nouvelle carte
     new_card = f'''
@@ -450,7 +525,15 @@ def add_to_index(name, title, description):
     pattern = r'(</div>\s*</div>\s*</main>)'
     replacement = new_card + r'\n            \1'
     
-    new_index = re.sub(pattern, replacement, index_content, count=1)
+    return re.sub(pattern, replacement, index_content, count=1)
+
+
+def add_to_index(name, title, description):
+    """Ajoute le writeup à la page d'index."""
+    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+        index_content = f.read()
+    
+    new_index = update_index(index_content, name, title, description)
     
     with open(INDEX_FILE, 'w', encoding='utf-8') as f:
         f.write(new_index)
@@ -458,70 +541,204 @@ def add_to_index(name, title, description):
     return True
 
 
-def convert_writeup(export_dir, name, description=None, cleanup=False):
-    """Convertit un export Notion en writeup intégré."""
-    export_path = Path(export_dir)
-    
-    if not export_path.exists():
-        print(f"❌ Dossier non trouvé: {export_dir}")
-        return False
+def _cleaning_source():
+    """Source des fonctions de nettoyage et des regex/fragments HTML qu'elles utilisent."""
+    functions = [extract_title, _clean_class, _rewrite_attrs, _get_domain, _truncate, _convert_figure,
+                 _drop_empty, _is_open_div, _is_open_p, clean_content, fix_spelling, fix_asset_paths]
+    constants = []
+    for key, value in sorted(globals().items()):
+        if isinstance(value, re.Pattern):
+            constants.append(f"{key}={value.pattern}")
+        elif isinstance(value, list) and value and all(isinstance(v, re.Pattern) for v in value):
+            constants.append(f"{key}={[v.pattern for v in value]}")
+        elif isinstance(value, str) and re.fullmatch(r'_[A-Z_]+', key):
+            constants.append(f"{key}={value}")
+    return "\n".join([*(inspect.getsource(function) for function in functions), *constants])
+
+
+def rules_fingerprint():
+    """Empreintes des règles de génération : nettoyage/orthographe d'un côté, template de l'autre.
+
+    Le code de nettoyage lui-même fait partie des règles: le modifier régénère les writeups.
+    """
+    rules = json.dumps([CACHE_VERSION, _cleaning_source(), SPELLING_FIXES, NOTION_COLOR_CLASSES,
+                        NOTION_STRUCT_CLASSES, PRISM_LANGUAGES, highlight.LEXERS, sorted(highlight.BOOLEAN_WORDS),
+                        highlight.LANGUAGE_CLASSES,
+                        highlight.pygments_available(), writeup_images.WIDTHS, writeup_images.FORMATS,
+                        writeup_images.QUALITY, writeup_images.SIZES], ensure_ascii=False)
+    return {
+        'rules': hashlib.sha256(rules.encode('utf-8')).hexdigest(),
+        'template': hashlib.sha256((HTML_TEMPLATE + navbar.NAVBAR_PATH.read_text(encoding='utf-8'))
+                                   .encode('utf-8')).hexdigest(),
+    }
+
+
+def load_cache():
+    """Charge le cache de build (writeup -> empreintes), vide s'il est absent ou illisible."""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    """Écrit le cache de build de façon atomique."""
+    tmp_path = CACHE_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def hash_assets(assets, previous=None):
+    """Hash des assets, en réutilisant l'ancien hash quand taille et mtime n'ont pas bougé."""
+    previous = previous or {}
+    hashes = {}
+    for asset in assets:
+        stat = asset.stat()
+        old = previous.get(asset.name)
+        if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns:
+            hashes[asset.name] = old
+            continue
+        with open(asset, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        hashes[asset.name] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest}
+    return hashes
+
+
+def build_writeup(export_path, name=None, verbose=True, cache=None):
+    """Génère writeups/<name>/ depuis un export Notion (page + assets), sans toucher à l'index.
+
+    Renvoie (name, title, rebuilt), ou None si l'export est inutilisable. Sans
+    `name`, le nom du dossier est déduit du titre de la page. Avec un `cache`
+    (voir load_cache), un writeup dont la source, les assets, et les
+    règles n'ont pas changé et dont la page existe n'est pas régénéré ; l'entrée est
+    mise à jour sinon. La page elle-même n'est pas comparée: les étapes suivantes
+    du build (navbar, minify, fingerprint, CSS critique...) la réécrivent sur place.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    export_path = Path(export_path)
     
     # Trouve le fichier HTML
     html_file = find_html_file(export_path)
     if not html_file:
-        print(f"❌ Aucun fichier HTML trouvé dans: {export_dir}")
-        return False
+        print(f"❌ Aucun fichier HTML trouvé dans: {export_path}")
+        return None
     
-    print(f"📄 Fichier HTML trouvé: {html_file.name}")
+    log(f"📄 Fichier HTML trouvé: {html_file.name}")
     
     # Lit le fichier source
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    with open(html_file, 'rb') as f:
+        html_bytes = f.read()
+    html_content = html_bytes.decode('utf-8')
     
     # Extrait le titre
-    title = extract_title(html_content) or name.capitalize()
-    print(f"📝 Titre: {title}")
+    title = extract_title(html_content)
+    if name is None:
+        name = slugify(title) if title else ""
+        if not name:
+            print(f"❌ Impossible de déduire le nom du writeup: {export_path}")
+            return None
+    title = title or name.capitalize()
+    log(f"📝 Titre: {title}")
+    
+    writeup_dir = WRITEUPS_DIR / name
+    output_path = writeup_dir / "index.html"
+    assets = find_all_assets(export_path)
+    
+    # Compare les empreintes avec le dernier build
+    previous = (cache or {}).get(name, {})
+    entry = {
+        'title': title,
+        'source': hashlib.sha256(html_bytes).hexdigest(),
+        'assets': hash_assets(assets, previous.get('assets')),
+        **rules_fingerprint(),
+    }
+    old_assets = {asset: meta['sha256'] for asset, meta in previous.get('assets', {}).items()}
+    new_assets = {asset: meta['sha256'] for asset, meta in entry['assets'].items()}
+    if cache is not None and old_assets == new_assets and output_path.is_file() and all(
+            previous.get(key) == entry[key] for key in ('title', 'source', 'rules', 'template')):
+        log(f"⏭️  Inchangé depuis le dernier build: {output_path}")
+        # Garde les mtimes à jour pour ne pas re-hasher les assets au prochain run
+        cache[name] = {**previous, 'assets': entry['assets']}
+        return name, title, False
     
     # Extrait et nettoie le contenu
     content = clean_content(html_content)
     content = fix_spelling(content)
     
+    # Colore le code au build ; Prism n'est chargé que pour ce qui n'a pas pu l'être
+    content, pending_languages, _ = highlight.highlight_html(content)
+    scripts = highlight.script_tags(highlight.prism_scripts(pending_languages))
+    
     # Corrige les chemins des assets (avant de créer le fichier)
     content = fix_asset_paths(content, export_path.name)
     
     # Crée le dossier du writeup
-    writeup_dir = WRITEUPS_DIR / name
     writeup_dir.mkdir(exist_ok=True)
     
     # Copie tous les assets (images, py, pcap, etc.)
-    assets = find_all_assets(export_path)
     for asset in assets:
         dest = writeup_dir / asset.name
-        # Évite d'écraser si déjà copié (cas de doublons)
-        if not dest.exists():
+        # Évite d'écraser si déjà copié (cas de doublons), sauf si l'asset a changé
+        changed = asset.name in old_assets and old_assets[asset.name] != new_assets[asset.name]
+        if not dest.exists() or changed:
             shutil.copy2(asset, dest)
             ext = asset.suffix.lower()
             if ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp']:
-                print(f"📷 Image copiée: {asset.name}")
+                log(f"📷 Image copiée: {asset.name}")
             elif ext == '.py':
-                print(f"🐍 Script Python copié: {asset.name}")
+                log(f"🐍 Script Python copié: {asset.name}")
             elif ext == '.pcap':
-                print(f"📦 Capture réseau copiée: {asset.name}")
+                log(f"📦 Capture réseau copiée: {asset.name}")
             else:
-                print(f"📎 Fichier copié: {asset.name}")
+                log(f"📎 Fichier copié: {asset.name}")
+    
+    # Variantes AVIF/WebP des captures et <picture> avec dimensions et lazy loading
+    content, images = writeup_images.process_content(content, writeup_dir)
+    for image, info in images.items():
+        if info['variants']:
+            log(f"🖼️  {image}: {sum(len(v) for v in info['variants'].values())} variante(s) AVIF/WebP")
     
     # Génère le HTML final
     # Indente le contenu correctement
     indented_content = '\n'.join('                    ' + line if line.strip() else '' 
                                    for line in content.split('\n'))
-    final_html = HTML_TEMPLATE.format(title=title, content=indented_content)
+    final_html = HTML_TEMPLATE.format(title=title, content=indented_content, scripts=scripts)
+    # Navbar partagée inlinée (writeups/navbar.html), lien actif calculé pour cette page
+    final_html, _ = navbar.inline_navbar(final_html, os.path.relpath(output_path, PROJECT_ROOT))
+    # Polices auto-hébergées à la place de Google Fonts, si fonts.py les a générées
+    final_html = fonts.inline_fonts(final_html, os.path.relpath(output_path, PROJECT_ROOT))
+    # Preload/preconnect vérifiés contre les fichiers et les CSS, preload de l'image LCP
+    final_html, _ = hints.update_hints(final_html, os.path.relpath(output_path, PROJECT_ROOT))
     
     # Écrit le fichier
-    output_path = writeup_dir / "index.html"
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(final_html)
     
-    print(f"✅ Writeup créé: {output_path}")
+    log(f"✅ Writeup créé: {output_path}")
+    
+    if cache is not None:
+        cache[name] = entry
+    return name, title, True
+
+
+def convert_writeup(export_dir, name, description=None, cleanup=False, force=False):
+    """Convertit un export Notion en writeup intégré."""
+    export_path = Path(export_dir)
+    
+    if not export_path.exists():
+        print(f"❌ Dossier non trouvé: {export_dir}")
+        return False
+    
+    cache = load_cache()
+    if force:
+        cache.pop(name, None)
+    built = build_writeup(export_path, name, cache=cache)
+    if not built:
+        return False
+    _, title, _ = built
+    save_cache(cache)
     
     # Ajoute à l'index
     desc = description or f"Writeup {title}"
@@ -536,7 +753,119 @@ def convert_writeup(export_dir, name, description=None, cleanup=False):
     return True
 
 
+def find_exports(batch_dir):
+    """Trouve tous les dossiers ExportBlock-* d'un export Notion complet."""
+    return sorted(p for p in Path(batch_dir).glob('ExportBlock-*') if p.is_dir())
+
+
+def export_name(export_path):
+    """Nom de dossier qu'aura le writeup d'un export (None si l'export n'a pas de page ou de titre)."""
+    html_file = find_html_file(export_path)
+    if not html_file:
+        return None
+    title = extract_title(html_file.read_text(encoding='utf-8', errors='replace'))
+    return (slugify(title) or None) if title else None
+
+
+def _build_export(export_path, cache, name=None):
+    """Worker du mode batch : convertit un export et mesure le temps passé.
+
+    Travaille sur sa copie du cache et renvoie l'entrée à fusionner. Une erreur
+    (export mal encodé, image illisible, écriture impossible) ne concerne que
+    cet export: elle est renvoyée au lieu d'interrompre le lot.
+    """
+    start = time.perf_counter()
+    built = entry = error = None
+    source_bytes = 0
+    try:
+        source_bytes = sum(f.stat().st_size for f in export_path.glob('*.html'))
+        built = build_writeup(export_path, name, verbose=False, cache=cache)
+        entry = cache.get(built[0]) if built else None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return export_path, built, entry, source_bytes, time.perf_counter() - start, error
+
+
+def convert_batch(batch_dir, cleanup=False, workers=None, force=False):
+    """Convertit tous les exports d'un dossier en parallèle, puis met à jour l'index en une écriture."""
+    exports = find_exports(batch_dir)
+    if not exports:
+        print(f"❌ Aucun dossier ExportBlock-* trouvé dans: {batch_dir}")
+        return False
+    
+    workers = workers or os.cpu_count() or 1
+    print(f"📦 {len(exports)} export(s) à convertir sur {min(workers, len(exports))} process")
+    
+    cache = load_cache()
+    worker_cache = {} if force else cache
+    
+    start = time.perf_counter()
+    built = []
+    failed = skipped = 0
+    total_bytes = 0
+    
+    # Deux exports du même titre écriraient en même temps dans le même dossier
+    owners = {}
+    todo = []
+    for export_path in exports:
+        name = export_name(export_path)
+        if name in owners:
+            failed += 1
+            print(f"❌ {export_path.name}: même writeup ({name}) que {owners[name].name}, ignoré")
+            continue
+        if name:
+            owners[name] = export_path
+        todo.append((export_path, name))
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = pool.map(_build_export, [export_path for export_path, _ in todo],
+                        [worker_cache] * len(todo), [name for _, name in todo])
+        for export_path, result, entry, source_bytes, elapsed, error in jobs:
+            total_bytes += source_bytes
+            if not result:
+                failed += 1
+                print(f"❌ {export_path.name} ({elapsed * 1000:.0f} ms){f': {error}' if error else ''}")
+                continue
+            name, title, rebuilt = result
+            built.append((export_path, name, title))
+            cache[name] = entry
+            skipped += not rebuilt
+            status = "✅" if rebuilt else "⏭️ "
+            print(f"{status} {name:<20} {title:<30} {source_bytes / 1024:8.1f} KB  {elapsed * 1000:6.0f} ms")
+    save_cache(cache)
+    
+    # Une seule lecture/écriture de l'index pour tout le lot
+    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+        index_content = f.read()
+    for _, name, title in built:
+        index_content = update_index(index_content, name, title, f"Writeup {title}", overwrite=False)
+    with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+        f.write(index_content)
+    print(f"✅ Index des writeups mis à jour ({len(built)} writeup(s))")
+    
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  {len(exports)} export(s) en {elapsed:.2f} s, {skipped} inchangé(s) "
+          f"({len(exports) / elapsed:.1f} exports/s, {total_bytes / 1024 / elapsed:.0f} KB/s)")
+    
+    if cleanup:
+        for export_path, _, _ in built:
+            shutil.rmtree(export_path)
+            print(f"🗑️  Dossier d'export supprimé: {export_path}")
+    
+    return failed == 0
+
+
 def main():
+    # Mode batch : python3 add_writeup.py --batch <dossier> [--cleanup]
+    if '--batch' in sys.argv:
+        idx = sys.argv.index('--batch')
+        if idx + 1 >= len(sys.argv):
+            print("❌ --batch attend un dossier contenant des ExportBlock-*")
+            sys.exit(1)
+        success = convert_batch(sys.argv[idx + 1], cleanup='--cleanup' in sys.argv,
+                                force='--force' in sys.argv)
+        sys.exit(0 if success else 1)
+    
     if len(sys.argv) < 3:
         print(__doc__)
         print("\nArguments:")
@@ -545,19 +874,26 @@ def main():
         print("  [description]      Description optionnelle pour l'index")
         print("\nOptions:")
         print("  --cleanup          Supprime le dossier d'export après conversion")
+        print("  --batch <dossier>  Convertit tous les ExportBlock-* du dossier en parallèle")
+        print("  --force            Ignore le cache et régénère tout")
         print("\nExemple:")
         print('  python3 add_writeup.py "ExportBlock-xxx" trickster "PrestaShop XSS, SSTI" --cleanup')
+        print('  python3 add_writeup.py --batch ~/Téléchargements/notion-export')
         sys.exit(1)
     
     # Parse les arguments
     args = [a for a in sys.argv[1:] if not a.startswith('--')]
     cleanup = '--cleanup' in sys.argv
+    force = '--force' in sys.argv
     
     export_dir = args[0]
-    name = args[1].lower().replace(' ', '-')
+    name = slugify(args[1])
+    if not name:
+        print(f"❌ Nom de writeup invalide: {args[1]}")
+        sys.exit(1)
     description = args[2] if len(args) > 2 else None
     
-    success = convert_writeup(export_dir, name, description, cleanup)
+    success = convert_writeup(export_dir, name, description, cleanup, force)
     sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark des backends d'encodage de update.py sur les images de la galerie.
+Usage: python bench_encoders.py [--backend pillow|magick] [--limit N]
+
+Pour chaque image, le backend produit la pleine taille et les variantes
+(VARIANT_WIDTHS) dans un dossier temporaire. Chaque backend tourne dans son
+propre process pour que le pic de mémoire mesuré soit le sien: RSS du process
+pour Pillow, RSS max des process `magick` enfants pour ImageMagick.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+
+import update
+
+
+def _max_rss_mb(who) -> float:
+    """Pic de RSS en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS)."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_backend(name: str, limit: int = None) -> dict:
+    """Encode les images de la galerie avec un backend et renvoie les mesures."""
+    encoder = update.get_encoder(name)
+    names = [entry["file"] for entry in update.load_manifest()][:limit]
+    times = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for index, image_name in enumerate(names):
+            source = os.path.join(update.GALLERY_DIR, image_name)
+            outputs = [(os.path.join(out_dir, f"{index}.webp"), None)]
+            outputs += [(os.path.join(out_dir, f"{index}-{w}.webp"), w) for w in update.VARIANT_WIDTHS]
+            start = time.perf_counter()
+            if not encoder.encode(source, outputs):
+                raise SystemExit(f"[-] Echec de l'encodage de {image_name}")
+            times.append(time.perf_counter() - start)
+    return {
+        "backend": name,
+        "images": len(times),
+        "mean_ms": statistics.mean(times) * 1000 if times else 0,
+        "median_ms": statistics.median(times) * 1000 if times else 0,
+        "total_s": sum(times),
+        "peak_rss_mb": max(_max_rss_mb(resource.RUSAGE_SELF), _max_rss_mb(resource.RUSAGE_CHILDREN)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare les backends d'encodage de la galerie.")
+    parser.add_argument("--backend", choices=list(update.ENCODERS), action="append",
+                        help="backend à mesurer (répétable, défaut: tous ceux disponibles)")
+    parser.add_argument("--limit", type=int, default=None, help="nombre max d'images")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Process enfant: mesure un seul backend et renvoie le résultat en JSON
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.limit)))
+        return
+
+    backends = args.backend or [name for name, encoder in update.ENCODERS.items() if encoder.available()]
+    if not backends:
+        print("[-] Aucun backend disponible (installe Pillow ou ImageMagick).")
+        sys.exit(1)
+
+    print(f"{'backend':<8} {'images':>6} {'moy. ms':>9} {'med. ms':>9} {'total s':>8} {'RSS max Mo':>11}")
+    for name in backends:
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", name]
+        if args.limit:
+            cmd += ["--limit", str(args.limit)]
+        result = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+        print(f"{result['backend']:<8} {result['images']:>6} {result['mean_ms']:>9.1f} "
+              f"{result['median_ms']:>9.1f} {result['total_s']:>8.2f} {result['peak_rss_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
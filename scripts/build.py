@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Build du site: graphe de dépendances entre pages, templates, CSS/JS et galerie.
+Usage: python build.py [cible ...] [--force] [--jobs N] [--exports DOSSIER] [--offline] [--list] [--verbose]
+
+Chaque cible déclare ses entrées (fichiers sources, pages, templates), ses sorties,
+les cibles dont elle dépend et sa configuration (template, règles, constantes).
+Sa signature est le sha256 de tout cela: une cible dont la signature n'a pas bougé
+depuis le dernier build (STATE_PATH) est sautée. Les cibles prêtes (dépendances
+terminées) tournent en parallèle, et un tableau des temps par cible termine le build.
+
+Plusieurs étapes modifient les pages sur place (favicons, ...): elles doivent être
+idempotentes. Les signatures sont enregistrées à la fin du build, sur l'état final
+des fichiers, pour qu'une étape ne soit pas relancée à cause des suivantes.
+
+Cibles:
+  writeup:<export>  page générée depuis un export Notion (avec --exports, add_writeup.py)
+  writeups-index    writeups/index.html mis à jour pour les exports (avec --exports)
+  navbar            navbar partagée inlinée dans les pages, lien actif par page (navbar.py)
+  highlight         code des writeups coloré au build, Prism limité au reste (highlight.py)
+  images            variantes AVIF/WebP et <picture> des images des writeups (writeup_images.py)
+  fonts             sous-ensembles WOFF2 auto-hébergés et @font-face des pages (fonts.py)
+  minify            .min des CSS/JS et pages qui les chargent (minify.py)
+  favicons          favicons locaux des intégrations de liens (favicons.py)
+  hints             preload/preconnect vérifiés, preload de l'image LCP de chaque page (hints.py)
+  fingerprint       copies empreintées des CSS/JS/images partagés (fingerprint.py)
+  critical-css      CSS critique inline des writeups (critical_css.py)
+  gallery           manifest paginé et variantes de la galerie (update.py)
+  links             index des liens de toutes les pages (link_index.py)
+  compress          voisins .gz/.br des fichiers texte du site, en dernier (compress.py)
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import add_writeup
+import compress
+import critical_css
+import favicons
+import fonts
+import fingerprint
+import highlight
+import hints
+import link_index
+import minify
+import navbar
+import update
+import writeup_images
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+WRITEUPS_DIR = PROJECT_ROOT / "writeups"
+GALLERY_DIR = PROJECT_ROOT / "Portfolio" / "gallery"
+NAVBAR_PATH = WRITEUPS_DIR / "navbar.html"
+
+# Signatures du dernier build et cache des hash de fichiers
+STATE_PATH = SCRIPT_DIR / ".build_state.json"
+STATE_VERSION = 1
+
+
+def files(*patterns) -> list:
+    """Fichiers du projet correspondant aux motifs glob (relatifs à la racine)."""
+    found = set()
+    for pattern in patterns:
+        found.update(path for path in PROJECT_ROOT.glob(pattern) if path.is_file())
+    return sorted(found)
+
+
+def html_pages() -> list:
+    """Toutes les pages HTML du site (mêmes règles de parcours que link_index.py)."""
+    return sorted(Path(entry.path) for _, entry in link_index.iter_pages())
+
+
+class Target:
+    """Cible du build: `action()` est lancée quand la signature de la cible a changé.
+
+    `inputs` et `outputs` sont des listes de chemins ou des fonctions qui les
+    renvoient (évaluées au moment du build, après les dépendances). L'action
+    renvoie False (ou lève une exception) en cas d'échec.
+    """
+
+    def __init__(self, name, action, inputs=(), outputs=(), deps=(), config=""):
+        self.name = name
+        self.action = action
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = list(deps)
+        self.config = config
+
+    def files(self) -> list:
+        inputs = self.inputs() if callable(self.inputs) else self.inputs
+        outputs = self.outputs() if callable(self.outputs) else self.outputs
+        return sorted(set(inputs) | set(outputs))
+
+
+def file_key(path: Path) -> str:
+    """Chemin relatif à la racine du projet, ou absolu (exports Notion hors du projet)."""
+    path = path.resolve()
+    return str(path.relative_to(PROJECT_ROOT)) if path.is_relative_to(PROJECT_ROOT) else str(path)
+
+
+class FileHasher:
+    """sha256 des fichiers, réutilisé tant que taille et mtime n'ont pas changé."""
+
+    def __init__(self, cache: dict):
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def digest(self, path: Path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = file_key(path)
+        with self.lock:
+            cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+        with self.lock:
+            self.cache[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+
+def signature(target: Target, hasher: FileHasher) -> str:
+    """Empreinte de la configuration et du contenu des entrées/sorties d'une cible."""
+    h = hashlib.sha256(target.config.encode('utf-8'))
+    for path in target.files():
+        h.update(f"{file_key(path)}\0{hasher.digest(path)}\n".encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_PATH, 'r') as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": STATE_VERSION, "targets": {}, "files": {}}
+
+
+def save_state(state: dict) -> None:
+    tmp_path = STATE_PATH.with_name(STATE_PATH.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout par thread: la sortie d'une cible est gardée et affichée d'un bloc à la fin."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _run_target(target: Target, output: _ThreadOutput, hasher: FileHasher, previous: str, force: bool):
+    """Exécute une cible si besoin ; renvoie (statut, durée, sortie capturée)."""
+    output.local.buffer = io.StringIO()
+    start = time.perf_counter()
+    try:
+        if not force and previous is not None and signature(target, hasher) == previous:
+            status = "a jour"
+        else:
+            status = "reconstruite" if target.action() is not False else "echec"
+    except Exception as e:
+        print(f"[-] {type(e).__name__}: {e}")
+        status = "echec"
+    finally:
+        text = output.local.buffer.getvalue()
+        output.local.buffer = None
+    return status, time.perf_counter() - start, text
+
+
+def run(targets: dict, selected: list = None, jobs: int = None, force: bool = False, verbose: bool = False):
+    """Construit les cibles demandées (et leurs dépendances) ; renvoie [(nom, statut, durée)]."""
+    # Cibles demandées et leurs dépendances
+    wanted = set()
+    stack = list(selected or targets)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(targets[name].deps)
+
+    state = load_state()
+    hasher = FileHasher(state["files"])
+    output = _ThreadOutput(sys.stdout)
+    results = {}
+    pending = sorted(wanted)
+    running = {}
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = targets[name].deps
+                    if any(results.get(dep, ("",))[0] in ("echec", "bloquee") for dep in deps):
+                        results[name] = ("bloquee", 0.0)
+                        pending.remove(name)
+                    elif all(dep in results for dep in deps):
+                        previous = state["targets"].get(name)
+                        running[pool.submit(_run_target, targets[name], output, hasher, previous, force)] = name
+                        pending.remove(name)
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    status, elapsed, text = future.result()
+                    results[name] = (status, elapsed)
+                    if text and (verbose or status != "a jour"):
+                        output.stream.write(f"--- {name}\n{text}")
+    finally:
+        sys.stdout = output.stream
+
+    # Signatures sur l'état final des fichiers (les étapes sur place ne se relancent pas entre elles)
+    for name, (status, _) in results.items():
+        if status in ("a jour", "reconstruite"):
+            state["targets"][name] = signature(targets[name], hasher)
+        else:
+            state["targets"].pop(name, None)
+    save_state(state)
+    return [(name, *results[name]) for name in sorted(results, key=lambda n: -results[n][1])]
+
+
+def make_targets(exports_dir=None, offline: bool = False) -> dict:
+    """Graphe des cibles du site."""
+    targets = {}
+    pages_deps = []
+
+    # Pages générées depuis des exports Notion: template, règles de nettoyage et navbar
+    if exports_dir:
+        cache = add_writeup.load_cache()
+        built = []
+        template_config = json.dumps(add_writeup.rules_fingerprint(), sort_keys=True)
+
+        def export_action(export_path):
+            def action():
+                result = add_writeup.build_writeup(export_path, cache=cache)
+                if not result:
+                    return False
+                built.append(result)
+            return action
+
+        for export_path in add_writeup.find_exports(exports_dir):
+            name = f"writeup:{export_path.name}"
+            targets[name] = Target(
+                name, export_action(export_path),
+                inputs=lambda export_path=export_path: [*sorted(p for p in export_path.rglob('*') if p.is_file()),
+                                                        NAVBAR_PATH],
+                config=template_config,
+            )
+            pages_deps.append(name)
+
+        def index_action():
+            add_writeup.save_cache(cache)
+            with open(add_writeup.INDEX_FILE, 'r', encoding='utf-8') as f:
+                index_content = f.read()
+            for name, title, _ in sorted(built):
+                index_content = add_writeup.update_index(index_content, name, title, f"Writeup {title}",
+                                                         overwrite=False)
+            with open(add_writeup.INDEX_FILE, 'w', encoding='utf-8') as f:
+                f.write(index_content)
+            print(f"[+] Index des writeups: {len(built)} writeup(s) reconstruit(s)")
+
+        targets["writeups-index"] = Target("writeups-index", index_action, outputs=[add_writeup.INDEX_FILE],
+                                           deps=pages_deps, config=template_config)
+        pages_deps = pages_deps + ["writeups-index"]
+
+    # Les étapes qui réécrivent les pages sur place s'enchaînent (jamais deux en même temps)
+    targets["navbar"] = Target(
+        "navbar", navbar.build,
+        inputs=lambda: [*html_pages(), Path(navbar.__file__), Path(add_writeup.__file__)],
+        deps=pages_deps,
+    )
+    pages_deps = pages_deps + ["navbar"]
+
+    targets["highlight"] = Target(
+        "highlight", highlight.build,
+        inputs=lambda: [*files("writeups/*/index.html"), Path(highlight.__file__)],
+        deps=pages_deps,
+        config=json.dumps([highlight.LEXERS, highlight.pygments_available()]),
+    )
+    pages_deps = pages_deps + ["highlight"]
+
+    targets["images"] = Target(
+        "images", writeup_images.build,
+        inputs=lambda: [*files("writeups/*/index.html"), Path(writeup_images.__file__),
+                        *files(*(f"writeups/*/*{ext}" for ext in writeup_images.IMAGE_EXTENSIONS))],
+        outputs=lambda: files(*(f"writeups/*/*.{fmt}" for fmt in writeup_images.FORMATS)),
+        deps=pages_deps,
+        config=json.dumps([writeup_images.WIDTHS, writeup_images.FORMATS, writeup_images.QUALITY,
+                           writeup_images.SIZES, update.get_encoder().name]),
+    )
+    pages_deps = pages_deps + ["images"]
+
+    targets["fonts"] = Target(
+        "fonts", fonts.build,
+        inputs=lambda: [*html_pages(), Path(fonts.__file__), *files(*fonts.SCRIPT_GLOBS),
+                        *(fonts.SOURCES_DIR / name for name in fonts.FONT_FILES
+                          if (fonts.SOURCES_DIR / name).is_file())],
+        outputs=lambda: sorted(fonts.FONTS_DIR.glob("*.woff2")),
+        deps=pages_deps,
+        config=json.dumps([fonts.FONT_FILES, fonts.FONT_DISPLAY, fonts.ALWAYS_INCLUDED,
+                           fonts.fonttools_available()]),
+    )
+    pages_deps = pages_deps + ["fonts"]
+
+    targets["minify"] = Target(
+        "minify", minify.build,
+        inputs=lambda: [*html_pages(), Path(minify.__file__),
+                        *(PROJECT_ROOT / source for source in minify.MINIFY_FILES)],
+        outputs=[PROJECT_ROOT / minify.min_path(source) for source in minify.MINIFY_FILES],
+        deps=pages_deps,
+        config=json.dumps(minify.MINIFY_FILES),
+    )
+    pages_deps = pages_deps + ["minify"]
+
+    targets["favicons"] = Target(
+        "favicons", lambda: favicons.build(offline=offline) is not None,
+        inputs=lambda: [*html_pages(), favicons.INDEX_PATH],
+        outputs=[favicons.STYLESHEET_PATH],
+        deps=pages_deps,
+        config=json.dumps(favicons.FAVICON_SOURCES),
+    )
+    pages_deps = pages_deps + ["favicons"]
+
+    targets["hints"] = Target(
+        "hints", hints.build,
+        inputs=lambda: [*html_pages(), Path(hints.__file__), *files("static/*.css", "writeups/*.css", "assets/*")],
+        deps=pages_deps,
+        config=json.dumps([hints.HINT_RELS, hints.VIEWPORT, critical_css.FOLD_ELEMENTS]),
+    )
+    pages_deps = pages_deps + ["hints"]
+
+    targets["fingerprint"] = Target(
+        "fingerprint", fingerprint.build,
+        inputs=lambda: [*html_pages(), Path(fingerprint.__file__), *files(*fingerprint.FINGERPRINT_GLOBS)],
+        outputs=[fingerprint.MANIFEST_PATH],
+        deps=pages_deps,
+        config=json.dumps([fingerprint.FINGERPRINT_GLOBS, fingerprint.HASH_LENGTH]),
+    )
+    pages_deps = pages_deps + ["fingerprint"]
+
+    targets["critical-css"] = Target(
+        "critical-css", critical_css.build,
+        inputs=lambda: [*html_pages(), Path(critical_css.__file__),
+                        *files("static/*.css", "writeups/*.css")],
+        deps=pages_deps,
+        config=json.dumps([critical_css.CRITICAL_PAGES, critical_css.FOLD_ELEMENTS]),
+    )
+    pages_deps = pages_deps + ["critical-css"]
+
+    def gallery_action():
+        ok = update.reindex(write=True)
+        if update.get_encoder().available():
+            ok = update.build_variants() and ok
+        else:
+            print("[!] Ni Pillow ni ImageMagick: variantes non regenerees")
+        return ok
+
+    targets["gallery"] = Target(
+        "gallery", gallery_action,
+        inputs=lambda: files("Portfolio/gallery/*"),
+        outputs=lambda: files("Portfolio/gallery/pages/*.json",
+                              *(f"Portfolio/gallery/{width}w/*" for width in update.VARIANT_WIDTHS)),
+        config=json.dumps([update.MANIFEST_VERSION, update.PAGE_SIZE, update.VARIANT_WIDTHS]),
+    )
+
+    targets["links"] = Target(
+        "links", lambda: link_index.update_index(verbose=True) is not None,
+        inputs=html_pages,
+        deps=pages_deps,
+        config=str(link_index.INDEX_VERSION),
+    )
+
+    def compressed_files() -> list:
+        return [PROJECT_ROOT / relpath for relpath in compress.collect_files()]
+
+    targets["compress"] = Target(
+        "compress", compress.build,
+        inputs=lambda: [*compressed_files(), Path(compress.__file__)],
+        outputs=lambda: [sibling for path in compressed_files()
+                         for sibling in (path.with_name(path.name + ext) for ext in compress.ENCODINGS.values())
+                         if sibling.is_file()],
+        deps=[*pages_deps, "gallery", "links"],
+        config=json.dumps([compress.COMPRESS_EXTENSIONS, compress.GZIP_LEVEL, compress.BROTLI_QUALITY,
+                           compress.available_encodings()]),
+    )
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build incrémental du site.")
+    parser.add_argument("targets", nargs="*", help="cibles à construire (défaut: toutes)")
+    parser.add_argument("--force", action="store_true", help="reconstruit même les cibles à jour")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="cibles en parallèle (défaut: nb de CPU)")
+    parser.add_argument("--exports", metavar="DOSSIER", help="dossier contenant des exports Notion ExportBlock-*")
+    parser.add_argument("--offline", action="store_true", help="aucune requête réseau (favicons)")
+    parser.add_argument("--list", action="store_true", help="affiche le graphe des cibles")
+    parser.add_argument("-v", "--verbose", action="store_true", help="affiche aussi la sortie des cibles à jour")
+    args = parser.parse_args()
+
+    targets = make_targets(args.exports, args.offline)
+    unknown = [name for name in args.targets if name not in targets]
+    if unknown:
+        print(f"[-] Cible(s) inconnue(s): {', '.join(unknown)} (voir --list)")
+        sys.exit(1)
+
+    if args.list:
+        for name, target in targets.items():
+            deps = f" <- {', '.join(target.deps)}" if target.deps else ""
+            print(f"{name}{deps} ({len(target.files())} fichier(s))")
+        return
+
+    start = time.perf_counter()
+    results = run(targets, args.targets or None, args.jobs, args.force, args.verbose)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'cible':<40} {'statut':<13} {'ms':>8}")
+    for name, status, seconds in results:
+        print(f"{name:<40} {status:<13} {seconds * 1000:>8.0f}")
+    busy = sum(seconds for _, _, seconds in results)
+    print(f"[*] {len(results)} cible(s) en {elapsed:.2f}s "
+          f"({busy:.2f}s cumulees, {sum(s == 'reconstruite' for _, s, _ in results)} reconstruite(s))")
+    if any(status in ("echec", "bloquee") for _, status, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Vérifie que les liens externes des pages du site répondent toujours.
+Usage: python check_links.py [url ...] [--pages PREFIXE] [--refresh] [--ttl HEURES]
+                             [--jobs N] [--per-host N] [--rate R] [--retries N]
+
+Les URL viennent de l'index de link_index.py (toutes les pages, ou celles sous
+--pages) et sont dédupliquées avant vérification: une URL citée dans dix pages
+n'est testée qu'une fois. Chaque URL reçoit un HEAD, puis un GET (corps non lu)
+si le serveur refuse le HEAD. Les redirections sont suivies une à une pour les
+signaler. Les erreurs réseau, 429 et 5xx sont retentées avec un backoff
+exponentiel (ou le Retry-After du serveur).
+
+Les requêtes partent en parallèle avec au plus PER_HOST requêtes simultanées et
+RATE requêtes par seconde par domaine, sur des connexions keep-alive (HostPool de
+titles.py). Les résultats sont gardés CACHE_TTL dans CACHE_PATH. Le rapport liste,
+page par page, les liens morts et redirigés ; le code de sortie est 1 s'il y a des
+liens morts. Les URL http:// et les ports explicites sont gérés (serveur local de test).
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import http.client
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import link_index
+import titles
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Résultats des vérifications (url -> statut, URL finale, redirections, date)
+CACHE_PATH = SCRIPT_DIR / ".link_check_cache.json"
+CACHE_TTL = 24 * 3600
+
+MAX_JOBS = 32
+PER_HOST = 4
+# Requêtes par seconde et par domaine
+RATE = 2.0
+RETRIES = 3
+BACKOFF = 1.0
+TIMEOUT = 10
+MAX_REDIRECTS = 5
+
+# Réponses qui justifient un nouvel essai, et celles qui viennent d'une protection anti-robots
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BLOCKED_STATUSES = {401, 403, 429, 999}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class CheckCache(titles.TitleCache):
+    """Cache JSON des vérifications: {url: {status, final, redirects, error, fetched}}."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = CACHE_TTL):
+        super().__init__(path, ttl)
+
+
+class RateLimiter:
+    """Espace les débuts de requêtes d'un même domaine d'au moins 1/rate seconde."""
+
+    def __init__(self, rate: float = RATE):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_slot = {}
+
+    async def wait(self, domain: str) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot.get(domain, 0))
+        self.next_slot[domain] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def delay(self, domain: str, seconds: float) -> None:
+        """Repousse les prochaines requêtes vers un domaine (429, Retry-After)."""
+        now = asyncio.get_running_loop().time()
+        self.next_slot[domain] = max(self.next_slot.get(domain, 0), now + seconds)
+
+
+def classify(result: dict) -> str:
+    """'ok', 'redirect', 'blocked' ou 'dead' pour le résultat d'une vérification."""
+    status = result.get("status")
+    if status is None or (status >= 400 and status not in BLOCKED_STATUSES):
+        return "dead"
+    if status in BLOCKED_STATUSES:
+        return "blocked"
+    if result["redirects"]:
+        return "redirect"
+    return "ok"
+
+
+def _exchange(conn, method: str, path: str):
+    """Envoie la requête sans lire le corps ; renvoie ((status, headers), connexion réutilisable)."""
+    conn.request(method, path, headers={'User-Agent': titles.USER_AGENT, 'Accept': '*/*',
+                                        'Accept-Encoding': 'identity'})
+    response = conn.getresponse()
+    reusable = not response.will_close
+    if method == 'HEAD' or (response.length is not None and response.length <= titles.DRAIN_BYTES):
+        response.read()
+    else:
+        reusable = False
+    return (response.status, response.headers), reusable
+
+
+class LinkChecker:
+    """Vérifie un lot d'URL en parallèle, avec limites par domaine et un CheckCache."""
+
+    def __init__(self, cache: CheckCache, jobs: int = MAX_JOBS, per_host: int = PER_HOST,
+                 rate: float = RATE, retries: int = RETRIES, backoff: float = BACKOFF,
+                 timeout: float = TIMEOUT, refresh: bool = False):
+        self.cache = cache
+        self.jobs = jobs
+        self.retries = retries
+        self.backoff = backoff
+        self.refresh = refresh
+        self.pool = titles.HostPool(per_host, timeout)
+        self.limiter = RateLimiter(rate)
+        self.stats = {"cached": 0, "checked": 0, "requests": 0, "retries": 0}
+
+    async def _follow(self, url: str, method: str):
+        """Suit les redirections ; renvoie (status, URL finale, [[status, url], ...], headers)."""
+        redirects = []
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            await self.limiter.wait(urlsplit(target).hostname)
+            self.stats["requests"] += 1
+            path = titles.request_path(target)
+            status, headers = await self.pool.request(target, lambda conn: _exchange(conn, method, path))
+            location = headers.get('Location')
+            if status not in REDIRECT_STATUSES or not location:
+                return status, target, redirects, headers
+            target = urljoin(target, location)
+            redirects.append([status, target])
+        return status, target, redirects, headers
+
+    async def check(self, url: str) -> dict:
+        """Résultat d'une URL: cache frais, sinon HEAD (puis GET) avec nouveaux essais."""
+        if not self.refresh and self.cache.is_fresh(url):
+            self.stats["cached"] += 1
+            return self.cache.get(url)
+
+        domain = urlsplit(url).hostname
+        result = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            retry_after = None
+            try:
+                status, final, redirects, headers = await self._follow(url, 'HEAD')
+                # Beaucoup de serveurs répondent mal au HEAD (405, 404, 403...): le GET fait foi
+                if status >= 400:
+                    status, final, redirects, headers = await self._follow(url, 'GET')
+                result = {"status": status, "final": final, "redirects": redirects, "error": None}
+                if status not in RETRY_STATUSES:
+                    break
+                retry_after = headers.get('Retry-After')
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                result = {"status": None, "final": url, "redirects": [], "error": str(e) or type(e).__name__}
+
+            if attempt < self.retries:
+                delay = self.backoff * 2 ** attempt
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                    self.limiter.delay(domain, delay)
+                await asyncio.sleep(delay)
+
+        self.stats["checked"] += 1
+        result["fetched"] = time.time()
+        self.cache.put(url, result)
+        return result
+
+    async def check_all(self, urls: list) -> dict:
+        """url -> résultat pour toutes les URL, `jobs` requêtes au plus en même temps."""
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.jobs))
+        try:
+            results = await asyncio.gather(*(self.check(url) for url in urls))
+        finally:
+            self.pool.close()
+        return dict(zip(urls, results))
+
+
+def check_links(urls: list, cache: CheckCache = None, **options):
+    """Point d'entrée synchrone: vérifie les URL et sauvegarde le cache ; renvoie (résultats, stats)."""
+    cache = cache or CheckCache()
+    checker = LinkChecker(cache, **options)
+    results = asyncio.run(checker.check_all(urls))
+    cache.save()
+    return results, checker.stats
+
+
+def collect_urls(prefix: str = None) -> dict:
+    """URL externes (sans fragment) de l'index des liens -> pages qui les citent."""
+    urls = {}
+    for link in link_index.iter_links(link_index.update_index(), external=True, prefix=prefix):
+        if any(host in link["href"] for host in link_index.IGNORED_HOSTS):
+            continue
+        pages = urls.setdefault(link["href"].split('#', 1)[0], [])
+        if link["page"] not in pages:
+            pages.append(link["page"])
+    return urls
+
+
+def print_report(urls: dict, results: dict) -> int:
+    """Liens morts, redirigés et bloqués par page ; renvoie le nombre d'URL mortes."""
+    by_page = {}
+    counts = {"ok": 0, "redirect": 0, "blocked": 0, "dead": 0}
+    for url, result in results.items():
+        kind = classify(result)
+        counts[kind] += 1
+        if kind == "ok":
+            continue
+        for page in urls.get(url) or ["(ligne de commande)"]:
+            by_page.setdefault(page, []).append((kind, url, result))
+
+    labels = {"dead": "MORT", "redirect": "REDIRECTION", "blocked": "BLOQUE"}
+    for page in sorted(by_page):
+        print(f"File: {page}")
+        for kind, url, result in sorted(by_page[page], key=lambda item: (item[0] != "dead", item[1])):
+            if kind == "dead":
+                detail = result["error"] or f"HTTP {result['status']}"
+            elif kind == "redirect":
+                permanent = any(status in (301, 308) for status, _ in result["redirects"])
+                detail = f"{'permanente' if permanent else 'temporaire'} -> {result['final']}"
+            else:
+                detail = f"HTTP {result['status']} (anti-robots ?)"
+            print(f"  [{labels[kind]}] {url}: {detail}")
+        print("")
+
+    print(f"[*] {len(results)} URL: {counts['ok']} OK, {counts['redirect']} redirigee(s), "
+          f"{counts['blocked']} bloquee(s), {counts['dead']} morte(s)")
+    return counts["dead"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie les liens externes des pages du site.")
+    parser.add_argument("urls", nargs="*", help="URL à vérifier (défaut: liens de l'index)")
+    parser.add_argument("--pages", metavar="PREFIXE", help="limite aux pages dont le chemin commence par PREFIXE")
+    parser.add_argument("--refresh", action="store_true", help="ignore le cache")
+    parser.add_argument("--ttl", type=float, default=CACHE_TTL / 3600, help="validité du cache en heures")
+    parser.add_argument("-j", "--jobs", type=int, default=MAX_JOBS, help="requêtes simultanées au total")
+    parser.add_argument("--per-host", type=int, default=PER_HOST, help="requêtes simultanées par hôte")
+    parser.add_argument("--rate", type=float, default=RATE, help="requêtes par seconde par domaine (0: illimité)")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="nouveaux essais après une erreur")
+    args = parser.parse_args()
+
+    urls = {url: [] for url in args.urls} if args.urls else collect_urls(args.pages)
+    if not urls:
+        print("[*] Aucun lien externe.")
+        return
+    print(f"[*] {len(urls)} URL unique(s) a verifier")
+
+    start = time.perf_counter()
+    results, stats = check_links(list(urls), CheckCache(ttl=args.ttl * 3600), jobs=args.jobs,
+                                 per_host=args.per_host, rate=args.rate, retries=args.retries,
+                                 refresh=args.refresh)
+    elapsed = time.perf_counter() - start
+    dead = print_report(urls, results)
+    print(f"[*] {elapsed:.2f}s: {stats['cached']} en cache, {stats['checked']} verifiee(s), "
+          f"{stats['requests']} requete(s), {stats['retries']} nouvel(s) essai(s)")
+    if dead:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
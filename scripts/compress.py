@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Versions précompressées (.gz et .br) des fichiers texte du site.
+Usage: python compress.py [--jobs N] [--force] [--check]
+
+Chaque fichier HTML, CSS, JS, JSON (manifest et pages de la galerie compris) et
+SVG du site reçoit des voisins fichier.gz (gzip niveau 9) et fichier.br (Brotli
+qualité 11), pour un serveur ou un CDN qui sert les fichiers depuis le disque
+(voir serve.py pour mesurer localement). Brotli est une dépendance optionnelle:
+sans lui, seuls les .gz sont produits.
+
+Les compressions tournent en parallèle (un process par cœur). Le sha256 de
+chaque source est gardé dans CACHE_PATH: un fichier inchangé n'est pas
+recompressé. Un voisin qui ne serait pas plus petit que l'original n'est pas
+écrit, et ceux dont la source a disparu sont supprimés. Le taux de compression
+est affiché par fichier.
+
+Les .gz/.br sont des artefacts de déploiement, ignorés par git (GitHub Pages
+compresse lui-même).
+"""
+
+import os
+import sys
+import gzip
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import link_index
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+# Source -> sha256 et encodages déjà essayés
+CACHE_PATH = SCRIPT_DIR / ".compress_cache.json"
+CACHE_VERSION = 1
+
+COMPRESS_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg")
+# Encodage HTTP -> extension du voisin précompressé
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_encodings() -> list:
+    return [encoding for encoding in ENCODINGS if encoding != "br" or brotli_available()]
+
+
+def collect_files() -> list:
+    """Fichiers texte du site (mêmes dossiers ignorés que link_index.py), relatifs à la racine."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(PROJECT_ROOT):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in link_index.SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(COMPRESS_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(dirpath, name), PROJECT_ROOT))
+    return found
+
+
+def compress_data(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    # mtime=0: même source, même .gz
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_file(job: tuple) -> dict:
+    """Écrit les voisins d'un fichier ; renvoie encodage -> taille (None si pas plus petit)."""
+    relpath, encodings = job
+    path = PROJECT_ROOT / relpath
+    data = path.read_bytes()
+    sizes = {}
+    for encoding in encodings:
+        dest = path.with_name(path.name + ENCODINGS[encoding])
+        compressed = compress_data(data, encoding)
+        if len(compressed) >= len(data):
+            dest.unlink(missing_ok=True)
+            sizes[encoding] = None
+            continue
+        tmp_path = dest.with_name(dest.name + ".tmp")
+        tmp_path.write_bytes(compressed)
+        os.replace(tmp_path, dest)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+
+def load_cache() -> dict:
+    try:
+        with open(CACHE_PATH, 'r') as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data["files"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_cache(files: dict) -> None:
+    tmp_path = CACHE_PATH.with_name(CACHE_PATH.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": CACHE_VERSION, "files": dict(sorted(files.items()))}, f)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def _up_to_date(relpath: str, entry: dict, digest: str, encodings: list) -> bool:
+    if not entry or entry.get("sha256") != digest or sorted(entry.get("sizes", {})) != sorted(encodings):
+        return False
+    path = PROJECT_ROOT / relpath
+    return all(path.with_name(path.name + ENCODINGS[encoding]).exists()
+               for encoding, size in entry["sizes"].items() if size is not None)
+
+
+def _ratio(size, original: int) -> str:
+    return "non ecrit (pas plus petit)" if size is None else f"{size / 1024:.1f}KB ({size * 100 / original:.0f}%)"
+
+
+def build(workers: int = None, force: bool = False, check: bool = False) -> bool:
+    """Voisins .gz/.br à jour ; en mode check, renvoie False si un fichier était à recompresser."""
+    encodings = available_encodings()
+    if "br" not in encodings:
+        print("[!] Module brotli absent (pip install brotli): .gz seulement")
+    cache = load_cache()
+    files = collect_files()
+
+    jobs = []
+    digests = {}
+    for relpath in files:
+        digest = hashlib.sha256((PROJECT_ROOT / relpath).read_bytes()).hexdigest()
+        digests[relpath] = digest
+        if force or not _up_to_date(relpath, cache.get(relpath), digest, encodings):
+            jobs.append(relpath)
+
+    # Voisins des fichiers qui n'existent plus (copies empreintées remplacées, pages de galerie...)
+    orphans = [relpath for relpath in cache if relpath not in digests]
+    if check:
+        for relpath in jobs:
+            print(f"[-] {relpath}: a recompresser")
+        for relpath in orphans:
+            print(f"[-] {relpath}: source disparue")
+        print(f"[*] {len(jobs)} fichier(s) a recompresser, {len(orphans)} voisin(s) orphelin(s)")
+        return not (jobs or orphans)
+
+    for relpath in orphans:
+        path = PROJECT_ROOT / relpath
+        for extension in ENCODINGS.values():
+            path.with_name(path.name + extension).unlink(missing_ok=True)
+        del cache[relpath]
+
+    total_before = total_after = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for relpath, sizes in zip(jobs, pool.map(compress_file, [(relpath, encodings) for relpath in jobs])):
+            original = (PROJECT_ROOT / relpath).stat().st_size
+            cache[relpath] = {"sha256": digests[relpath], "sizes": sizes}
+            total_before += original
+            total_after += min((s for s in sizes.values() if s is not None), default=original)
+            details = ", ".join(f"{ENCODINGS[e][1:]} {_ratio(s, original)}" for e, s in sizes.items())
+            print(f"[+] {relpath}: {original / 1024:.1f}KB -> {details}")
+    save_cache(cache)
+
+    summary = f"[*] {len(files)} fichier(s), {len(jobs)} compresse(s), {len(files) - len(jobs)} inchange(s)"
+    if total_before:
+        summary += f", {total_before / 1024:.0f}KB -> {total_after / 1024:.0f}KB ({total_after * 100 / total_before:.0f}%)"
+    print(summary)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Précompresse les fichiers texte du site en .gz et .br.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="process en parallèle (défaut: nb de CPU)")
+    parser.add_argument("--force", action="store_true", help="recompresse même les fichiers inchangés")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si un fichier est à refaire)")
+    args = parser.parse_args()
+    if not build(args.jobs, args.force, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
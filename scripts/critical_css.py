@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+CSS critique des writeups: la partie utile au premier écran est inlinée, le reste chargé sans bloquer.
+Usage: python critical_css.py [page ...] [--fold N] [--check]
+
+Pour chaque page de CRITICAL_PAGES:
+  1. les FOLD_ELEMENTS premiers éléments du <body> (navbar inlinée par navbar.py
+     comprise) forment le premier écran ;
+  2. les règles des feuilles locales qui bloquent le rendu sont gardées si chaque
+     partie de leur sélecteur correspond à l'un de ces éléments (approximation
+     volontairement large: combinateurs, pseudo-classes et attributs ignorés) ;
+  3. ces règles sont inlinées dans <style id="critical-css"> (url() recalculées
+     depuis la page), et toutes les feuilles, Google Fonts compris, passent en
+     chargement asynchrone (media="print" + onload, <noscript> de secours).
+Relancer le script régénère le bloc inline depuis les feuilles actuelles.
+Les octets CSS bloquants avant/après sont affichés pour chaque page.
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from html.parser import HTMLParser
+
+import link_index
+import minify
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+# Pages traitées (motifs relatifs à la racine) et taille du premier écran en éléments
+CRITICAL_PAGES = ("writeups/*/index.html",)
+FOLD_ELEMENTS = 40
+
+_LINK_RE = re.compile(r'<link\b[^>]*>')
+_NOSCRIPT_RE = re.compile(r'<noscript>.*?</noscript>', re.DOTALL)
+_CRITICAL_STYLE_RE = re.compile(r'\s*<style id="critical-css">.*?</style>', re.DOTALL)
+_ATTR_RE = re.compile(r'([\w-]+)(?:="([^"]*)")?')
+_CSS_URL_RE = re.compile(r'(url\(\s*[\'"]?)([^\'")]+)([\'"]?\s*\))')
+_ASYNC_LINK = ('<link rel="stylesheet" href="{href}" media="print" onload="this.media=\'all\'" data-async-css>\n'
+               '    <noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+# Sélecteurs: pseudo-classes/éléments et attributs ignorés, combinateurs séparant les parties
+_PSEUDO_RE = re.compile(r'::?[\w-]+(?:\([^)]*\))?|\[[^\]]*\]')
+_COMBINATOR_RE = re.compile(r'\s*[>+~]\s*|\s+')
+
+
+class FoldCollector(HTMLParser):
+    """Éléments (balise, id, classes) de <html>, <body> et des `limit` premiers éléments du body."""
+
+    def __init__(self, limit: int = FOLD_ELEMENTS):
+        super().__init__()
+        self.limit = limit
+        self.elements = []
+        self.in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        element = (tag, attrs.get('id'), set((attrs.get('class') or '').split()))
+        if tag in ('html', 'body'):
+            self.elements.append(element)
+            self.in_body = self.in_body or tag == 'body'
+        elif self.in_body and len(self.elements) < self.limit + 2:
+            self.elements.append(element)
+
+
+def fold_elements(content: str, limit: int = FOLD_ELEMENTS) -> list:
+    collector = FoldCollector(limit)
+    collector.feed(content)
+    return collector.elements
+
+
+def parse_css(css: str) -> list:
+    """Règles d'une feuille: (prélude, déclarations) ou (prélude @, [règles]) pour les blocs imbriqués."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    rules, _ = _parse_block(css, 0)
+    return rules
+
+
+def _parse_block(css: str, i: int):
+    rules = []
+    start = i
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = minify._skip_string(css, i)
+            continue
+        if c == ';' and css[start:i].strip().startswith('@'):
+            # @import, @charset...
+            rules.append((css[start:i + 1].strip(), None))
+            start = i + 1
+        elif c == '{':
+            prelude = css[start:i].strip()
+            if prelude.startswith(('@media', '@supports', '@layer', '@container')):
+                children, i = _parse_block(css, i + 1)
+                rules.append((prelude, children))
+            else:
+                end = i + 1
+                depth = 1
+                while end < len(css) and depth:
+                    if css[end] in '"\'':
+                        end = minify._skip_string(css, end)
+                        continue
+                    depth += {'{': 1, '}': -1}.get(css[end], 0)
+                    end += 1
+                rules.append((prelude, css[i + 1:end - 1].strip()))
+                i = end - 1
+            start = i + 1
+        elif c == '}':
+            return rules, i
+        i += 1
+    return rules, i
+
+
+def _compound_matches(compound: str, element) -> bool:
+    tag, element_id, classes = element
+    match = re.match(r'[\w-]+|\*', compound)
+    if match and match.group(0) not in ('*', tag):
+        return False
+    ids = re.findall(r'#([\w-]+)', compound)
+    if ids and ids != [element_id]:
+        return False
+    return set(re.findall(r'\.([\w-]+)', compound)) <= classes
+
+
+def selector_matches(selector: str, elements: list) -> bool:
+    """Vrai si chaque partie du sélecteur correspond à au moins un élément du premier écran."""
+    compounds = [c for c in _COMBINATOR_RE.split(_PSEUDO_RE.sub('', selector).strip()) if c]
+    return all(any(_compound_matches(compound, element) for element in elements) for compound in compounds)
+
+
+def _split_selectors(prelude: str) -> list:
+    """Sélecteurs d'une liste, sans couper les virgules entre parenthèses (:is(a, b))."""
+    parts, depth, start = [], 0, 0
+    for i, c in enumerate(prelude):
+        depth += {'(': 1, ')': -1}.get(c, 0)
+        if c == ',' and not depth:
+            parts.append(prelude[start:i].strip())
+            start = i + 1
+    parts.append(prelude[start:].strip())
+    return parts
+
+
+def critical_rules(rules: list, elements: list) -> list:
+    """Règles (et @media) utiles au premier écran, sérialisées, dans l'ordre de la feuille."""
+    out = []
+    for prelude, body in rules:
+        if body is None:
+            out.append(prelude)
+        elif isinstance(body, list):
+            children = critical_rules(body, elements)
+            if any(isinstance(c, str) for c in children):
+                out.append(f"{prelude}{{{''.join(c for c in children if isinstance(c, str))}}}")
+        elif prelude.startswith('@font-face'):
+            out.append(f"{prelude}{{{body}}}")
+        elif prelude.startswith('@'):
+            # @keyframes & co: gardées seulement si utilisées (voir extract_critical)
+            out.append((prelude, body))
+        else:
+            selectors = [s for s in _split_selectors(prelude) if selector_matches(s, elements)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+    return out
+
+
+def extract_critical(css: str, elements: list) -> str:
+    rules = critical_rules(parse_css(css), elements)
+    kept = "".join(rule for rule in rules if isinstance(rule, str))
+    for rule in rules:
+        if not isinstance(rule, str):
+            prelude, body = rule
+            name = prelude.split(None, 1)[-1]
+            if re.search(rf'\b{re.escape(name)}\b', kept):
+                kept += f"{prelude}{{{body}}}"
+    return minify.minify_css(kept).strip() if kept else ""
+
+
+def rebase_urls(css: str, css_dir: Path, page_dir: Path) -> str:
+    """url() relatives à la feuille -> relatives à la page qui inline la CSS."""
+    def replace(match):
+        url = match.group(2).strip()
+        if url.startswith(('data:', 'http://', 'https://', '//', '/', '#')):
+            return match.group(0)
+        rebased = os.path.relpath(os.path.normpath(css_dir / url), page_dir).replace(os.sep, '/')
+        return f"{match.group(1)}{rebased}{match.group(3)}"
+
+    return _CSS_URL_RE.sub(replace, css)
+
+
+def stylesheet_links(content: str) -> list:
+    """Feuilles bloquantes ou rendues asynchrones par ce script: [(balise, href, asynchrone)]."""
+    head = content.split('</head>', 1)[0]
+    noscript = [m.span() for m in _NOSCRIPT_RE.finditer(head)]
+    links = []
+    for match in _LINK_RE.finditer(head):
+        if any(start <= match.start() < end for start, end in noscript):
+            continue
+        attrs = {name: value for name, value in _ATTR_RE.findall(match.group(0)[5:-1])}
+        if attrs.get('rel') != 'stylesheet' or 'href' not in attrs:
+            continue
+        converted = 'data-async-css' in attrs
+        if not converted and attrs.get('media', 'all') not in ('all', 'screen'):
+            continue
+        links.append((match.group(0), attrs['href'], converted))
+    return links
+
+
+def process_page(page_path: Path, fold: int = FOLD_ELEMENTS, check: bool = False):
+    """Inline la CSS critique d'une page.
+
+    Renvoie (octets CSS bloquants avant, feuilles externes, octets inline après, page modifiée).
+    """
+    content = page_path.read_text(encoding='utf-8')
+    links = stylesheet_links(content)
+    elements = fold_elements(content, fold)
+
+    blocking = 0
+    external = 0
+    critical = []
+    for _, href, _ in links:
+        if href.startswith(('http://', 'https://', '//')):
+            external += 1
+            continue
+        css_path = (page_path.parent / href).resolve()
+        if not css_path.is_file():
+            continue
+        css = css_path.read_text(encoding='utf-8')
+        blocking += len(css.encode('utf-8'))
+        critical.append(rebase_urls(extract_critical(css, elements), css_path.parent, page_path.parent))
+    if not links:
+        return 0, 0, 0, False
+
+    inline = "".join(critical)
+    new_content = _CRITICAL_STYLE_RE.sub('', content)
+    first = True
+    for tag, href, converted in links:
+        replacement = tag if converted else _ASYNC_LINK.format(href=href)
+        if first:
+            replacement = f'<style id="critical-css">{inline}</style>\n    {replacement}'
+            first = False
+        new_content = new_content.replace(tag, replacement, 1)
+    changed = new_content != content
+    if changed and not check:
+        page_path.write_text(new_content, encoding='utf-8')
+    return blocking, external, len(inline.encode('utf-8')), changed
+
+
+def critical_pages() -> list:
+    return sorted(PROJECT_ROOT / page for page, _ in link_index.iter_pages(PROJECT_ROOT)
+                  if any(Path(page).match(pattern) for pattern in CRITICAL_PAGES))
+
+
+def build(pages: list = None, fold: int = FOLD_ELEMENTS, check: bool = False) -> bool:
+    """CSS critique de toutes les pages ; en mode check, renvoie False si une page n'était pas à jour."""
+    total_before = total_after = stale = 0
+    for page_path in pages or critical_pages():
+        before, external, after, changed = process_page(page_path, fold, check)
+        total_before += before
+        total_after += after
+        stale += changed
+        status = ("[-] perimee" if check else "[+] reecrite") if changed else "[*] a jour"
+        print(f"{status} {page_path.relative_to(PROJECT_ROOT)}: {before / 1024:.1f}KB bloquants"
+              f" (+{external} feuille(s) externe(s)) -> {after / 1024:.1f}KB inline, 0 feuille bloquante")
+    print(f"[*] CSS bloquante: {total_before / 1024:.1f}KB -> {total_after / 1024:.1f}KB inline "
+          f"({stale} page(s) {'perimee(s)' if check else 'reecrite(s)'})")
+    return not (check and stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline la CSS critique des writeups.")
+    parser.add_argument("pages", nargs="*", type=Path, help="pages à traiter (défaut: CRITICAL_PAGES)")
+    parser.add_argument("--fold", type=int, default=FOLD_ELEMENTS, help="éléments du body considérés visibles")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si une page est périmée)")
+    args = parser.parse_args()
+    pages = [page.resolve() for page in args.pages] or None
+    if not build(pages, args.fold, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Favicons des intégrations de liens, hébergés sur le site.
+Usage: python favicons.py [--refresh | --retry-missing] [--source MODELE] [--offline]
+
+Les pages générées par add_writeup.py / migrate_links.py affichent le favicon de
+chaque lien via https://www.google.com/s2/favicons, soit une requête tierce (DNS,
+TLS, google.com) par lien. Ce script:
+  1. relève les domaines des <img class="site-favicon"> de toutes les pages ;
+  2. télécharge une seule fois le favicon de chaque nouveau domaine dans
+     assets/favicons/ (index.json garde aussi les échecs: rien n'est retéléchargé
+     sans --refresh / --retry-missing) ;
+  3. écrit assets/favicons.css: le style des <span> puis une règle data-URI par
+     domaine utilisé (rien n'est écrit tant qu'aucun favicon n'est en cache) ;
+  4. remplace les <img> par <span class="site-favicon favicon-<domaine>"> et
+     ajoute la feuille de style (chargée sans bloquer le rendu) aux pages.
+Les domaines sans favicon en cache gardent leur <img> Google.
+"""
+
+import os
+import re
+import json
+import base64
+import argparse
+import urllib.error
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import link_index
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+FAVICONS_DIR = PROJECT_ROOT / "assets" / "favicons"
+INDEX_PATH = FAVICONS_DIR / "index.json"
+STYLESHEET_PATH = PROJECT_ROOT / "assets" / "favicons.css"
+
+# Où chercher le favicon d'un domaine, dans l'ordre (le premier qui répond une image gagne)
+FAVICON_SOURCES = (
+    "https://www.google.com/s2/favicons?domain={domain}&sz=64",
+    "https://{domain}/favicon.ico",
+)
+MAX_FAVICON_BYTES = 64 * 1024
+TIMEOUT = 10
+MAX_WORKERS = 8
+
+# User agent to avoid 403s
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+# Signature -> extension
+_IMAGE_TYPES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\x00\x00\x01\x00', 'ico'),
+    (b'GIF8', 'gif'),
+    (b'\xff\xd8\xff', 'jpg'),
+)
+_MIME_TYPES = {'png': 'image/png', 'ico': 'image/x-icon', 'gif': 'image/gif', 'jpg': 'image/jpeg',
+               'webp': 'image/webp', 'svg': 'image/svg+xml'}
+
+_GOOGLE_IMG_RE = re.compile(
+    r'<img src="https://www\.google\.com/s2/favicons\?domain=([^"&]+)[^"]*" class="site-favicon"[^>]*>')
+_LOCAL_SPAN_RE = re.compile(r'<span class="site-favicon favicon-([a-z0-9-]+)"')
+# La feuille peut être chargée sous son nom empreinté (fingerprint.py)
+_STYLESHEET_REF_RE = re.compile(r'favicons(?:\.[0-9a-f]+)?\.css')
+# Style des <span> qui remplacent les <img> (dans la feuille générée: il n'existe qu'avec elle)
+_SPAN_RULE = ".writeup-content span.site-favicon{display:inline-block;flex-shrink:0;background:center/contain no-repeat}"
+_STYLESHEET_LINK = ('<link rel="stylesheet" href="{href}" media="print" onload="this.media=\'all\'">\n'
+                    '    <noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+
+def favicon_class(domain: str) -> str:
+    """Suffixe de classe CSS d'un domaine: github.com -> github-com."""
+    return re.sub(r'[^a-z0-9]+', '-', domain.lower()).strip('-')
+
+
+def image_type(data: bytes):
+    """Extension d'une image d'après sa signature, ou None si ce n'est pas une image."""
+    for magic, ext in _IMAGE_TYPES:
+        if data.startswith(magic):
+            return ext
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    if b'<svg' in data[:512]:
+        return 'svg'
+    return None
+
+
+def fetch_favicon(domain: str, sources=FAVICON_SOURCES):
+    """Télécharge le favicon d'un domaine.
+
+    Renvoie (octets, extension), None si les sources ont répondu sans image (échec
+    mémorisé), ou False si aucune n'a été joignable (réseau: on réessaiera).
+    """
+    answered = False
+    for source in sources:
+        request = urllib.request.Request(source.format(domain=domain), headers={'User-Agent': USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+                data = response.read(MAX_FAVICON_BYTES + 1)
+        except urllib.error.HTTPError:
+            answered = True
+            continue
+        except (OSError, ValueError):
+            continue
+        answered = True
+        ext = image_type(data)
+        if ext and len(data) <= MAX_FAVICON_BYTES:
+            return data, ext
+    return None if answered else False
+
+
+def load_index() -> dict:
+    """Domaine -> nom du fichier dans assets/favicons/, ou None si le téléchargement a échoué."""
+    try:
+        with open(INDEX_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(index: dict) -> None:
+    tmp_path = INDEX_PATH.with_name(INDEX_PATH.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(sorted(index.items())), f, indent=2)
+    os.replace(tmp_path, INDEX_PATH)
+
+
+def update_cache(domains: set, index: dict, refresh: bool = False, retry_missing: bool = False,
+                 sources=FAVICON_SOURCES) -> int:
+    """Télécharge les favicons manquants (en parallèle) ; renvoie le nombre de téléchargements réussis."""
+    todo = sorted(d for d in domains
+                  if refresh or d not in index or (retry_missing and index[d] is None))
+    if not todo:
+        return 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = list(pool.map(lambda domain: fetch_favicon(domain, sources), todo))
+
+    fetched = 0
+    for domain, result in zip(todo, results):
+        if result is False:
+            print(f"[-] {domain}: injoignable, sera retente")
+            continue
+        if result is None:
+            print(f"[-] Pas de favicon pour {domain}")
+            index.setdefault(domain, None)
+            continue
+        data, ext = result
+        name = f"{favicon_class(domain)}.{ext}"
+        FAVICONS_DIR.mkdir(parents=True, exist_ok=True)
+        (FAVICONS_DIR / name).write_bytes(data)
+        index[domain] = name
+        fetched += 1
+        print(f"[+] {domain} ({len(data)} octets)")
+    if index:
+        save_index(index)
+    return fetched
+
+
+def write_stylesheet(domains: set, index: dict) -> bool:
+    """Écrit assets/favicons.css pour les domaines utilisés ; renvoie True si le fichier a changé."""
+    rules = ["/* Généré par scripts/favicons.py - ne pas modifier */", _SPAN_RULE]
+    for domain in sorted(d for d in domains if index.get(d)):
+        name = index[domain]
+        data = base64.b64encode((FAVICONS_DIR / name).read_bytes()).decode('ascii')
+        mime = _MIME_TYPES[name.rsplit('.', 1)[1]]
+        rules.append(f'.site-favicon.favicon-{favicon_class(domain)}'
+                     f'{{background-image:url("data:{mime};base64,{data}")}}')
+    css = "\n".join(rules) + "\n"
+    if STYLESHEET_PATH.exists() and STYLESHEET_PATH.read_text() == css:
+        return False
+    if len(rules) == 2 and not STYLESHEET_PATH.exists():
+        return False
+    STYLESHEET_PATH.write_text(css)
+    return True
+
+
+def rewrite_page(content: str, page_path: Path, index: dict):
+    """Remplace les <img> Google des domaines en cache ; renvoie (contenu, nombre d'images remplacées)."""
+    replaced = 0
+
+    def replace(match):
+        nonlocal replaced
+        domain = match.group(1)
+        if not index.get(domain):
+            return match.group(0)
+        replaced += 1
+        return f'<span class="site-favicon favicon-{favicon_class(domain)}" aria-hidden="true"></span>'
+
+    content = _GOOGLE_IMG_RE.sub(replace, content)
+    if _LOCAL_SPAN_RE.search(content) and not _STYLESHEET_REF_RE.search(content):
+        href = os.path.relpath(STYLESHEET_PATH, page_path.parent).replace(os.sep, '/')
+        content = content.replace('</head>', f'    {_STYLESHEET_LINK.format(href=href)}\n</head>', 1)
+    return content, replaced
+
+
+def build(refresh: bool = False, retry_missing: bool = False, offline: bool = False, sources=None) -> int:
+    """Cache, feuille de style et réécriture des pages ; renvoie le nombre de favicons rendus locaux."""
+    # Domaines des favicons Google encore présents et des favicons déjà locaux
+    pages = {}
+    domains = set()
+    index = load_index()
+    by_class = {favicon_class(domain): domain for domain in index}
+    for page, entry in link_index.iter_pages():
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        google = _GOOGLE_IMG_RE.findall(content)
+        local = _LOCAL_SPAN_RE.findall(content)
+        if google or local:
+            pages[page] = content
+            domains.update(google)
+            domains.update(by_class[cls] for cls in local if cls in by_class)
+    print(f"[*] {len(domains)} domaine(s) dans {len(pages)} page(s)")
+
+    if not offline:
+        update_cache(domains, index, refresh, retry_missing, sources or FAVICON_SOURCES)
+    if write_stylesheet(domains, index):
+        print(f"[+] {STYLESHEET_PATH.relative_to(PROJECT_ROOT)} reecrit")
+
+    total = 0
+    for page, content in pages.items():
+        path = PROJECT_ROOT / page
+        new_content, replaced = rewrite_page(content, path, index)
+        if new_content != content:
+            path.write_text(new_content, encoding='utf-8')
+            print(f"[+] {page}: {replaced} favicon(s) local(aux)")
+            total += replaced
+    missing = sorted(d for d in domains if not index.get(d))
+    print(f"[*] {total} requete(s) vers google.com supprimee(s)"
+          + (f", {len(missing)} domaine(s) sans favicon local: {', '.join(missing)}" if missing else ""))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Héberge les favicons des intégrations de liens.")
+    parser.add_argument("--refresh", action="store_true", help="retélécharge tous les favicons")
+    parser.add_argument("--retry-missing", action="store_true", help="réessaie les domaines en échec")
+    parser.add_argument("--offline", action="store_true", help="n'utilise que le cache, sans réseau")
+    parser.add_argument("--source", action="append",
+                        help="modèle d'URL avec {domain} (répétable, remplace FAVICON_SOURCES)")
+    args = parser.parse_args()
+    build(args.refresh, args.retry_missing, args.offline, args.source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Empreintes de contenu des CSS/JS/images partagés, pour un cache long côté navigateur/CDN.
+Usage: python fingerprint.py [--check]
+
+Chaque asset partagé (FINGERPRINT_GLOBS) référencé par une page est copié à côté
+de l'original sous un nom qui contient le hash de son contenu
+(static/styles.min.css -> static/styles.min.<hash>.css), et toutes les pages
+HTML sont réécrites pour charger la copie. Les url() des CSS pointent aussi
+vers les images empreintées, et le hash d'une CSS est calculé après cette
+réécriture: une image modifiée change donc aussi le nom des CSS qui l'utilisent.
+
+Le hash ne dépend que du contenu: un asset inchangé garde son nom d'un build à
+l'autre et reste en cache. Les fichiers d'origine restent la référence (on les
+édite, minify.py les régénère) ; une page qui charge déjà une copie empreintée
+est rattachée à l'asset d'origine puis au hash courant. MANIFEST_PATH associe
+chaque asset à sa copie ; les copies qui n'y sont plus sont supprimées.
+
+Les partials (SOURCE_PARTIALS, inlinés par navbar.py) sont des sources: ils
+gardent les noms d'origine, navbar.py passe par le manifest en les inlinant.
+Les copies sont des artefacts de build, ignorées par git et générées au
+déploiement (.github/workflows/pages.yml).
+
+--check ne modifie rien: code de sortie 1 si une copie manque ou si une page
+charge un asset non empreinté ou périmé.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import unquote
+
+import link_index
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+# Asset d'origine (relatif à la racine) -> copie empreintée
+MANIFEST_PATH = PROJECT_ROOT / "static" / "assets.json"
+MANIFEST_VERSION = 1
+
+# Assets partagés entre les pages (les images propres à un writeup ne sont pas concernées)
+FINGERPRINT_GLOBS = ("static/*", "assets/*", "writeups/*.css", "Portfolio/*.js")
+FINGERPRINT_EXTENSIONS = {".css", ".js", ".webp", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico",
+                          ".webm", ".mp4", ".woff2"}
+HASH_LENGTH = 10
+# Fichiers sources inlinés dans les pages, jamais réécrits vers les copies
+SOURCE_PARTIALS = {"writeups/navbar.html"}
+
+_HASHED_NAME_RE = re.compile(rf'^(.+)\.[0-9a-f]{{{HASH_LENGTH}}}(\.[^./]+)$')
+_REF_RE = re.compile(r'((?:src|href|poster)=")([^"]+)(")')
+_CSS_URL_RE = re.compile(r'(url\(\s*[\'"]?)([^\'")]+)([\'"]?\s*\))')
+# CSS inline des pages (critical_css.py): ses url() sont aussi empreintées
+_STYLE_RE = re.compile(r'(<style[^>]*>)(.*?)(</style>)', re.DOTALL)
+
+
+def logical_name(path: str) -> str:
+    """static/styles.min.0123456789.css -> static/styles.min.css (inchangé sinon)."""
+    match = _HASHED_NAME_RE.match(path)
+    return f"{match.group(1)}{match.group(2)}" if match else path
+
+
+def hashed_name(path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def resolve(ref: str, base_dir: Path):
+    """Asset d'origine (relatif à la racine) visé par une référence locale, ou None."""
+    if ref.startswith(('http://', 'https://', '//', 'data:', 'mailto:', '#')):
+        return None
+    path = unquote(ref.split('#', 1)[0].split('?', 1)[0])
+    if not path:
+        return None
+    target = PROJECT_ROOT / path.lstrip('/') if path.startswith('/') else base_dir / path
+    relpath = os.path.relpath(os.path.normpath(target), PROJECT_ROOT).replace(os.sep, '/')
+    relpath = logical_name(relpath)
+    if os.path.splitext(relpath)[1].lower() not in FINGERPRINT_EXTENSIONS:
+        return None
+    if not any(fnmatch(relpath, pattern) for pattern in FINGERPRINT_GLOBS):
+        return None
+    return relpath if (PROJECT_ROOT / relpath).is_file() else None
+
+
+def rewrite_ref(ref: str, hashed: str) -> str:
+    """Remplace le nom de fichier d'une référence par celui de la copie, sans toucher au reste."""
+    head, sep, suffix = ref.partition('?') if '?' in ref else ref.partition('#')
+    directory, _, filename = head.rpartition('/')
+    stem, ext = os.path.splitext(logical_name(filename))
+    digest = os.path.splitext(hashed)[0].rsplit('.', 1)[1]
+    return f"{directory}{'/' if directory else ''}{stem}.{digest}{ext}{sep}{suffix}"
+
+
+def _rewrite(pattern, content: str, base_dir: Path, manifest: dict):
+    """Réécrit les références de `content` vers les copies du manifest ; renvoie (contenu, nombre)."""
+    replaced = 0
+
+    def replace(match):
+        nonlocal replaced
+        asset = resolve(match.group(2), base_dir)
+        if asset not in manifest:
+            return match.group(0)
+        new_ref = rewrite_ref(match.group(2), manifest[asset])
+        if new_ref == match.group(2):
+            return match.group(0)
+        replaced += 1
+        return f"{match.group(1)}{new_ref}{match.group(3)}"
+
+    return pattern.sub(replace, content), replaced
+
+
+def _rewrite_page(content: str, base_dir: Path, manifest: dict):
+    """Références src/href/poster et url() des <style> d'une page ; renvoie (contenu, nombre)."""
+    content, replaced = _rewrite(_REF_RE, content, base_dir, manifest)
+    styles = 0
+
+    def replace(match):
+        nonlocal styles
+        css, count = _rewrite(_CSS_URL_RE, match.group(2), base_dir, manifest)
+        styles += count
+        return f"{match.group(1)}{css}{match.group(3)}"
+
+    return _STYLE_RE.sub(replace, content), replaced + styles
+
+
+def _unhash_refs(content: str, base_dir: Path):
+    """Ramène les références empreintées d'un partial aux noms d'origine ; renvoie (contenu, nombre)."""
+    restored = 0
+
+    def replace(match):
+        nonlocal restored
+        ref = match.group(2)
+        if resolve(ref, base_dir) is None:
+            return match.group(0)
+        head, sep, suffix = ref.partition('?') if '?' in ref else ref.partition('#')
+        logical = logical_name(head)
+        if logical == head:
+            return match.group(0)
+        restored += 1
+        return f"{match.group(1)}{logical}{sep}{suffix}{match.group(3)}"
+
+    return _REF_RE.sub(replace, content), restored
+
+
+def collect_assets(pages: dict) -> set:
+    """Assets référencés par les pages et, récursivement, par les url() des CSS."""
+    assets = set()
+    for page, content in pages.items():
+        base_dir = (PROJECT_ROOT / page).parent
+        assets.update(filter(None, (resolve(m.group(2), base_dir) for m in _REF_RE.finditer(content))))
+        for style in _STYLE_RE.finditer(content):
+            assets.update(filter(None, (resolve(m.group(2), base_dir)
+                                        for m in _CSS_URL_RE.finditer(style.group(2)))))
+    for asset in [a for a in assets if a.endswith('.css')]:
+        css = (PROJECT_ROOT / asset).read_text(encoding='utf-8')
+        base_dir = (PROJECT_ROOT / asset).parent
+        assets.update(filter(None, (resolve(m.group(2), base_dir) for m in _CSS_URL_RE.finditer(css))))
+    return assets
+
+
+def fingerprint_assets(assets: set) -> tuple:
+    """Hash de chaque asset ; renvoie (manifest asset -> copie, {copie: contenu})."""
+    manifest = {}
+    contents = {}
+    # Les CSS en dernier: leur contenu dépend des noms empreintés des images
+    for asset in sorted(assets, key=lambda a: (a.endswith('.css'), a)):
+        path = PROJECT_ROOT / asset
+        data = path.read_bytes()
+        if asset.endswith('.css'):
+            css, _ = _rewrite(_CSS_URL_RE, data.decode('utf-8'), path.parent, manifest)
+            data = css.encode('utf-8')
+        manifest[asset] = hashed_name(asset, hashlib.sha256(data).hexdigest())
+        contents[manifest[asset]] = data
+    return manifest, contents
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST_PATH, 'r') as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data["assets"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    tmp_path = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": MANIFEST_VERSION, "assets": dict(sorted(manifest.items()))}, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def build(check: bool = False) -> bool:
+    """Copies, pages et manifest à jour ; en mode check, renvoie False si quelque chose ne l'était pas."""
+    pages = {}
+    for page, entry in link_index.iter_pages(PROJECT_ROOT):
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            pages[page.replace(os.sep, '/')] = f.read()
+    stale = 0
+
+    # Partials: noms d'origine (une copie empreintée y deviendrait un lien mort au prochain hash)
+    for page in SOURCE_PARTIALS & set(pages):
+        content, restored = _unhash_refs(pages.pop(page), (PROJECT_ROOT / page).parent)
+        if not restored:
+            continue
+        stale += 1
+        if check:
+            print(f"[-] {page}: {restored} reference(s) empreintee(s) dans un partial")
+            continue
+        with open(PROJECT_ROOT / page, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"[+] {page}: {restored} reference(s) ramenee(s) au nom d'origine")
+
+    manifest, contents = fingerprint_assets(collect_assets(pages))
+
+    # Copies empreintées (jamais réécrites: même nom, même contenu)
+    for hashed, data in contents.items():
+        path = PROJECT_ROOT / hashed
+        if path.exists():
+            continue
+        stale += 1
+        if check:
+            print(f"[-] Copie manquante: {hashed}")
+            continue
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        print(f"[+] {hashed}")
+
+    for page, content in pages.items():
+        new_content, replaced = _rewrite_page(content, (PROJECT_ROOT / page).parent, manifest)
+        if not replaced:
+            continue
+        stale += 1
+        if check:
+            print(f"[-] {page}: {replaced} reference(s) non empreintee(s) ou perimee(s)")
+            continue
+        with open(PROJECT_ROOT / page, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+        print(f"[+] {page}: {replaced} reference(s) mise(s) a jour")
+
+    previous = load_manifest()
+    if check:
+        ok = not stale and previous == manifest
+        print("[+] Empreintes a jour" if ok else "[-] Empreintes perimees: lancer scripts/fingerprint.py")
+        return ok
+
+    # Anciennes copies que plus aucune page ne charge
+    current = set(manifest.values())
+    for hashed in set(previous.values()) - current:
+        try:
+            (PROJECT_ROOT / hashed).unlink()
+            print(f"[-] {hashed} supprime")
+        except OSError:
+            pass
+    if previous != manifest:
+        save_manifest(manifest)
+    print(f"[*] {len(manifest)} asset(s) empreinte(s), {stale} copie(s)/page(s) mise(s) a jour")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copies empreintées des assets partagés et pages à jour.")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si rien n'est à jour)")
+    args = parser.parse_args()
+    if not build(args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
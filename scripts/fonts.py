@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Polices auto-hébergées: sous-ensembles WOFF2 des Zalando Sans et @font-face inlinés dans les pages.
+Usage: python fonts.py [--sources DOSSIER] [--force] [--check]
+
+Les pages chargeaient les familles depuis fonts.googleapis.com: deux connexions
+de plus (preconnect) et une feuille CSS à télécharger avant de connaître les
+fichiers de police. Ici, à partir des fichiers fournis localement (FONT_FILES,
+les TTF variables de Google Fonts, dans --sources):
+  1. les caractères de toutes les pages (texte visible hors code, alt/title/aria-label),
+     des scripts du site (texte injecté) et ALWAYS_INCLUDED sont collectés ;
+  2. chaque police est réduite à ces caractères et écrite en WOFF2 dans
+     FONTS_DIR (fontTools + brotli, dépendances optionnelles). Le sous-ensemble
+     n'est recalculé que si ces caractères, la source ou les réglages ont
+     changé (CACHE_PATH) ;
+  3. dans chaque page qui chargeait une famille, les <link> Google Fonts et
+     leurs preconnect sont remplacés par un <style id="font-faces"> (règles
+     @font-face, font-display: swap) et un preload du style droit de chaque
+     famille.
+
+Tant qu'une famille n'a pas tous ses fichiers WOFF2, les pages gardent Google
+Fonts pour elle: sans sources ni fontTools, rien ne change.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from html.parser import HTMLParser
+from urllib.parse import unquote_plus
+
+import link_index
+import minify
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+# Polices sources (non publiées) et sous-ensembles générés
+SOURCES_DIR = SCRIPT_DIR / "fonts"
+FONTS_DIR = PROJECT_ROOT / "assets" / "fonts"
+# Caractères -> hash du dernier sous-ensemble de chaque police, pour ne pas le recalculer
+CACHE_PATH = SCRIPT_DIR / ".fonts_cache.json"
+CACHE_VERSION = 1
+
+# Fichier source -> (famille CSS, style, graisses de l'axe wght)
+FONT_FILES = {
+    "ZalandoSans[wght].ttf": ("Zalando Sans", "normal", "200 900"),
+    "ZalandoSans-Italic[wght].ttf": ("Zalando Sans", "italic", "200 900"),
+    "ZalandoSansExpanded[wght].ttf": ("Zalando Sans Expanded", "normal", "200 900"),
+    "ZalandoSansExpanded-Italic[wght].ttf": ("Zalando Sans Expanded", "italic", "200 900"),
+}
+FONT_DISPLAY = "swap"
+
+# Toujours gardés: ASCII imprimable et caractères français qu'un script peut afficher
+ALWAYS_INCLUDED = "".join(chr(c) for c in range(0x20, 0x7f)) + \
+    " àâäçéèêëîïôöùûüÿœæÀÂÄÇÉÈÊËÎÏÔÖÙÛÜŸŒÆ«»‘’“”–—…•€"
+
+# Fichiers dont le texte peut s'afficher sans être dans le HTML
+SCRIPT_GLOBS = ("static/script.js", "Portfolio/gallery.js")
+
+_GOOGLE_LINK_RE = re.compile(r'[ \t]*(?:<noscript>)?<link\b[^>]*href="https://fonts\.googleapis\.com/css2\?'
+                             r'([^"]*)"[^>]*>(?:</noscript>)?\n?')
+_PRECONNECT_RE = re.compile(r'[ \t]*<link rel="preconnect" href="https://fonts\.(?:googleapis|gstatic)\.com"'
+                            r'[^>]*>\n?')
+_GOOGLE_COMMENT_RE = re.compile(r'[ \t]*<!--[^>]*Google Fonts[^>]*-->\n?')
+_FONT_PRELOAD_RE = re.compile(r'[ \t]*<link rel="preload" href="[^"]*" as="font"[^>]*>\n?')
+_FONT_FACES_RE = re.compile(r'[ \t]*<style id="font-faces">(.*?)</style>\n?', re.DOTALL)
+_FACE_FAMILY_RE = re.compile(r'font-family:\s*"([^"]+)"')
+# Copies empreintées par fingerprint.py: comparées sous leur nom d'origine
+_HASHED_FONT_RE = re.compile(r'(assets/fonts/[^"\')]+)\.[0-9a-f]{10}(\.woff2)')
+
+
+def fonttools_available() -> bool:
+    """fontTools et brotli (pour écrire du WOFF2)."""
+    try:
+        import fontTools.subset  # noqa: F401
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def output_name(source: str) -> str:
+    """ZalandoSansExpanded-Italic[wght].ttf -> zalando-sans-expanded-italic.woff2"""
+    family, style, _ = FONT_FILES[source]
+    return f"{family.lower().replace(' ', '-')}-{style}.woff2"
+
+
+class TextCollector(HTMLParser):
+    """Texte affiché d'une page en Zalando Sans: hors scripts, styles et code (police monospace)."""
+
+    ATTRIBUTES = ("alt", "title", "aria-label", "placeholder")
+    SKIPPED = ("script", "style", "pre", "code")
+
+    def __init__(self):
+        super().__init__()
+        self.chars = set()
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self.skip += 1
+        for name, value in attrs:
+            if name in self.ATTRIBUTES and value:
+                self.chars.update(value)
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.chars.update(data)
+
+
+def _script_strings(source: str) -> set:
+    """Caractères des chaînes et templates d'un script."""
+    chars = set()
+    i = 0
+    while i < len(source):
+        if source[i] in '"\'':
+            end = minify._skip_string(source, i)
+        elif source[i] == '`':
+            end = minify._skip_template(source, i)
+        else:
+            i += 1
+            continue
+        chars.update(source[i + 1:end - 1])
+        i = end
+    return chars
+
+
+def collect_text() -> str:
+    """Caractères à garder dans les polices, triés (l'ordre compte pour le hash)."""
+    chars = set(ALWAYS_INCLUDED)
+    for _, entry in link_index.iter_pages(PROJECT_ROOT):
+        collector = TextCollector()
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            collector.feed(f.read())
+        chars |= collector.chars
+    for pattern in SCRIPT_GLOBS:
+        for path in PROJECT_ROOT.glob(pattern):
+            chars |= _script_strings(path.read_text(encoding='utf-8'))
+    return "".join(sorted(c for c in chars if c.isprintable() or c == " "))
+
+
+def subset_font(source_path: Path, dest_path: Path, text: str) -> None:
+    """Écrit le sous-ensemble WOFF2 de `source_path` limité aux caractères de `text`."""
+    from fontTools import subset
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    options.desubroutinize = True
+    font = subset.load_font(str(source_path), options)
+    try:
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        tmp_path = dest_path.with_name(dest_path.name + ".tmp")
+        subset.save_font(font, str(tmp_path), options)
+        os.replace(tmp_path, dest_path)
+    finally:
+        font.close()
+
+
+def load_cache() -> dict:
+    try:
+        with open(CACHE_PATH, 'r') as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data["fonts"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_cache(fonts: dict) -> None:
+    tmp_path = CACHE_PATH.with_name(CACHE_PATH.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": CACHE_VERSION, "fonts": fonts}, f, indent=2)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def update_subsets(sources_dir: Path = SOURCES_DIR, force: bool = False, check: bool = False) -> list:
+    """Sous-ensembles WOFF2 à jour ; renvoie ceux qui ne l'étaient pas."""
+    sources = {name: sources_dir / name for name in FONT_FILES if (sources_dir / name).is_file()}
+    if not sources:
+        print(f"[!] Aucune police source dans {sources_dir}: les pages gardent Google Fonts")
+        return []
+    if not fonttools_available():
+        print("[!] fontTools/brotli absents (pip install fonttools brotli): sous-ensembles non regeneres")
+        return []
+
+    text = collect_text()
+    cache = load_cache()
+    stale = []
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    for name, source_path in sources.items():
+        dest_path = FONTS_DIR / output_name(name)
+        digest = hashlib.sha256(source_path.read_bytes() + text.encode('utf-8')
+                                + json.dumps(FONT_FILES[name]).encode('utf-8')).hexdigest()
+        if not force and cache.get(name) == digest and dest_path.exists():
+            continue
+        stale.append(dest_path.name)
+        if check:
+            print(f"[-] {dest_path.relative_to(PROJECT_ROOT)} n'est plus a jour")
+            continue
+        subset_font(source_path, dest_path, text)
+        cache[name] = digest
+        print(f"[+] {dest_path.relative_to(PROJECT_ROOT)}: {source_path.stat().st_size / 1024:.0f}KB -> "
+              f"{dest_path.stat().st_size / 1024:.0f}KB ({len(text)} caracteres)")
+    if stale and not check:
+        save_cache(cache)
+    return stale
+
+
+def built_families() -> dict:
+    """Familles dont tous les styles ont leur WOFF2: famille -> [(fichier, style, graisses)]."""
+    families = {}
+    for name, (family, style, weights) in FONT_FILES.items():
+        families.setdefault(family, []).append((output_name(name), style, weights))
+    return {family: faces for family, faces in families.items()
+            if all((FONTS_DIR / filename).exists() for filename, _, _ in faces)}
+
+
+def page_families(content: str) -> list:
+    """Familles que la page charge (liens Google Fonts ou @font-face déjà inlinés), dans l'ordre."""
+    families = []
+    for match in _GOOGLE_LINK_RE.finditer(content):
+        for param in match.group(1).split('&'):
+            if param.startswith('family='):
+                families.append(unquote_plus(param[len('family='):]).split(':', 1)[0])
+    faces = _FONT_FACES_RE.search(content)
+    if faces:
+        families.extend(_FACE_FAMILY_RE.findall(faces.group(1)))
+    return list(dict.fromkeys(families))
+
+
+def font_head(families: list, built: dict, page: str, indent: str) -> str:
+    """Preloads et <style id="font-faces"> d'une page."""
+    fonts_url = os.path.relpath(FONTS_DIR, (PROJECT_ROOT / page).parent).replace(os.sep, '/')
+    preloads = []
+    faces = []
+    for family in families:
+        for filename, style, weights in built[family]:
+            url = f"{fonts_url}/{filename}"
+            if style == "normal":
+                preloads.append(f'{indent}<link rel="preload" href="{url}" as="font" type="font/woff2" crossorigin>\n')
+            faces.append(f'@font-face{{font-family:"{family}";font-style:{style};font-weight:{weights};'
+                         f'font-display:{FONT_DISPLAY};src:url("{url}") format("woff2")}}')
+    return "".join(preloads) + f'{indent}<style id="font-faces">{"".join(faces)}</style>\n'
+
+
+def inline_fonts(content: str, page: str, built: dict = None) -> str:
+    """Remplace Google Fonts par les polices auto-hébergées dans une page (inchangée si rien n'est prêt)."""
+    built = built_families() if built is None else built
+    families = page_families(content)
+    if not families or not all(family in built for family in families):
+        return content
+
+    # Comparaison sur les noms d'origine: fingerprint.py renomme ensuite les fichiers
+    current = _HASHED_FONT_RE.sub(r'\1\2', content)
+    head, sep, body = current.partition('</head>')
+    anchors = [m for pattern in (_GOOGLE_COMMENT_RE, _PRECONNECT_RE, _GOOGLE_LINK_RE, _FONT_PRELOAD_RE,
+                                   _FONT_FACES_RE)
+               for m in pattern.finditer(head)
+               if pattern is not _FONT_PRELOAD_RE or FONTS_DIR.name in m.group(0)]
+    first = min(anchors, key=lambda m: m.start())
+    indent = re.match(r'[ \t]*', first.group(0)).group(0)
+    position = first.start()
+    for match in sorted(anchors, key=lambda m: m.start(), reverse=True):
+        head = head[:match.start()] + head[match.end():]
+        if match.start() < position:
+            position -= match.end() - match.start()
+    head = head[:position] + font_head(families, built, page, indent) + head[position:]
+    new_content = head + sep + body
+    return content if new_content == current else new_content
+
+
+def build(sources_dir: Path = SOURCES_DIR, force: bool = False, check: bool = False) -> bool:
+    """Sous-ensembles et pages à jour ; en mode check, renvoie False si quelque chose ne l'était pas."""
+    stale = update_subsets(sources_dir, force, check)
+    built = built_families()
+    pages = 0
+    for page, entry in link_index.iter_pages(PROJECT_ROOT):
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content = inline_fonts(content, page, built)
+        if new_content == content:
+            continue
+        pages += 1
+        if check:
+            print(f"[-] {page}: polices a inliner")
+            continue
+        with open(entry.path, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+        print(f"[+] {page}: {', '.join(page_families(new_content))} auto-hebergee(s)")
+    print(f"[*] {len(built)} famille(s) auto-hebergee(s), {len(stale)} sous-ensemble(s) "
+          f"{'perime(s)' if check else 'regenere(s)'}, {pages} page(s) {'a reecrire' if check else 'reecrite(s)'}")
+    return not (check and (stale or pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sous-ensembles WOFF2 auto-hébergés et @font-face inlinés.")
+    parser.add_argument("--sources", type=Path, default=SOURCES_DIR, help="dossier des polices sources (FONT_FILES)")
+    parser.add_argument("--force", action="store_true", help="recalcule les sous-ensembles même inchangés")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si rien n'est à jour)")
+    args = parser.parse_args()
+    if not build(args.sources, args.force, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
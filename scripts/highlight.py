@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Coloration syntaxique des blocs de code des writeups au build, sans Prism côté navigateur.
+Usage: python highlight.py [page ...] [--check]
+
+Les blocs <code class="language-..."> sont découpés par Pygments et réécrits
+avec les classes de Prism (<span class="token keyword">...), que writeups.css
+colore déjà: le rendu est le même, sans aucun script. Les classes de langage
+sont normalisées au passage (language-Bash / language-Shell -> language-bash).
+
+Sans Pygments (dépendance optionnelle), ou pour un langage qu'il ne connaît pas,
+la page garde Prism mais ne charge que le cœur et les composants des langages
+qu'elle contient vraiment. Dans les deux cas les <script> Prism des pages sont
+remplacés et les octets de script économisés sont affichés par page.
+
+add_writeup.py applique la même chose aux pages qu'il génère ; ce script sert
+au rattrapage des pages existantes (writeups/*/index.html par défaut).
+"""
+
+import re
+import sys
+import html
+import argparse
+import urllib.request
+from pathlib import Path
+from functools import lru_cache
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+WRITEUPS_DIR = PROJECT_ROOT / "writeups"
+
+PRISM_CDN = "https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0"
+
+# Langage (classe language-*) -> lexer Pygments ; None: texte brut, rien à colorer
+LEXERS = {
+    "bash": "bash",
+    "json": "json",
+    "sql": "sql",
+    "python": "python",
+    "php": "php",
+    "javascript": "javascript",
+    "html": "html",
+    "xml": "xml",
+    "css": "css",
+    "text": None,
+}
+LANGUAGE_ALIASES = {"shell": "bash", "sh": "bash", "plain": "text", "undefined": "text", "js": "javascript"}
+
+# Composants Prism par langage (le cœur couvre déjà markup/html/xml, css et javascript)
+# Constantes que Prism colore en boolean (les autres Keyword.Constant restent des mots-clés)
+BOOLEAN_WORDS = {"true", "false", "null", "True", "False", "None"}
+# Classes propres à un langage: clés des objets JSON en property, comme Prism
+LANGUAGE_CLASSES = {"json": {"Name.Tag": "property"}}
+
+PRISM_COMPONENTS = {
+    "bash": ("bash",),
+    "json": ("json",),
+    "sql": ("sql",),
+    "python": ("python",),
+    "php": ("markup-templating", "php"),
+}
+
+_CODE_RE = re.compile(r'(<pre\b[^>]*>\s*)?<code class="([^"]*)"([^>]*)>(.*?)</code>', re.DOTALL)
+_PRISM_SCRIPT_RE = re.compile(r'[ \t]*<script src="[^"]*prism[^"]*"[^>]*></script>\n?')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def normalize_language(classes: str):
+    """'language-Plain text' -> ('text', 'language-text') ; (None, classes) sans classe de langage."""
+    match = re.match(r'language-(\S+)(?: text)?', classes)
+    if not match:
+        return None, classes
+    language = match.group(1).lower()
+    language = LANGUAGE_ALIASES.get(language, language)
+    return language, f"language-{language}{classes[match.end():]}"
+
+
+def pygments_available() -> bool:
+    try:
+        import pygments  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _token_classes():
+    """Type de token Pygments -> classes Prism (le type parent le plus proche l'emporte)."""
+    from pygments import token as t
+    return {
+        t.Comment: "comment", t.Comment.Preproc: "prolog", t.Comment.Hashbang: "comment",
+        t.Keyword: "keyword", t.Keyword.Constant: "keyword", t.Keyword.Type: "class-name",
+        t.Name.Builtin: "builtin", t.Name.Builtin.Pseudo: "keyword",
+        t.Name.Function: "function", t.Name.Function.Magic: "function", t.Name.Class: "class-name",
+        t.Name.Decorator: "function", t.Name.Tag: "tag", t.Name.Attribute: "attr-name",
+        t.Name.Variable: "variable", t.Name.Constant: "constant", t.Name.Entity: "entity",
+        t.Name.Exception: "class-name",
+        t.String: "string", t.String.Escape: "string", t.String.Interpol: "interpolation",
+        t.String.Regex: "regex",
+        t.Number: "number", t.Operator: "operator", t.Operator.Word: "keyword",
+        t.Punctuation: "punctuation",
+        t.Generic.Deleted: "deleted", t.Generic.Inserted: "inserted",
+    }
+
+
+def _token_class(ttype, value: str, language: str = None):
+    from pygments import token as t
+    if ttype in t.Keyword.Constant and value in BOOLEAN_WORDS:
+        return "boolean"
+    overrides = LANGUAGE_CLASSES.get(language, {})
+    classes = _token_classes()
+    while ttype is not None:
+        name = str(ttype).removeprefix("Token.")
+        if name in overrides:
+            return overrides[name]
+        if ttype in classes:
+            return classes[ttype]
+        ttype = ttype.parent
+    return None
+
+
+def highlight_code(code: str, language: str):
+    """HTML coloré (classes Prism) d'un code brut, ou None si le langage n'est pas géré.
+
+    Un bloc que le lexer ne comprend pas (tokens Error: requête HTTP étiquetée JSON,
+    etc.) est rendu en texte brut plutôt que découpé en tokens au hasard.
+    """
+    from pygments import token as t
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+    try:
+        options = {"startinline": True} if language == "php" else {}
+        lexer = get_lexer_by_name(LEXERS[language], stripnl=False, **options)
+    except (KeyError, ClassNotFound):
+        return None
+    # Les lexers ont besoin du saut de ligne final (commentaire en fin de bloc) ; il est retiré ensuite
+    tokens = list(lexer.get_tokens(code))
+    if not code.endswith('\n') and tokens and tokens[-1][1].endswith('\n'):
+        tokens[-1] = (tokens[-1][0], tokens[-1][1][:-1])
+    if any(ttype in t.Error for ttype, _ in tokens):
+        return html.escape("".join(value for _, value in tokens), quote=False)
+    out = []
+    for ttype, value in tokens:
+        text = html.escape(value, quote=False)
+        cls = _token_class(ttype, value, language)
+        out.append(f'<span class="token {cls}">{text}</span>' if cls and value.strip() else text)
+    return "".join(out)
+
+
+def highlight_html(content: str, highlight: bool = None):
+    """Colore les blocs de code d'une page.
+
+    Renvoie (contenu, langages encore à colorer par Prism, blocs colorés).
+    """
+    if highlight is None:
+        highlight = pygments_available()
+    pending = set()
+    highlighted = 0
+
+    def replace(match):
+        nonlocal highlighted
+        pre, classes, attrs, inner = match.groups()
+        language, classes = normalize_language(classes)
+        if language is None or LEXERS.get(language, ...) is None:
+            return f'{pre or ""}<code class="{classes}"{attrs}>{inner}</code>'
+        if highlight and language in LEXERS:
+            # Le texte du bloc tel qu'affiché ; les '<' non échappés des exports redeviennent du texte.
+            # Un bloc déjà coloré est recoloré depuis son texte (règles de LEXERS/_token_classes à jour)
+            code = _TAG_RE.sub('', inner) if 'class="token ' in inner else inner
+            new_inner = highlight_code(html.unescape(code), language)
+            if new_inner == inner:
+                new_inner = inner
+        elif 'class="token ' in inner:
+            new_inner = inner
+        else:
+            new_inner = None
+        if new_inner is None:
+            pending.add(language)
+            new_inner = inner
+        else:
+            highlighted += new_inner is not inner
+        # Prism ajoute aussi la classe au <pre> (writeups.css s'en sert)
+        if pre and f"language-{language}" not in pre:
+            pre = re.sub(r'class="([^"]*)"', lambda m: f'class="{m.group(1)} language-{language}"', pre, count=1) \
+                if 'class="' in pre else pre.replace('<pre', f'<pre class="language-{language}"', 1)
+        return f'{pre or ""}<code class="{classes}"{attrs}>{new_inner}</code>'
+
+    return _CODE_RE.sub(replace, content), pending, highlighted
+
+
+def prism_scripts(languages: set) -> list:
+    """URL des scripts Prism nécessaires pour ces langages (aucun si l'ensemble est vide)."""
+    if not languages:
+        return []
+    components = []
+    for language in sorted(languages):
+        for component in PRISM_COMPONENTS.get(language, ()):
+            if component not in components:
+                components.append(component)
+    return [f"{PRISM_CDN}/prism.min.js"] + [f"{PRISM_CDN}/components/prism-{c}.min.js" for c in components]
+
+
+def script_tags(urls: list, indent: str = "    ") -> str:
+    return "".join(f'{indent}<script src="{url}" defer></script>\n' for url in urls)
+
+
+@lru_cache(maxsize=None)
+def script_size(url: str):
+    """Taille (octets) d'un script du CDN via HEAD, ou None hors ligne."""
+    try:
+        request = urllib.request.Request(url, method='HEAD')
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return int(response.headers.get('Content-Length'))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def update_page(content: str, highlight: bool = None):
+    """Colore la page et ne garde que les scripts Prism utiles ; renvoie (contenu, avant, après, blocs)."""
+    content, pending, highlighted = highlight_html(content, highlight)
+    before = re.findall(r'<script src="([^"]*prism[^"]*)"', content)
+    after = prism_scripts(pending)
+    if before != after:
+        content = _PRISM_SCRIPT_RE.sub('', content)
+        content = content.replace('</head>', f'{script_tags(after)}</head>', 1)
+    return content, before, after, highlighted
+
+
+def _format_bytes(urls: list) -> str:
+    sizes = [script_size(url) for url in urls]
+    if None in sizes:
+        return "taille inconnue hors ligne"
+    return f"{sum(sizes) / 1024:.1f}KB"
+
+
+def build(pages: list = None, check: bool = False) -> bool:
+    """Rattrapage des pages ; en mode check, renvoie False si une page n'était pas à jour."""
+    if not pygments_available():
+        print("[!] Pygments absent: les pages gardent Prism, limite aux langages utilises")
+    pages = pages or sorted(WRITEUPS_DIR.glob("*/index.html"))
+    stale = 0
+    for path in pages:
+        content = path.read_text(encoding='utf-8')
+        new_content, before, after, highlighted = update_page(content)
+        if new_content == content:
+            continue
+        stale += 1
+        removed = [url for url in before if url not in after]
+        print(f"[{'-' if check else '+'}] {path.relative_to(PROJECT_ROOT)}: {highlighted} bloc(s) colore(s), "
+              f"{len(before)} -> {len(after)} script(s) Prism, -{len(removed)} script(s) "
+              f"({_format_bytes(removed)})")
+        if not check:
+            path.write_text(new_content, encoding='utf-8')
+    print(f"[*] {stale} page(s) {'a mettre a jour' if check else 'mise(s) a jour'}")
+    return not (check and stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Colore le code des writeups au build et retire Prism.")
+    parser.add_argument("pages", nargs="*", type=Path, help="pages à traiter (défaut: writeups/*/index.html)")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si une page est à refaire)")
+    args = parser.parse_args()
+    if not build([page.resolve() for page in args.pages] or None, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Vérification et génération des <link rel="preload|preconnect|dns-prefetch"> des pages.
+Usage: python hints.py [page ...] [--check]
+
+Pour chaque page:
+  - un preload dont le fichier n'existe pas, ou que ni la page ni ses CSS
+    n'utilisent (url() d'une règle dont le sélecteur correspond à un élément de
+    la page), est retiré ;
+  - un preconnect/dns-prefetch vers une origine qu'aucune ressource de la page
+    ne charge est retiré (fonts.gstatic.com compte comme utilisée tant qu'une
+    feuille fonts.googleapis.com est chargée) ;
+  - l'image LCP est estimée parmi les images du premier écran (<img> hors
+    navbar et sans loading="lazy", fonds CSS gagnants de la cascade sur
+    html/body, leurs ::before/::after et les éléments du premier écran) ; la
+    plus grande surface affichée l'emporte, un fond de html/body comptant pour
+    tout le viewport. Elle reçoit un preload avec type et fetchpriority="high".
+
+Les chemins sont comparés sous leur nom d'origine (fingerprint.py renomme les
+assets ensuite): un preload existant garde son href. --check ne modifie rien
+et sort en code 1 si une page a un hint à corriger.
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+
+import critical_css
+import fingerprint
+import link_index
+import minify
+import update
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+HINT_RELS = ("preload", "preconnect", "dns-prefetch")
+# Viewport de référence pour comparer les surfaces affichées
+VIEWPORT = (1366, 768)
+PRELOAD_TYPES = {
+    ".avif": "image/avif", ".webp": "image/webp", ".png": "image/png", ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg", ".gif": "image/gif", ".svg": "image/svg+xml", ".woff2": "font/woff2",
+}
+
+_LINK_RE = re.compile(r'[ \t]*<link\b[^>]*>\n?')
+_TAG_ATTR_RE = re.compile(r'([\w-]+)(?:="([^"]*)")?')
+_REF_RE = re.compile(r'\b(?:src|href|poster)="([^"]*)"')
+_SRCSET_RE = re.compile(r'\bsrcset="([^"]*)"')
+_STYLE_BLOCK_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.DOTALL)
+_INLINE_STYLE_RE = re.compile(r'\bstyle="([^"]*)"')
+_CSS_URL_RE = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+_PSEUDO_ELEMENT_RE = re.compile(r'::?(before|after)\b')
+
+
+class PageCollector(critical_css.FoldCollector):
+    """Éléments de la page (voir FoldCollector) et <img> candidates au LCP dans le premier écran."""
+
+    def __init__(self, limit: int = critical_css.FOLD_ELEMENTS):
+        super().__init__(limit)
+        self.images = []
+        self.nav_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        in_fold = len(self.elements)
+        super().handle_starttag(tag, attrs)
+        in_fold = len(self.elements) > in_fold
+        if tag == 'nav':
+            self.nav_depth += 1
+        attrs = dict(attrs)
+        if tag == 'img' and in_fold and not self.nav_depth and attrs.get('src') and attrs.get('loading') != 'lazy':
+            self.images.append(attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'nav' and self.nav_depth:
+            self.nav_depth -= 1
+
+
+def _attrs(tag: str) -> dict:
+    return {name.lower(): value for name, value in _TAG_ATTR_RE.findall(tag[5:].rstrip('/>'))}
+
+
+def _target(ref: str, base_dir: Path) -> Path:
+    path = unquote(ref.split('#', 1)[0].split('?', 1)[0])
+    return PROJECT_ROOT / path.lstrip('/') if path.startswith('/') else base_dir / path
+
+
+def local_asset(ref: str, base_dir: Path):
+    """Fichier (relatif à la racine, nom d'origine) visé par une référence locale, ou None."""
+    if not ref or ref.startswith(('http://', 'https://', '//', 'data:', 'mailto:', '#')):
+        return None
+    target = os.path.normpath(_target(ref, base_dir))
+    return fingerprint.logical_name(os.path.relpath(target, PROJECT_ROOT).replace(os.sep, '/'))
+
+
+def _declarations(body: str) -> list:
+    """(propriété, valeur) d'un bloc de déclarations, sans couper dans les chaînes et parenthèses."""
+    out, start, depth, i = [], 0, 0, 0
+    while i <= len(body):
+        c = body[i] if i < len(body) else ';'
+        if c in '"\'':
+            i = minify._skip_string(body, i)
+            continue
+        depth += {'(': 1, ')': -1}.get(c, 0)
+        if c == ';' and not depth:
+            name, _, value = body[start:i].partition(':')
+            if value:
+                out.append((name.strip().lower(), value.strip()))
+            start = i + 1
+        i += 1
+    return out
+
+
+def _flatten(rules: list) -> list:
+    """Règles (sélecteur, déclarations) d'une feuille, @media/@supports aplatis, @font-face à part."""
+    out = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            out.extend(_flatten(body))
+        elif body is not None:
+            out.append((prelude, body))
+    return out
+
+
+def _specificity(selector: str) -> tuple:
+    selector = _PSEUDO_ELEMENT_RE.sub('', selector)
+    ids = len(re.findall(r'#[\w-]+', selector))
+    classes = len(re.findall(r'\.[\w-]+|\[[^\]]*\]|:(?!:)[\w-]+', selector))
+    types = len(re.findall(r'(?:^|[\s>+~])[a-zA-Z][\w-]*', selector))
+    return ids, classes, types
+
+
+def _subject_matches(selector: str, element, elements: list) -> bool:
+    """Vrai si le dernier composé du sélecteur correspond à l'élément (et le reste à la page)."""
+    compounds = [c for c in critical_css._COMBINATOR_RE.split(critical_css._PSEUDO_RE.sub('', selector).strip())
+                 if c]
+    return bool(compounds) and critical_css._compound_matches(compounds[-1], element) \
+        and critical_css.selector_matches(" ".join(compounds[:-1]), elements)
+
+
+class Stylesheets:
+    """Règles des CSS d'une page (feuilles locales puis <style>), avec le dossier qui résout leurs url()."""
+
+    def __init__(self, content: str, page_dir: Path):
+        self.rules = []
+        self.font_urls = set()
+        seen = set()
+        for _, href, _ in critical_css.stylesheet_links(content):
+            path = local_asset(href, page_dir)
+            # Fichier d'origine: la copie empreintée n'existe pas encore dans un clone neuf
+            css_path = (PROJECT_ROOT / path if path else _target(href, page_dir)).resolve()
+            if path is None or path in seen or not css_path.is_file():
+                continue
+            seen.add(path)
+            self._add(css_path.read_text(encoding='utf-8'), css_path.parent)
+        for css in _STYLE_BLOCK_RE.findall(content.split('</head>', 1)[0]):
+            self._add(css, page_dir)
+
+    def _add(self, css: str, base_dir: Path) -> None:
+        for prelude, body in _flatten(critical_css.parse_css(css)):
+            if prelude.startswith('@font-face'):
+                self.font_urls.update(filter(None, (local_asset(u, base_dir) for u in _CSS_URL_RE.findall(body))))
+            elif not prelude.startswith('@'):
+                self.rules.append((prelude, body, base_dir))
+
+    def used_assets(self, elements: list) -> set:
+        """Fichiers des url() des règles qui s'appliquent à au moins un élément de la page."""
+        used = set(self.font_urls)
+        for prelude, body, base_dir in self.rules:
+            urls = _CSS_URL_RE.findall(body)
+            if urls and any(critical_css.selector_matches(s, elements)
+                            for s in critical_css._split_selectors(prelude)):
+                used.update(filter(None, (local_asset(u, base_dir) for u in urls)))
+        return used
+
+    def backgrounds(self, elements: list) -> dict:
+        """(élément, pseudo-élément) -> image de fond gagnante de la cascade (None: fond sans image)."""
+        winners = {}
+        for order, (prelude, body, base_dir) in enumerate(self.rules):
+            declarations = [value for name, value in _declarations(body)
+                            if name in ('background', 'background-image')]
+            if not declarations:
+                continue
+            # La dernière déclaration l'emporte ; un fond sans url() efface l'image
+            url = _CSS_URL_RE.search(declarations[-1])
+            image = local_asset(url.group(1), base_dir) if url else None
+            for selector in critical_css._split_selectors(prelude):
+                pseudo = _PSEUDO_ELEMENT_RE.search(selector)
+                pseudo = pseudo.group(1) if pseudo else ""
+                rank = (_specificity(selector), order)
+                for index, element in enumerate(elements):
+                    key = (index, pseudo)
+                    if _subject_matches(selector, element, elements) and rank >= winners.get(key, ((), -1))[0]:
+                        winners[key] = (rank, image)
+        return {key: image for key, (_, image) in winners.items()}
+
+
+def lcp_candidate(content: str, page_dir: Path, sheets: Stylesheets = None):
+    """Image LCP estimée d'une page: (fichier d'origine, largeur, hauteur, origine) ou None."""
+    collector = PageCollector()
+    collector.feed(content)
+    sheets = sheets or Stylesheets(content, page_dir)
+    viewport_area = VIEWPORT[0] * VIEWPORT[1]
+    candidates = []
+    for (index, pseudo), image in sheets.backgrounds(collector.elements).items():
+        tag = collector.elements[index][0]
+        if not image or not (PROJECT_ROOT / image).is_file():
+            continue
+        dimensions = update.read_dimensions(str(PROJECT_ROOT / image))
+        if not dimensions:
+            continue
+        if tag in ('html', 'body'):
+            area = viewport_area
+        else:
+            area = min(dimensions[0], VIEWPORT[0]) * min(dimensions[1], VIEWPORT[1])
+        candidates.append((area, image, dimensions, f"fond de {tag}{'::' + pseudo if pseudo else ''}"))
+    for attrs in collector.images:
+        image = local_asset(attrs['src'], page_dir)
+        if not image or not (PROJECT_ROOT / image).is_file():
+            continue
+        dimensions = update.read_dimensions(str(PROJECT_ROOT / image))
+        if not dimensions:
+            continue
+        width = int(attrs['width']) if (attrs.get('width') or '').isdigit() else dimensions[0]
+        height = int(attrs['height']) if (attrs.get('height') or '').isdigit() else dimensions[1]
+        candidates.append((min(width, VIEWPORT[0]) * min(height, VIEWPORT[1]), image, dimensions, "<img>"))
+    if not candidates:
+        return None
+    # À surface égale, le premier trouvé (les fonds avant les <img>)
+    _, image, (width, height), origin = max(candidates, key=lambda c: c[0])
+    return image, width, height, origin
+
+
+def page_usage(content: str, page_dir: Path, sheets: Stylesheets):
+    """Fichiers et origines utilisés par une page, hors hints eux-mêmes."""
+    collector = critical_css.FoldCollector(limit=sys.maxsize)
+    collector.feed(content)
+    without_hints = _LINK_RE.sub(lambda m: '' if _attrs(m.group(0).strip()).get('rel') in HINT_RELS
+                                 else m.group(0), content)
+    refs = _REF_RE.findall(without_hints)
+    refs += [candidate.split()[0] for srcset in _SRCSET_RE.findall(without_hints)
+             for candidate in srcset.split(',') if candidate.strip()]
+    refs += [url for style in _INLINE_STYLE_RE.findall(without_hints) for url in _CSS_URL_RE.findall(style)]
+    assets = set(filter(None, (local_asset(ref, page_dir) for ref in refs)))
+    assets |= sheets.used_assets(collector.elements)
+    origins = {f"{p.scheme}://{p.netloc}" for p in map(urlsplit, refs) if p.scheme in ('http', 'https')}
+    if "https://fonts.googleapis.com" in origins:
+        origins.add("https://fonts.gstatic.com")
+    return assets, origins
+
+
+def preload_tag(href: str, image: str) -> str:
+    content_type = PRELOAD_TYPES.get(os.path.splitext(image)[1].lower())
+    type_attr = f' type="{content_type}"' if content_type else ''
+    return f'<link rel="preload" href="{href}" as="image"{type_attr} fetchpriority="high">'
+
+
+def update_hints(content: str, page: str):
+    """Hints corrigés d'une page ; renvoie (contenu, [changements lisibles])."""
+    if '</head>' not in content:
+        return content, []
+    page_dir = (PROJECT_ROOT / page).parent
+    sheets = Stylesheets(content, page_dir)
+    assets, origins = page_usage(content, page_dir, sheets)
+    lcp = lcp_candidate(content, page_dir, sheets)
+    head, sep, body = content.partition('</head>')
+
+    changes = []
+    lcp_done = False
+    insert_at = indent = None
+    pieces = []
+    last = 0
+    for match in _LINK_RE.finditer(head):
+        tag = match.group(0)
+        attrs = _attrs(tag.strip())
+        rel = attrs.get('rel')
+        if rel not in HINT_RELS:
+            continue
+        href = attrs.get('href') or ''
+        tag_indent = tag[:len(tag) - len(tag.lstrip())]
+        replacement = tag
+        if rel == 'preload':
+            asset = local_asset(href, page_dir)
+            if asset is not None and not (PROJECT_ROOT / asset).is_file():
+                replacement, reason = '', "fichier absent"
+            elif asset is not None and asset not in assets:
+                replacement, reason = '', "inutilise"
+            elif lcp and asset == lcp[0] and attrs.get('as') == 'image':
+                if lcp_done:
+                    replacement, reason = '', "doublon"
+                else:
+                    replacement, reason = f"{tag_indent}{preload_tag(href, lcp[0])}\n", "LCP"
+                lcp_done = True
+        else:
+            origin = urlsplit(href if '//' in href else f"https://{href}")
+            if f"https://{origin.netloc}" not in origins:
+                replacement, reason = '', "origine inutilisee"
+        if replacement == tag:
+            continue
+        changes.append(f"{'~' if replacement else '-'} {rel} {href} ({reason})")
+        pieces.append(head[last:match.start()])
+        # Le preload LCP manquant prend la place du premier preload retiré
+        if insert_at is None and not replacement and rel == 'preload':
+            insert_at, indent = sum(map(len, pieces)), tag_indent
+        pieces.append(replacement)
+        last = match.end()
+    pieces.append(head[last:])
+    head = "".join(pieces)
+
+    if lcp and not lcp_done:
+        href = os.path.relpath(PROJECT_ROOT / lcp[0], page_dir).replace(os.sep, '/')
+        if insert_at is None:
+            # Sinon juste après <meta name="viewport">, ou en tête du <head>
+            anchor = re.search(r'[ \t]*<meta name="viewport"[^>]*>\n', head) or re.search(r'<head>\n', head)
+            insert_at, indent = anchor.end(), "    "
+        head = head[:insert_at] + indent + preload_tag(href, lcp[0]) + "\n" + head[insert_at:]
+        changes.append(f"+ preload {href} (LCP: {lcp[1]}x{lcp[2]}, {lcp[3]})")
+    return head + sep + body, changes
+
+
+def build(pages: list = None, check: bool = False) -> bool:
+    """Hints de toutes les pages ; en mode check, renvoie False si une page avait un hint à corriger."""
+    if pages is None:
+        pages = [page for page, _ in link_index.iter_pages(PROJECT_ROOT)]
+    stale = 0
+    for page in pages:
+        path = PROJECT_ROOT / page
+        content = path.read_text(encoding='utf-8')
+        new_content, changes = update_hints(content, page)
+        if new_content == content:
+            continue
+        stale += 1
+        print(f"[{'-' if check else '+'}] {page}")
+        for change in changes:
+            print(f"      {change}")
+        if not check:
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(new_content, encoding='utf-8')
+            os.replace(tmp_path, path)
+    print(f"[*] {stale} page(s) {'a corriger' if check else 'corrigee(s)'}")
+    return not (check and stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie et génère les preload/preconnect des pages.")
+    parser.add_argument("pages", nargs="*", type=Path, help="pages à traiter (défaut: toutes)")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si une page est à corriger)")
+    args = parser.parse_args()
+    pages = [os.path.relpath(page.resolve(), PROJECT_ROOT) for page in args.pages] or None
+    if not build(pages, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Index des liens de toutes les pages HTML du site.
+Usage: python link_index.py [build | analyze | audit | truncate [--limit N]] [--pages PREFIXE] [--rebuild]
+
+Chaque page sous la racine du projet est lue une seule fois et ses liens
+(<a href>) sont enregistrés dans INDEX_PATH: page, href, texte de l'ancre,
+intégration (<p class="link-integration">) ou lien inline, position (ligne,
+offset) et emplacement exact du texte de l'ancre dans le fichier. Aux exécutions
+suivantes, seules les pages dont la taille ou le mtime a changé sont relues.
+
+Commandes:
+  build     met l'index à jour et affiche un résumé
+  analyze   liens externes inline, par page (ex analyze_links.py)
+  audit     liens dont le texte est l'URL elle-même (ex audit_all_links.py)
+  truncate  raccourcit le texte des intégrations trop longues (ex truncate_titles.py)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import html
+import argparse
+from pathlib import Path
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Index persistant (page -> taille, mtime, liens)
+INDEX_PATH = SCRIPT_DIR / ".link_index.json"
+INDEX_VERSION = 1
+
+# Dossiers jamais parcourus (outillage, dépôts, caches)
+SKIP_DIRS = {"scripts", "node_modules", "__pycache__"}
+
+# Hôtes ignorés par analyze/audit (namespaces, polices, liens locaux)
+IGNORED_HOSTS = ("w3.org", "fonts.google", "localhost", "127.0.0.1")
+
+# Longueur max du texte d'une intégration (comme add_writeup.py)
+TITLE_LIMIT = 57
+
+# Un seul passage sur la page: ouverture d'intégration, fin de paragraphe, lien, saut de ligne
+_TOKEN_RE = re.compile(
+    r'(?P<integration><p class="link-integration">)'
+    r'|(?P<close></p>)'
+    r'|(?P<a><a\s[^>]*?href="(?P<href>[^"]*)"[^>]*>)(?P<text>.*?)</a>'
+    r'|(?P<newline>\n)',
+    re.DOTALL,
+)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def parse_page(content: str, page: str) -> list:
+    """Liens d'une page, dans l'ordre du document."""
+    links = []
+    line = 1
+    integrated = False
+    for match in _TOKEN_RE.finditer(content):
+        kind = match.lastgroup
+        if kind == 'newline':
+            line += 1
+        elif kind == 'integration':
+            integrated = True
+        elif kind == 'close':
+            integrated = False
+        else:
+            raw_text = match.group('text')
+            links.append({
+                "page": page,
+                "href": html.unescape(match.group('href')),
+                "text": " ".join(html.unescape(_TAG_RE.sub('', raw_text)).split()),
+                "integrated": integrated,
+                "line": line,
+                "offset": match.start(),
+                "text_span": [match.start('text'), match.end('text')],
+            })
+            # Le texte d'un lien peut contenir des sauts de ligne
+            line += raw_text.count('\n')
+    return links
+
+
+def iter_pages(root: Path = PROJECT_ROOT):
+    """Pages HTML du projet: (chemin relatif, os.DirEntry)."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS)
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.html'):
+                    yield os.path.relpath(entry.path, root), entry
+
+
+def load_index() -> dict:
+    try:
+        with open(INDEX_PATH, 'r') as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data["pages"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def save_index(pages: dict) -> None:
+    """Sauvegarde l'index de façon atomique."""
+    tmp_path = INDEX_PATH.with_name(INDEX_PATH.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": INDEX_VERSION, "pages": pages}, f)
+    os.replace(tmp_path, INDEX_PATH)
+
+
+def update_index(rebuild: bool = False, verbose: bool = False) -> dict:
+    """Met l'index à jour (pages modifiées, ajoutées ou supprimées) et le renvoie: page -> entrée."""
+    start = time.perf_counter()
+    previous = {} if rebuild else load_index()
+    pages = {}
+    parsed = 0
+    for page, entry in iter_pages():
+        stat = entry.stat()
+        cached = previous.get(page)
+        if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime_ns:
+            pages[page] = cached
+            continue
+        with open(entry.path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        pages[page] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "links": parse_page(content, page)}
+        parsed += 1
+
+    if pages != previous:
+        save_index(pages)
+    if verbose:
+        elapsed = time.perf_counter() - start
+        print(f"[*] Index des liens: {len(pages)} page(s), {parsed} relue(s), "
+              f"{sum(len(p['links']) for p in pages.values())} lien(s) en {elapsed * 1000:.0f} ms")
+    return pages
+
+
+def iter_links(pages: dict, external: bool = None, integrated: bool = None, prefix: str = None):
+    """Liens de l'index, filtrés (externe http(s), intégration, préfixe du chemin de page)."""
+    for page in sorted(pages):
+        if prefix and not page.startswith(prefix):
+            continue
+        for link in pages[page]["links"]:
+            if external is not None and link["href"].startswith(("http://", "https://")) != external:
+                continue
+            if integrated is not None and link["integrated"] != integrated:
+                continue
+            yield link
+
+
+def _ignored(href: str) -> bool:
+    return any(host in href for host in IGNORED_HOSTS)
+
+
+def analyze(pages: dict, prefix: str = None) -> None:
+    """Liens externes non intégrés, par page (STANDALONE-CANDIDATE si le texte est l'URL)."""
+    current = None
+    for link in iter_links(pages, external=True, integrated=False, prefix=prefix):
+        if _ignored(link["href"]):
+            continue
+        if link["page"] != current:
+            if current is not None:
+                print("")
+            current = link["page"]
+            print(f"File: {current}")
+        status = "STANDALONE-CANDIDATE" if link["text"] == link["href"] else "INLINE"
+        print(f"  [{status}] {link['href']} (Text: '{link['text'][:50]}...', ligne {link['line']})")
+
+
+def audit(pages: dict, prefix: str = None) -> int:
+    """Liens dont le texte ressemble à l'URL (titre jamais résolu) ; renvoie leur nombre."""
+    found = 0
+    for link in iter_links(pages, external=True, prefix=prefix):
+        href = link["href"].strip()
+        if _ignored(href):
+            continue
+        text = "".join(link["text"].split())
+        if not (text == href or text in href or href in text):
+            continue
+        status = "INTEGRATED-BAD-TITLE" if link["integrated"] else "CANDIDATE-BAD-TITLE"
+        print(f"File: {link['page']}:{link['line']}")
+        print(f"  [{status}] {href}")
+        print(f"  Text: {link['text'][:50]}...")
+        print("")
+        found += 1
+    return found
+
+
+def truncate_text(text: str, limit: int = TITLE_LIMIT) -> str:
+    text = text.strip()
+    if len(text) > limit:
+        return text[:limit - 3] + "..."
+    return text
+
+
+def truncate(pages: dict, limit: int = TITLE_LIMIT, prefix: str = None) -> int:
+    """Raccourcit le texte des intégrations trop longues, sur place ; renvoie le nombre de pages modifiées."""
+    by_page = {}
+    for link in iter_links(pages, integrated=True, prefix=prefix):
+        if len(link["text"]) > limit:
+            by_page.setdefault(link["page"], []).append(link)
+
+    for page, links in by_page.items():
+        path = PROJECT_ROOT / page
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        # De la fin vers le début pour que les offsets restants restent valides
+        for link in sorted(links, key=lambda link: link["offset"], reverse=True):
+            start, end = link["text_span"]
+            # Le texte normalisé (sans balises ni sauts de ligne) remplace le HTML de l'ancre
+            new_text = truncate_text(link["text"], limit)
+            print(f"Truncating: {link['text'][:20]}... -> {new_text}")
+            content = content[:start] + html.escape(new_text, quote=False) + content[end:]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"Updated {page}")
+
+    if by_page:
+        update_index()
+    return len(by_page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index des liens des pages du site.")
+    parser.add_argument("command", nargs="?", default="build", choices=("build", "analyze", "audit", "truncate"))
+    parser.add_argument("--limit", type=int, default=TITLE_LIMIT, help="longueur max pour truncate")
+    parser.add_argument("--pages", metavar="PREFIXE", help="limite aux pages dont le chemin commence par PREFIXE "
+                                                          "(ex: writeups/)")
+    parser.add_argument("--rebuild", action="store_true", help="relit toutes les pages")
+    args = parser.parse_args()
+
+    pages = update_index(rebuild=args.rebuild, verbose=True)
+    if args.command == "analyze":
+        analyze(pages, args.pages)
+    elif args.command == "audit":
+        if audit(pages, args.pages):
+            sys.exit(1)
+    elif args.command == "truncate":
+        print(f"[+] {truncate(pages, args.limit, args.pages)} page(s) modifiee(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Minification des CSS/JS du site, en pur Python et hors ligne.
+Usage: python minify.py [--check]
+
+Chaque source de MINIFY_FILES est minifiée dans son fichier .min voisin
+(static/styles.css -> static/styles.min.css, ...), puis les pages HTML qui
+chargent encore une source sont réécrites pour charger la version .min.
+
+Les minifieurs sont volontairement prudents: commentaires et blancs inutiles
+sont retirés, mais chaînes, templates et expressions régulières sont recopiés
+tels quels, et un saut de ligne est gardé en JS partout où l'insertion
+automatique de point-virgule pourrait en dépendre (gallery.js n'en met pas).
+
+--check ne modifie rien: code de sortie 1 si un .min n'est plus à jour ou si
+une page référence encore une source (pour la CI ou un hook pre-commit).
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+
+import link_index
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+# Sources minifiées (chemin relatif à la racine), le .min est écrit à côté
+MINIFY_FILES = (
+    "static/styles.css",
+    "static/script.js",
+    "writeups/writeups.css",
+    "Portfolio/gallery.js",
+)
+
+_CSS_TOKEN_RE = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\s+|[^\s"\'/]+|/', re.DOTALL)
+# Pas d'espace nécessaire avant/après ces caractères (':' seulement après: "a :hover" != "a:hover")
+_CSS_TIGHT_BEFORE = set('{};,>~)!')
+_CSS_TIGHT_AFTER = set('{};,>~:(')
+
+_JS_IDENT_RE = re.compile(r'[\w$\u0080-\uffff]+')
+_JS_PUNCT_RE = re.compile(r'[^\w$\s\'"`/\u0080-\uffff]')
+# Mots-clés après lesquels un '/' ouvre une expression régulière
+_JS_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "case", "do", "else", "in", "of", "new",
+                      "delete", "void", "throw", "yield", "await"}
+# Un saut de ligne peut disparaître après/avant ces caractères sans changer l'insertion de ';'
+_JS_CONTINUES_AFTER = set('{([,;:=*%&|^!?<>~')
+_JS_CONTINUES_BEFORE = set('})],;:.?=*%&|^<>')
+
+_REF_RE = re.compile(r'((?:href|src)=")([^"#?]+\.(?:css|js))(")')
+
+
+def min_path(source: str) -> str:
+    """static/styles.css -> static/styles.min.css"""
+    stem, ext = os.path.splitext(source)
+    return f"{stem}.min{ext}"
+
+
+def minify_css(source: str) -> str:
+    out = []
+    pending_space = False
+    for match in _CSS_TOKEN_RE.finditer(source):
+        token = match.group(0)
+        if token.isspace() or token.startswith('/*'):
+            pending_space = True
+            continue
+        if pending_space and out and out[-1][-1] not in _CSS_TIGHT_AFTER and token[0] not in _CSS_TIGHT_BEFORE:
+            out.append(' ')
+        pending_space = False
+        # Pas de ';' avant une fin de bloc
+        if token[0] == '}' and out and out[-1] == ';':
+            out.pop()
+        # Les suites de caractères sont découpées pour que ';' et les accolades soient des tokens
+        if token[0] in '"\'':
+            out.append(token)
+        else:
+            out.extend(re.findall(r'[{};,>~:()!]|[^{};,>~:()!]+', token))
+    return "".join(out).strip() + "\n"
+
+
+def _skip_string(source: str, i: int) -> int:
+    """Fin (exclue) de la chaîne '...' ou "..." qui commence en i."""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def _skip_template(source: str, i: int) -> int:
+    """Fin (exclue) du template `...` qui commence en i, ${...} imbriqués compris."""
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif source.startswith('${', i):
+            i = _skip_braces(source, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_braces(source: str, i: int) -> int:
+    """Fin (exclue) d'une expression ${...} dont le contenu commence en i."""
+    depth = 1
+    while i < len(source):
+        c = source[i]
+        if c in '"\'':
+            i = _skip_string(source, i)
+            continue
+        if c == '`':
+            i = _skip_template(source, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if not depth:
+                return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(source: str, i: int) -> int:
+    """Fin (exclue) de l'expression régulière /.../flags qui commence en i."""
+    i += 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            break
+        i += 1
+    i += 1
+    while i < len(source) and (source[i].isalnum() or source[i] == '$'):
+        i += 1
+    return i
+
+
+def _js_tokens(source: str):
+    """Tokens significatifs du JS: (texte, blanc avant, saut de ligne avant)."""
+    i = 0
+    space = newline = False
+    previous = None
+    while i < len(source):
+        c = source[i]
+        if c.isspace():
+            space = True
+            newline = newline or c in '\n\r\u2028\u2029'
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end < 0 else end
+            space = True
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = len(source) if end < 0 else end + 2
+            newline = newline or '\n' in source[i:end]
+            space = True
+            i = end
+            continue
+
+        if c in '"\'':
+            end = _skip_string(source, i)
+        elif c == '`':
+            end = _skip_template(source, i)
+        elif c == '/':
+            # Une expression régulière ne peut suivre ni une valeur ni une fin de parenthèse
+            is_regex = (previous is None or previous in _JS_REGEX_KEYWORDS
+                        or (not _JS_IDENT_RE.fullmatch(previous) and previous[-1] not in ')]}\'"`'))
+            end = _skip_regex(source, i) if is_regex else i + 1
+        else:
+            match = _JS_IDENT_RE.match(source, i) or _JS_PUNCT_RE.match(source, i)
+            end = match.end() if match else i + 1
+        previous = source[i:end]
+        yield previous, space, newline
+        i = end
+        space = newline = False
+
+
+def minify_js(source: str) -> str:
+    out = []
+    for token, space, newline in _js_tokens(source):
+        if out:
+            prev_char, next_char = out[-1][-1], token[0]
+            if newline and prev_char not in _JS_CONTINUES_AFTER and next_char not in _JS_CONTINUES_BEFORE:
+                out.append('\n')
+            elif space and (
+                    (_JS_IDENT_RE.match(prev_char) or (out[-1][0] == '/' and len(out[-1]) > 1))
+                    and _JS_IDENT_RE.match(next_char)
+                    # "a + +b", "a - -b", "a / /re/": ne pas recoller deux opérateurs
+                    or (prev_char == next_char and prev_char in '+-/')):
+                out.append(' ')
+        out.append(token)
+    return "".join(out) + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def minify_file(source: str) -> str:
+    with open(PROJECT_ROOT / source, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return MINIFIERS[os.path.splitext(source)[1]](content)
+
+
+def update_minified(check: bool = False) -> list:
+    """Régénère les .min (ou vérifie seulement) ; renvoie les .min qui n'étaient pas à jour."""
+    stale = []
+    for source in MINIFY_FILES:
+        minified = minify_file(source)
+        target = PROJECT_ROOT / min_path(source)
+        try:
+            current = target.read_text(encoding='utf-8')
+        except OSError:
+            current = None
+        if current == minified:
+            continue
+        stale.append(min_path(source))
+        source_size = (PROJECT_ROOT / source).stat().st_size
+        size = len(minified.encode('utf-8'))
+        if check:
+            print(f"[-] {min_path(source)} n'est plus a jour")
+            continue
+        tmp_path = target.with_name(target.name + ".tmp")
+        tmp_path.write_text(minified, encoding='utf-8')
+        os.replace(tmp_path, target)
+        print(f"[+] {min_path(source)}: {source_size / 1024:.1f}KB -> {size / 1024:.1f}KB "
+              f"(-{100 - size * 100 / source_size:.0f}%)")
+    return stale
+
+
+def rewrite_references(content: str, page_path: Path) -> tuple:
+    """Remplace les références aux sources par leur .min ; renvoie (contenu, nombre de remplacements)."""
+    replaced = 0
+    sources = set(MINIFY_FILES)
+
+    def replace(match):
+        nonlocal replaced
+        href = match.group(2)
+        if href.startswith(('http://', 'https://', '//')):
+            return match.group(0)
+        resolved = os.path.normpath(page_path.parent / href).replace(os.sep, '/')
+        if os.path.relpath(resolved, PROJECT_ROOT).replace(os.sep, '/') not in sources:
+            return match.group(0)
+        replaced += 1
+        return f"{match.group(1)}{min_path(href)}{match.group(3)}"
+
+    return _REF_RE.sub(replace, content), replaced
+
+
+def update_pages(check: bool = False) -> list:
+    """Fait charger les .min à toutes les pages ; renvoie les pages qui chargeaient une source."""
+    changed = []
+    for page, entry in link_index.iter_pages(PROJECT_ROOT):
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content, replaced = rewrite_references(content, PROJECT_ROOT / page)
+        if not replaced:
+            continue
+        changed.append(page)
+        if check:
+            print(f"[-] {page}: {replaced} reference(s) a une source non minifiee")
+            continue
+        with open(entry.path, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+        print(f"[+] {page}: {replaced} reference(s) vers .min")
+    return changed
+
+
+def build(check: bool = False) -> bool:
+    """.min et pages à jour ; en mode check, renvoie False si quelque chose ne l'était pas."""
+    stale = update_minified(check)
+    pages = update_pages(check)
+    if check:
+        ok = not stale and not pages
+        print("[+] .min et pages a jour" if ok else
+              f"[-] {len(stale)} .min perime(s), {len(pages)} page(s) a reecrire: lancer scripts/minify.py")
+        return ok
+    print(f"[*] {len(stale)} .min regenere(s), {len(pages)} page(s) reecrite(s)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minifie les CSS/JS du site et fait charger les .min aux pages.")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si rien n'est à jour)")
+    args = parser.parse_args()
+    if not build(args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Navbar inlinée au build dans toutes les pages, depuis le partial writeups/navbar.html.
+Usage: python navbar.py [page ...] [--check]
+
+Le partial est la seule source de la navbar. Dans chaque page, le
+<div id="navbar-placeholder"></div> (que script.js remplissait par un fetch au
+chargement) ou la <nav class="navbar"> déjà présente est remplacé par le
+partial:
+  - ses URL absolues (/writeups/...) deviennent relatives à la page, comme
+    dans le reste du site (pages ouvertes en local, dépôt servi sous un préfixe),
+    et visent la copie empreintée des assets (static/assets.json, fingerprint.py) ;
+  - le lien de la section de la page reçoit la classe active, et
+    aria-current="page" quand il pointe sur la page elle-même.
+
+Avant d'être remplacée, une navbar écrite en dur (pages d'origine, HTML_TEMPLATE
+d'add_writeup.py) est comparée au partial (liens ramenés à la racine, état actif
+et empreintes ignorés) et les différences sont affichées: une modification faite
+d'un seul côté ne disparaît pas sans qu'on le voie. Une page (ou HTML_TEMPLATE)
+qui a le bouton du menu mobile sans charger de script qui le branche
+(MENU_SCRIPTS) est signalée aussi: le menu y serait inaccessible. --check ne modifie rien et
+sort en code 1 si une page n'a pas la navbar du partial.
+"""
+
+import os
+import re
+import sys
+import difflib
+import argparse
+from pathlib import Path
+
+import fingerprint
+import link_index
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+NAVBAR_PATH = PROJECT_ROOT / "writeups" / "navbar.html"
+
+PLACEHOLDER = '<div id="navbar-placeholder"></div>'
+# Scripts qui branchent #mobile-menu-toggle (noms logiques, sans .min ni empreinte)
+MENU_SCRIPTS = ("static/script.js", "Portfolio/gallery.js")
+
+_SLOT_RE = re.compile(rf'^([ \t]*)(?:{re.escape(PLACEHOLDER)}|<nav class="navbar">.*?</nav>)',
+                      re.MULTILINE | re.DOTALL)
+_URL_RE = re.compile(r'((?:src|href)=")([^"]*)(")')
+_NAV_LINK_RE = re.compile(r'<a\b[^>]*class="[^"]*\bnav-link\b[^"]*"[^>]*>')
+_TOKEN_RE = re.compile(r'<[^>]+>|[^<]+')
+_SCRIPT_SRC_RE = re.compile(r'<script\b[^>]*\bsrc="([^"]*)"')
+
+
+def page_url(page: str) -> str:
+    """writeups/trickster/index.html -> /writeups/trickster/"""
+    url = "/" + page.replace(os.sep, "/")
+    return url[:-len("index.html")] if url.endswith("/index.html") else url
+
+
+def relative_url(url: str, page: str) -> str:
+    """URL absolue du site -> relative à la page (/writeups/ depuis Portfolio/index.html -> ../writeups/)."""
+    if not url.startswith('/') or url.startswith('//'):
+        return url
+    base = os.path.dirname(page_url(page)) or "/"
+    relative = os.path.relpath(url, base)
+    if url.endswith('/'):
+        relative = "./" if relative == "." else relative + "/"
+    return relative
+
+
+def absolute_url(url: str, page: str) -> str:
+    """Inverse de relative_url, pour comparer des navbars de pages différentes."""
+    if url.startswith(('/', 'http://', 'https://', 'data:', '#', 'mailto:')):
+        return url
+    absolute = os.path.normpath(os.path.join(os.path.dirname(page_url(page)), url))
+    return absolute + "/" if url.endswith(('/', '.')) and absolute != "/" else absolute
+
+
+def _mark_active(tag: str, page: str) -> str:
+    """Ajoute/retire la classe active (et aria-current) d'un lien de la navbar selon la page."""
+    tag = re.sub(r'\s+aria-current="[^"]*"', '', tag)
+    tag = re.sub(r'(class="[^"]*?)\s+active\b', r'\1', tag)
+    href = re.search(r'href="([^"]*)"', tag)
+    target = absolute_url(href.group(1), page) if href else None
+    current = page_url(page)
+    if target is None or not (current == target if target == "/" else current.startswith(target)):
+        return tag
+    tag = re.sub(r'class="([^"]*)"', r'class="\1 active"', tag, count=1)
+    if current == target:
+        tag = tag[:-1] + ' aria-current="page">'
+    return tag
+
+
+def hashed_url(url: str, manifest: dict) -> str:
+    """/assets/logo.png -> /assets/logo.<hash>.png si l'asset a une copie empreintée."""
+    if not url.startswith('/') or url.startswith('//'):
+        return url
+    asset = fingerprint.resolve(url, PROJECT_ROOT)
+    return fingerprint.rewrite_ref(url, manifest[asset]) if asset in manifest else url
+
+
+def render_navbar(partial: str, page: str, indent: str = "", manifest: dict = None) -> str:
+    """Le partial tel qu'il doit apparaître dans `page` (URL relatives et empreintées, lien actif, indentation)."""
+    manifest = fingerprint.load_manifest() if manifest is None else manifest
+    html = _URL_RE.sub(lambda m: f"{m.group(1)}{relative_url(hashed_url(m.group(2), manifest), page)}{m.group(3)}",
+                       partial.strip())
+    html = _NAV_LINK_RE.sub(lambda m: _mark_active(m.group(0), page), html)
+    return "\n".join(indent + line if line.strip() else "" for line in html.split("\n"))
+
+
+def inline_navbar(content: str, page: str, partial: str = None):
+    """Remplace le placeholder ou la navbar de la page par le partial ; renvoie (contenu, ancienne navbar).
+
+    L'ancienne navbar vaut None si la page n'en a pas (ni placeholder).
+    """
+    partial = partial if partial is not None else NAVBAR_PATH.read_text(encoding='utf-8')
+    match = _SLOT_RE.search(content)
+    if not match:
+        return content, None
+    navbar = render_navbar(partial, page, match.group(1))
+    return content[:match.start()] + navbar + content[match.end():], match.group(0).strip()
+
+
+def normalize(nav: str, page: str) -> list:
+    """Balises et textes d'une navbar sans ce qui dépend de la page: URL absolues, état actif, empreintes."""
+    nav = _URL_RE.sub(lambda m: f"{m.group(1)}{fingerprint.logical_name(absolute_url(m.group(2), page))}"
+                                f"{m.group(3)}", nav)
+    nav = re.sub(r'\s+aria-current="[^"]*"', '', nav)
+    nav = re.sub(r'(class="[^"]*?)\s+active\b', r'\1', nav)
+    tokens = (" ".join(token.split()) for token in _TOKEN_RE.findall(nav))
+    return [token for token in tokens if token]
+
+
+def drift(nav: str, page: str, partial: str) -> list:
+    """Différences (lignes -/+) entre la navbar écrite en dur d'une page et le partial ; [] si identiques."""
+    if nav is None or nav == PLACEHOLDER:
+        return []
+    diff = difflib.unified_diff(normalize(partial, "writeups/navbar.html"), normalize(nav, page),
+                                lineterm="", n=0)
+    return [line for line in diff if line[:1] in "-+" and line[:3] not in ("---", "+++")]
+
+
+def _report_drift(label: str, lines: list) -> None:
+    print(f"[!] {label}: navbar differente du partial (- partial, + page)")
+    for line in lines:
+        print(f"      {line}")
+
+
+def menu_script_missing(content: str, page: str) -> bool:
+    """True si la page a le bouton du menu mobile mais ne charge aucun des MENU_SCRIPTS."""
+    if 'id="mobile-menu-toggle"' not in content:
+        return False
+    for src in _SCRIPT_SRC_RE.findall(content):
+        logical = fingerprint.logical_name(absolute_url(src, page)).lstrip('/')
+        if re.sub(r'\.min(\.js)$', r'\1', logical) in MENU_SCRIPTS:
+            return False
+    return True
+
+
+def _report_menu_script(label: str) -> None:
+    print(f"[!] {label}: bouton du menu mobile sans {' ni '.join(MENU_SCRIPTS)}, menu inaccessible")
+
+
+def template_drift(partial: str) -> list:
+    """Différences entre la navbar d'HTML_TEMPLATE (add_writeup.py) et le partial."""
+    import add_writeup
+    match = _SLOT_RE.search(add_writeup.HTML_TEMPLATE)
+    return drift(match.group(0).strip(), "writeups/writeup/index.html", partial) if match else []
+
+
+def template_menu_script_missing(partial: str) -> bool:
+    """menu_script_missing pour une page générée depuis HTML_TEMPLATE (add_writeup.py)."""
+    import add_writeup
+    page = "writeups/writeup/index.html"
+    content, _ = inline_navbar(add_writeup.HTML_TEMPLATE, page, partial)
+    return menu_script_missing(content, page)
+
+
+def build(pages: list = None, check: bool = False) -> bool:
+    """Navbar du partial dans toutes les pages ; en mode check, renvoie False si une page ne l'avait pas."""
+    partial = NAVBAR_PATH.read_text(encoding='utf-8')
+    lines = template_drift(partial)
+    if lines:
+        _report_drift("HTML_TEMPLATE (add_writeup.py)", lines)
+    if template_menu_script_missing(partial):
+        _report_menu_script("HTML_TEMPLATE (add_writeup.py)")
+
+    if pages is None:
+        pages = [page for page, _ in link_index.iter_pages(PROJECT_ROOT)]
+    stale = 0
+    for page in pages:
+        path = PROJECT_ROOT / page
+        if path == NAVBAR_PATH:
+            continue
+        content = path.read_text(encoding='utf-8')
+        new_content, old = inline_navbar(content, page, partial)
+        if menu_script_missing(new_content, page):
+            _report_menu_script(page)
+        if new_content == content:
+            continue
+        lines = drift(old, page, partial)
+        if lines:
+            _report_drift(page, lines)
+        stale += 1
+        print(f"[{'-' if check else '+'}] {page}: "
+              f"{'placeholder remplace' if old == PLACEHOLDER else 'navbar mise a jour'}")
+        if not check:
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(new_content, encoding='utf-8')
+            os.replace(tmp_path, path)
+    print(f"[*] {stale} page(s) {'a mettre a jour' if check else 'mise(s) a jour'}")
+    return not (check and stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline la navbar partagée dans les pages du site.")
+    parser.add_argument("pages", nargs="*", type=Path, help="pages à traiter (défaut: toutes)")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si une page est à refaire)")
+    args = parser.parse_args()
+    pages = [os.path.relpath(page.resolve(), PROJECT_ROOT) for page in args.pages] or None
+    if not build(pages, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Serveur local de prévisualisation qui sert les versions précompressées (compress.py).
+Usage: python serve.py [--port 8000] [--bind 127.0.0.1]
+
+Pour chaque requête, le voisin .br ou .gz du fichier demandé est envoyé avec
+Content-Encoding si le client l'accepte (Accept-Encoding: la meilleure valeur q
+l'emporte, q=0 compris), s'il existe et s'il n'est pas plus ancien que le
+fichier (modifié depuis le dernier compress.py) ; sinon le fichier d'origine.
+Chaque réponse est journalisée avec son encodage et sa taille. Pour mesurer:
+    curl -so /dev/null -H 'Accept-Encoding: br' -w '%{size_download}\\n' http://127.0.0.1:8000/
+"""
+
+import os
+import argparse
+from pathlib import Path
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import compress
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+
+
+def accepted_encodings(header: str) -> dict:
+    """'gzip, br;q=0.8, *;q=0' -> {'gzip': 1.0, 'br': 0.8, '*': 0.0}"""
+    accepted = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+class PrecompressedHandler(SimpleHTTPRequestHandler):
+    """Fichiers du site, version précompressée quand le client l'accepte."""
+
+    def choose_encoding(self, path: str):
+        """Encodage le mieux noté par le client parmi les voisins à jour ; à q égal, Brotli d'abord."""
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        source_mtime = os.stat(path).st_mtime_ns
+        candidates = []
+        for rank, (encoding, extension) in enumerate(compress.ENCODINGS.items()):
+            quality = accepted.get(encoding, accepted.get("*", 0.0))
+            try:
+                # Voisin plus ancien que la source: fichier modifié depuis compress.py
+                fresh = os.stat(path + extension).st_mtime_ns >= source_mtime
+            except OSError:
+                fresh = False
+            if quality > 0 and fresh:
+                candidates.append((-quality, rank, encoding))
+        return min(candidates)[2] if candidates else None
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Redirection vers le / final et listing: comportement par défaut
+            if not self.path.split('?', 1)[0].endswith('/'):
+                return super().send_head()
+            path = os.path.join(path, "index.html")
+        encoding = self.choose_encoding(path) if os.path.isfile(path) else None
+        if encoding is None:
+            return super().send_head()
+        f = open(path + compress.ENCODINGS[encoding], 'rb')
+        try:
+            fs = os.fstat(f.fileno())
+            self.send_response(200)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(fs.st_size))
+            self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def log_request(self, code='-', size='-'):
+        # Journalisé dans end_headers, une fois l'encodage et la taille connus
+        self.status = code
+
+    def end_headers(self):
+        self.send_header("Vary", "Accept-Encoding")
+        headers = dict(line.decode('latin-1').rstrip("\r\n").split(": ", 1)
+                       for line in self._headers_buffer[1:] if b": " in line)
+        self.log_message('"%s" %s %s %s octets', self.requestline, getattr(self, "status", "-"),
+                         headers.get("Content-Encoding", "identity"), headers.get("Content-Length", "-"))
+        super().end_headers()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prévisualisation locale avec les fichiers précompressés.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--bind", default="127.0.0.1")
+    args = parser.parse_args()
+    handler = partial(PrecompressedHandler, directory=str(PROJECT_ROOT))
+    with ThreadingHTTPServer((args.bind, args.port), handler) as server:
+        print(f"[*] http://{args.bind}:{args.port}/ (Ctrl+C pour arreter)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Résolution des titres des liens externes des writeups.
+Usage: python titles.py [url ...] [--refresh] [--jobs N] [--per-host N] [--ttl HEURES]
+
+Sans URL, résout le titre de chaque lien externe des writeups (via link_index.py).
+Les requêtes partent en parallèle (asyncio), avec au plus PER_HOST requêtes
+simultanées par hôte et des connexions HTTP keep-alive réutilisées d'une requête
+à l'autre sur le même hôte.
+
+Les titres sont gardés dans CACHE_PATH: tant qu'une entrée a moins de CACHE_TTL,
+aucune requête n'est envoyée ; au-delà, la requête est conditionnelle
+(If-None-Match / If-Modified-Since) et un 304 revalide le titre sans le retélécharger.
+Les URL http:// et les ports explicites sont gérés, ce qui permet de tester le
+module contre un serveur local (python -m http.server).
+
+Le corps des réponses est lu par morceaux et analysé au fil de l'eau: la lecture
+s'arrête dès </title> (ou <body> sans titre), ou après MAX_TITLE_BYTES, au lieu de
+télécharger des pages de plusieurs Mo pour quelques octets de titre. Le charset
+vient du BOM, de l'en-tête Content-Type ou d'une balise <meta> en début de page.
+"""
+
+import os
+import re
+import ssl
+import json
+import time
+import html
+import codecs
+import asyncio
+import argparse
+import http.client
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import link_index
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+WRITEUPS_DIR = PROJECT_ROOT / "writeups"
+
+# Cache des titres (url -> titre, validateurs HTTP, date de récupération)
+CACHE_PATH = SCRIPT_DIR / ".titles_cache.json"
+CACHE_VERSION = 1
+# Durée pendant laquelle un titre est réutilisé sans aucune requête
+CACHE_TTL = 7 * 24 * 3600
+
+# Requêtes simultanées au total et par hôte
+MAX_JOBS = 16
+PER_HOST = 4
+TIMEOUT = 10
+MAX_REDIRECTS = 5
+
+# Octets lus au plus pour trouver le <title> ; la lecture s'arrête avant si possible
+MAX_TITLE_BYTES = 128 * 1024
+CHUNK_SIZE = 16 * 1024
+# Octets analysés pour trouver un <meta charset> avant de commencer à décoder
+SNIFF_BYTES = 1024
+# Reste du corps qu'on lit quand même pour garder la connexion keep-alive réutilisable
+DRAIN_BYTES = 16 * 1024
+
+# User agent to avoid 403s
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+_TITLE_OPEN_RE = re.compile(r'<title\b[^>]*>', re.IGNORECASE)
+_TITLE_CLOSE_RE = re.compile(r'</title\s*>', re.IGNORECASE)
+_BODY_RE = re.compile(r'<body[\s>]', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta\s[^>]*charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+# Étiquettes que les navigateurs décodent en windows-1252 (WHATWG Encoding)
+_WINDOWS_1252_LABELS = {'iso-8859-1', 'iso8859-1', 'latin1', 'latin-1', 'us-ascii', 'ascii'}
+
+
+def scan_links() -> dict:
+    """Liens externes des writeups (index de link_index.py): url sans fragment -> pages qui la citent."""
+    links = {}
+    for link in link_index.iter_links(link_index.update_index(), external=True, prefix="writeups/"):
+        url = link["href"].split('#', 1)[0]
+        pages = links.setdefault(url, [])
+        if link["page"] not in pages:
+            pages.append(link["page"])
+    return links
+
+
+def clean_title(raw: str) -> str:
+    """Décode les entités, retire les balises et normalise les espaces d'un titre brut."""
+    title = _TAG_RE.sub('', html.unescape(raw))
+    return " ".join(title.replace('|', '-').split())
+
+
+def sniff_charset(prefix: bytes, content_type: str = "") -> str:
+    """Charset d'une page: BOM, puis en-tête Content-Type, puis <meta> dans `prefix`, sinon UTF-8."""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    match = _CHARSET_RE.search(content_type or "")
+    label = match.group(1) if match else None
+    if label is None:
+        match = _META_CHARSET_RE.search(prefix)
+        label = match.group(1).decode('ascii', errors='ignore') if match else None
+    if not label:
+        return 'utf-8'
+    label = label.strip().lower()
+    if label in _WINDOWS_1252_LABELS:
+        return 'cp1252'
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return 'utf-8'
+
+
+class TitleStream:
+    """Extraction incrémentale du <title>: feed() des morceaux d'octets jusqu'à `done`."""
+
+    def __init__(self, content_type: str = ""):
+        self.content_type = content_type
+        self.pending = b""
+        self.decoder = None
+        self.text = ""
+        self.opened = False
+        self.title = None
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Ajoute un morceau du corps ; renvoie True quand la suite est inutile."""
+        if self.decoder is None:
+            self.pending += chunk
+            if len(self.pending) >= SNIFF_BYTES:
+                self._start()
+        else:
+            self._scan(self.decoder.decode(chunk))
+        return self.done
+
+    def close(self):
+        """Fin du corps (ou de la lecture): renvoie le titre trouvé, ou None."""
+        if self.decoder is None:
+            self._start()
+        if not self.done:
+            self._scan(self.decoder.decode(b"", final=True))
+        return self.title
+
+    def _start(self):
+        charset = sniff_charset(self.pending[:SNIFF_BYTES], self.content_type)
+        self.decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+        pending, self.pending = self.pending, b""
+        self._scan(self.decoder.decode(pending))
+
+    def _scan(self, text: str):
+        if self.done:
+            return
+        self.text += text
+        if not self.opened:
+            match = _TITLE_OPEN_RE.search(self.text)
+            if match is None:
+                if _BODY_RE.search(self.text):
+                    self.done = True
+                else:
+                    # Garde juste de quoi reconnaître une balise coupée entre deux morceaux
+                    self.text = self.text[-32:]
+                return
+            self.opened = True
+            self.text = self.text[match.end():]
+        match = _TITLE_CLOSE_RE.search(self.text)
+        if match:
+            self.title = clean_title(self.text[:match.start()]) or None
+            self.done = True
+
+
+def _is_html(content_type: str) -> bool:
+    media_type = (content_type or "text/html").split(';', 1)[0].strip().lower()
+    return media_type in ('text/html', 'application/xhtml+xml')
+
+
+class TitleCache:
+    """Cache JSON des titres: {url: {title, final, etag, last_modified, fetched}}."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.entries = {}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text())
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data["entries"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def get(self, url: str):
+        return self.entries.get(url)
+
+    def is_fresh(self, url: str) -> bool:
+        entry = self.entries.get(url)
+        return entry is not None and time.time() - entry["fetched"] < self.ttl
+
+    def put(self, url: str, entry: dict) -> None:
+        self.entries[url] = entry
+        self.dirty = True
+
+    def save(self) -> None:
+        """Écriture atomique (fichier temporaire + rename), seulement si le cache a changé."""
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": CACHE_VERSION, "entries": self.entries}, indent=2))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+class HostPool:
+    """Connexions keep-alive par hôte, avec au plus `per_host` requêtes simultanées par hôte."""
+
+    def __init__(self, per_host: int = PER_HOST, timeout: float = TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.ssl_context = ssl.create_default_context()
+        self.semaphores = {}
+        self.idle = {}
+
+    def semaphore(self, key) -> asyncio.Semaphore:
+        if key not in self.semaphores:
+            self.semaphores[key] = asyncio.Semaphore(self.per_host)
+        return self.semaphores[key]
+
+    def checkout(self, key):
+        """Connexion libre pour l'hôte (réutilisée si possible) et si elle a déjà servi."""
+        idle = self.idle.get(key)
+        if idle:
+            return idle.pop(), True
+        return self.connect(key), False
+
+    def connect(self, key):
+        """Nouvelle connexion (pas encore ouverte) vers l'hôte."""
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def checkin(self, key, conn) -> None:
+        self.idle.setdefault(key, []).append(conn)
+
+    def run(self, key, conn, reused: bool, exchange):
+        """Exécute `exchange(conn) -> (résultat, réutilisable)` (bloquant, dans un thread).
+
+        Une connexion keep-alive fermée par le serveur entre deux requêtes est rouverte
+        une fois ; la connexion revient ensuite au pool si elle est réutilisable.
+        """
+        try:
+            result, reusable = exchange(conn)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            conn = self.connect(key)
+            try:
+                result, reusable = exchange(conn)
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+        if reusable:
+            self.checkin(key, conn)
+        else:
+            conn.close()
+        return result
+
+    async def request(self, url: str, exchange):
+        """Exécute `exchange` sur une connexion vers l'hôte de `url`, dans la limite par hôte."""
+        key = host_key(url)
+        loop = asyncio.get_running_loop()
+        async with self.semaphore(key):
+            conn, reused = self.checkout(key)
+            return await loop.run_in_executor(None, self.run, key, conn, reused, exchange)
+
+    def close(self) -> None:
+        for conns in self.idle.values():
+            for conn in conns:
+                conn.close()
+        self.idle.clear()
+
+
+def host_key(url: str):
+    """Clé de connexion d'une URL: (schéma, hôte, port)."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    return parts.scheme, parts.hostname, port
+
+
+def request_path(url: str) -> str:
+    """Chemin et query d'une URL, tels qu'envoyés dans la ligne de requête."""
+    parts = urlsplit(url)
+    return (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+
+class TitleFetcher:
+    """Résout les titres d'un lot d'URL en parallèle, en s'appuyant sur un TitleCache."""
+
+    def __init__(self, cache: TitleCache, jobs: int = MAX_JOBS, per_host: int = PER_HOST,
+                 timeout: float = TIMEOUT, refresh: bool = False, max_bytes: int = MAX_TITLE_BYTES):
+        self.cache = cache
+        self.jobs = jobs
+        self.refresh = refresh
+        self.max_bytes = max_bytes
+        self.pool = HostPool(per_host, timeout)
+        self.stats = {"cached": 0, "revalidated": 0, "fetched": 0, "failed": 0,
+                      "bytes_read": 0, "bytes_saved": 0, "cut": 0, "cut_unknown": 0}
+
+    def _exchange(self, conn, path, headers):
+        """Envoie la requête et lit le corps jusqu'au titre.
+
+        Renvoie ((status, headers, titre, octets lus, octets non lus ou None si taille
+        inconnue), connexion réutilisable).
+        """
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        stream = None
+        if response.status == 200 and _is_html(response.headers.get('Content-Type')):
+            stream = TitleStream(response.headers.get('Content-Type'))
+        read = 0
+        while stream is not None and read < self.max_bytes:
+            chunk = response.read(min(CHUNK_SIZE, self.max_bytes - read))
+            if not chunk:
+                break
+            read += len(chunk)
+            if stream.feed(chunk):
+                break
+        title = stream.close() if stream is not None else None
+
+        # Reste du corps: lu s'il est court (connexion réutilisable), sinon abandonné
+        unread = 0
+        if stream is None or not response.isclosed():
+            if response.length is not None and response.length <= DRAIN_BYTES:
+                read += len(response.read())
+            else:
+                unread = response.length
+        result = (response.status, response.headers, title, read, unread)
+        return result, unread == 0 and not response.will_close
+
+    async def _get(self, url: str, headers: dict):
+        path = request_path(url)
+        headers = {'User-Agent': USER_AGENT,
+                   'Accept': 'text/html,*/*;q=0.8', 'Accept-Encoding': 'identity', **headers}
+        return await self.pool.request(url, lambda conn: self._exchange(conn, path, headers))
+
+    async def resolve(self, url: str) -> str:
+        """Titre d'une URL: cache frais, revalidation conditionnelle, ou téléchargement."""
+        entry = None if self.refresh else self.cache.get(url)
+        if entry and self.cache.is_fresh(url):
+            self.stats["cached"] += 1
+            return entry["title"]
+
+        # Revalidation directement sur l'URL finale (après redirections) de la dernière fois
+        target = entry["final"] if entry else url
+        headers = {}
+        if entry and entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                status, response_headers, title, read, unread = await self._get(target, headers)
+                self.stats["bytes_read"] += read
+                if unread is None:
+                    self.stats["cut_unknown"] += 1
+                elif unread:
+                    self.stats["cut"] += 1
+                    self.stats["bytes_saved"] += unread
+                location = response_headers.get('Location')
+                if status in (301, 302, 303, 307, 308) and location:
+                    target = urljoin(target, location)
+                    headers = {}
+                    continue
+                break
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            self.stats["failed"] += 1
+            print(f"[-] {url}: {e}")
+            return entry["title"] if entry else url
+
+        if status == 304 and entry:
+            self.stats["revalidated"] += 1
+            self.cache.put(url, {**entry, "fetched": time.time()})
+            return entry["title"]
+        if status != 200 or title is None:
+            self.stats["failed"] += 1
+            print(f"[-] {url}: HTTP {status}, pas de <title>")
+            # Erreur passagère (429, 503...): le titre déjà connu reste meilleur que l'URL
+            return entry["title"] if entry else url
+        self.stats["fetched"] += 1
+        self.cache.put(url, {
+            "title": title,
+            "final": target,
+            "etag": response_headers.get('ETag'),
+            "last_modified": response_headers.get('Last-Modified'),
+            "fetched": time.time(),
+        })
+        return title
+
+    async def resolve_all(self, urls: list) -> dict:
+        """url -> titre pour toutes les URL, `jobs` requêtes au plus en même temps."""
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.jobs))
+        try:
+            titles = await asyncio.gather(*(self.resolve(url) for url in urls))
+        finally:
+            self.pool.close()
+        return dict(zip(urls, titles))
+
+
+def fetch_titles(urls: list, cache: TitleCache = None, **options) -> tuple:
+    """Point d'entrée synchrone: résout les titres et sauvegarde le cache ; renvoie (titres, stats)."""
+    cache = cache or TitleCache()
+    fetcher = TitleFetcher(cache, **options)
+    titles = asyncio.run(fetcher.resolve_all(urls))
+    cache.save()
+    return titles, fetcher.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résout les titres des liens externes des writeups.")
+    parser.add_argument("urls", nargs="*", help="URL à résoudre (défaut: liens des writeups)")
+    parser.add_argument("--refresh", action="store_true", help="ignore le cache et retélécharge tout")
+    parser.add_argument("-j", "--jobs", type=int, default=MAX_JOBS, help="requêtes simultanées au total")
+    parser.add_argument("--per-host", type=int, default=PER_HOST, help="requêtes simultanées par hôte")
+    parser.add_argument("--ttl", type=float, default=CACHE_TTL / 3600,
+                        help="durée de validité du cache en heures")
+    parser.add_argument("--max-bytes", type=int, default=MAX_TITLE_BYTES,
+                        help="octets lus au plus par page pour trouver le titre")
+    args = parser.parse_args()
+
+    if args.urls:
+        urls = args.urls
+    else:
+        links = scan_links()
+        urls = list(links)
+        print(f"[*] {len(urls)} lien(s) externe(s) dans {WRITEUPS_DIR}")
+    if not urls:
+        return
+
+    start = time.perf_counter()
+    titles, stats = fetch_titles(urls, TitleCache(ttl=args.ttl * 3600), jobs=args.jobs,
+                                 per_host=args.per_host, refresh=args.refresh, max_bytes=args.max_bytes)
+    for url, title in titles.items():
+        print(f"URL: {url}")
+        print(f"TITLE: {title}")
+        print("---")
+    elapsed = time.perf_counter() - start
+    print(f"[*] {len(urls)} URL en {elapsed:.2f}s: {stats['cached']} en cache, "
+          f"{stats['revalidated']} revalidee(s) (304), {stats['fetched']} telechargee(s), "
+          f"{stats['failed']} en echec")
+    print(f"[*] {stats['bytes_read'] / 1024:.1f}KB lus, {stats['bytes_saved'] / 1024:.1f}KB evites "
+          f"en coupant {stats['cut']} reponse(s) apres le titre"
+          + (f" (+{stats['cut_unknown']} de taille inconnue)" if stats['cut_unknown'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,120 +1,797 @@
 #!/usr/bin/env python3
 """
-Script pour ajouter une image à la galerie.
-Usage: python update.py /chemin/absolu/vers/image.jpg
+Script pour ajouter des images à la galerie.
+Usage: python update.py /chemin/vers/image.jpg [autre.png | dossier/ ...] [--yes | --skip-existing] [--jobs N]
+       python update.py --variants [--jobs N]
+       python update.py --reindex | --verify
+Options communes: --encoder auto|pillow|magick
+
+Chaque image est convertie en WebP pleine taille (utilisée par la modale) et en
+variantes réduites (VARIANT_WIDTHS) servies à la grille via srcset. Le manifest
+(version MANIFEST_VERSION) décrit chaque image: dimensions, poids, couleur
+dominante et placeholder, pour que la grille réserve la place avant le chargement.
+
+manifest.json n'est qu'un petit index: les entrées sont réparties en pages de
+PAGE_SIZE images (gallery/pages/<n>.json) que gallery.js charge au défilement,
+et des tables alias -> page (gallery/pages/alias-<c>.json, par premier caractère
+de l'alias) permettent d'ouvrir un lien #alias sans charger toutes les pages.
+
+L'encodage passe par un backend: Pillow (dans le process, un seul décodage par
+image pour toutes les tailles) s'il est installé, sinon ImageMagick (un process
+`magick` par fichier produit). Voir bench_encoders.py pour les comparer.
 """
 
 import os
 import sys
 import json
+import time
+import base64
+import hashlib
+import struct
 import shutil
+import argparse
 import subprocess
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration - chemins relatifs au dossier Portfolio
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PORTFOLIO_DIR = os.path.join(SCRIPT_DIR, "..", "Portfolio")
 GALLERY_DIR = os.path.join(PORTFOLIO_DIR, "gallery")
 MANIFEST_PATH = os.path.join(GALLERY_DIR, "manifest.json")
+# Pages du manifest et tables alias -> page, chargées à la demande par gallery.js
+PAGES_DIR = os.path.join(GALLERY_DIR, "pages")
+# Cache des hash de contenu (nom -> taille, mtime, sha256) pour --reindex
+HASH_CACHE_PATH = os.path.join(SCRIPT_DIR, ".gallery_hashes.json")
+# Index des hash perceptuels (dHash 64 bits) de la galerie, pour repérer les quasi-doublons
+PHASH_PATH = os.path.join(GALLERY_DIR, "phash.json")
 
 # Extensions d'images acceptées
 VALID_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.tiff')
 
+# Largeurs des variantes réduites (miniature, moyenne) ; la pleine taille reste à la racine
+VARIANT_WIDTHS = (400, 800)
+
+# Version du format de manifest.json ({"version", "total", "page_size", "pages"}) ;
+# v2 = {"version", "images": [...]} d'un seul bloc, v1 = liste de noms
+MANIFEST_VERSION = 3
+
+# Nombre d'images par page du manifest (multiple de 1, 2 et 3 colonnes de la grille)
+PAGE_SIZE = 24
 
-def convert_to_webp(source_path: str, dest_path: str, quality: int = 85) -> bool:
-    """Convertit une image en WebP avec ImageMagick."""
+# Taille max (px) du placeholder flou inliné dans le manifest
+PLACEHOLDER_SIZE = 16
+
+# Distance de Hamming max (sur 64 bits) entre deux dHash pour parler de quasi-doublon
+PHASH_THRESHOLD = 6
+
+
+def convert_to_webp(source_path: str, dest_path: str, quality: int = 85, width: int = None) -> bool:
+    """Convertit une image en WebP avec ImageMagick, réduite à `width` pixels de large si besoin."""
+    resize = ["-resize", f"{width}x>"] if width else []
     try:
         subprocess.run(
-            ["magick", source_path, "-quality", str(quality), dest_path],
+            ["magick", source_path, *resize, "-quality", str(quality), dest_path],
             check=True,
             capture_output=True
         )
         return True
     except subprocess.CalledProcessError as e:
-        print(f"[-] Erreur de conversion: {e.stderr.decode()}")
+        print(f"[-] Erreur de conversion ({os.path.basename(source_path)}): {e.stderr.decode()}")
         return False
     except FileNotFoundError:
         print("[-] ImageMagick n'est pas installe. Installe-le avec: sudo pacman -S imagemagick")
         return False
 
 
-def add_image(image_path: str) -> None:
-    """Ajoute une image à la galerie: copie, convertit en WebP, et met à jour le manifest."""
-    
-    # Vérifie que le fichier existe
-    if not os.path.isfile(image_path):
-        print(f"[-] Fichier non trouve: {image_path}")
-        sys.exit(1)
-    
-    # Vérifie l'extension
-    _, ext = os.path.splitext(image_path)
-    if ext.lower() not in VALID_EXTENSIONS:
-        print(f"[-] Extension non supportee: {ext}")
-        print(f"   Extensions valides: {', '.join(VALID_EXTENSIONS)}")
-        sys.exit(1)
-    
+class MagickEncoder:
+    """Backend ImageMagick: un process `magick` par fichier produit."""
+
+    name = "magick"
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("magick") is not None
+
+    @staticmethod
+    def supports(image_format: str) -> bool:
+        """ImageMagick choisit le format d'après l'extension ; une absence se voit à l'encodage."""
+        return True
+
+    def encode(self, source_path: str, outputs: list, quality: int = 85) -> bool:
+        """Écrit chaque sortie (chemin, largeur max ou None) en WebP, ou au format de son extension."""
+        return all(convert_to_webp(source_path, dest_path, quality, width)
+                   for dest_path, width in outputs)
+
+    def preview(self, path: str):
+        """Couleur dominante (#rrggbb) et placeholder WebP minuscule (data URI)."""
+        try:
+            color = subprocess.run(
+                ["magick", path, "-resize", "1x1!", "-format", "%[hex:p{0,0}]", "info:"],
+                check=True, capture_output=True
+            ).stdout.decode().strip()
+            thumb = subprocess.run(
+                ["magick", path, "-resize", f"{PLACEHOLDER_SIZE}x{PLACEHOLDER_SIZE}>",
+                 "-strip", "-quality", "40", "webp:-"],
+                check=True, capture_output=True
+            ).stdout
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return f"#{color[:6].lower()}", "data:image/webp;base64," + base64.b64encode(thumb).decode()
+
+    def gray_thumbnail(self, path: str):
+        """Miniature 9x8 en niveaux de gris (72 octets), base du dHash."""
+        try:
+            return subprocess.run(
+                ["magick", f"{path}[0]", "-colorspace", "Gray", "-resize", "9x8!", "-depth", "8", "gray:-"],
+                check=True, capture_output=True
+            ).stdout
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+
+
+class PillowEncoder:
+    """Backend Pillow: décode l'image une fois et encode toutes les tailles dans le process."""
+
+    name = "pillow"
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import PIL.Image  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _open(path: str):
+        from PIL import Image
+        image = Image.open(path)
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        return image
+
+    @staticmethod
+    def supports(image_format: str) -> bool:
+        """Vrai si Pillow sait encoder ce format ('webp', 'avif')."""
+        from PIL import features
+        return bool(features.check(image_format))
+
+    def encode(self, source_path: str, outputs: list, quality: int = 85) -> bool:
+        """Écrit chaque sortie (chemin, largeur max ou None) depuis la même image décodée.
+
+        Le format suit l'extension de la sortie (.webp, .avif).
+        """
+        from PIL import Image
+        try:
+            image = self._open(source_path)
+            for dest_path, width in outputs:
+                resized = image
+                if width and image.width > width:
+                    height = max(1, round(image.height * width / image.width))
+                    resized = image.resize((width, height), Image.LANCZOS)
+                resized.save(dest_path, os.path.splitext(dest_path)[1][1:].upper(), quality=quality)
+        except OSError as e:
+            print(f"[-] Erreur de conversion ({os.path.basename(source_path)}): {e}")
+            return False
+        return True
+
+    def preview(self, path: str):
+        """Couleur dominante (#rrggbb) et placeholder WebP minuscule (data URI)."""
+        from PIL import Image
+        try:
+            image = self._open(path)
+        except OSError:
+            return None
+        r, g, b = image.convert("RGB").resize((1, 1), Image.BOX).getpixel((0, 0))
+        thumb = image.copy()
+        thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        buffer = BytesIO()
+        thumb.save(buffer, "WEBP", quality=40)
+        return f"#{r:02x}{g:02x}{b:02x}", "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    def gray_thumbnail(self, path: str):
+        """Miniature 9x8 en niveaux de gris (72 octets), base du dHash."""
+        from PIL import Image
+        try:
+            return self._open(path).convert("L").resize((9, 8), Image.BOX).tobytes()
+        except OSError:
+            return None
+
+
+ENCODERS = {encoder.name: encoder for encoder in (PillowEncoder, MagickEncoder)}
+_encoder = None
+
+
+def get_encoder(name: str = "auto"):
+    """Backend d'encodage: celui demandé, ou Pillow s'il est installé et ImageMagick sinon."""
+    global _encoder
+    if name != "auto":
+        _encoder = ENCODERS[name]()
+    elif _encoder is None:
+        _encoder = PillowEncoder() if PillowEncoder.available() else MagickEncoder()
+    return _encoder
+
+
+def variant_path(webp_name: str, width: int) -> str:
+    """Chemin d'une variante réduite: gallery/<largeur>w/<nom>.webp"""
+    return os.path.join(GALLERY_DIR, f"{width}w", webp_name)
+
+
+def read_dimensions(path: str):
+    """Lit (largeur, hauteur) dans l'en-tête d'un WebP, PNG, GIF ou JPEG sans décoder l'image."""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                w, h = struct.unpack('<HH', head[26:30])
+                return w & 0x3fff, h & 0x3fff
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            if chunk == b'VP8X':
+                return (int.from_bytes(head[24:27], 'little') + 1,
+                        int.from_bytes(head[27:30], 'little') + 1)
+        elif head[:8] == b'\x89PNG\r\n\x1a\n':
+            return struct.unpack('>II', head[16:24])
+        elif head[:4] == b'GIF8':
+            return struct.unpack('<HH', head[6:10])
+        elif head[:2] == b'\xff\xd8':
+            # Parcourt les segments jusqu'au SOFn qui porte les dimensions
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xff:
+                    return None
+                if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+                    _, h, w = struct.unpack('>HxHH', f.read(7))
+                    return w, h
+                length = struct.unpack('>H', f.read(2))[0]
+                f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def image_preview(path: str):
+    """Couleur dominante (#rrggbb) et placeholder WebP minuscule (data URI)."""
+    return get_encoder().preview(path)
+
+
+def manifest_entry(webp_name: str, previous: dict = None, preview: bool = True) -> dict:
+    """Entrée du manifest pour une image: dimensions, poids, couleur, placeholder et variantes.
+
+    Couleur et placeholder de `previous` sont repris tant que le fichier n'a pas changé de taille ;
+    avec `preview=False`, ils ne sont jamais recalculés (pas d'appel à ImageMagick).
+    """
+    path = os.path.join(GALLERY_DIR, webp_name)
+    entry = {"file": webp_name}
+    if not os.path.exists(path):
+        return entry
+
+    entry["bytes"] = os.path.getsize(path)
+    dimensions = read_dimensions(path)
+    if dimensions:
+        entry["width"], entry["height"] = dimensions
+
+    if previous and previous.get("bytes") == entry["bytes"] and "placeholder" in previous:
+        entry["color"], entry["placeholder"] = previous["color"], previous["placeholder"]
+    elif preview:
+        colors = image_preview(path)
+        if colors:
+            entry["color"], entry["placeholder"] = colors
+
+    variants = {str(width): f"{width}w/{webp_name}" for width in VARIANT_WIDTHS
+                if os.path.exists(variant_path(webp_name, width))}
+    if variants:
+        entry["variants"] = variants
+    return entry
+
+
+def perceptual_hash(path: str):
+    """dHash 64 bits: compare chaque pixel à son voisin de droite sur une miniature 9x8 en gris."""
+    raw = get_encoder().gray_thumbnail(path)
+    if not raw or len(raw) != 72:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (raw[row * 9 + col] > raw[row * 9 + col + 1])
+    return bits
+
+
+class BKTree:
+    """Arbre BK sur la distance de Hamming: la recherche n'explore que les branches utiles."""
+
+    def __init__(self, items=()):
+        self.root = None  # (hash, nom, {distance: noeud})
+        for value, name in items:
+            self.add(value, name)
+
+    def add(self, value: int, name: str) -> None:
+        if self.root is None:
+            self.root = (value, name, {})
+            return
+        node = self.root
+        while True:
+            distance = (value ^ node[0]).bit_count()
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, name, {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list:
+        """Renvoie [(distance, nom)] des hash à au plus `max_distance`, du plus proche au plus loin."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, name, children = stack.pop()
+            distance = (value ^ node_value).bit_count()
+            if distance <= max_distance:
+                found.append((distance, name))
+            # Inégalité triangulaire: seuls les enfants à distance +/- max_distance peuvent matcher
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found)
+
+
+def load_phash_index() -> dict:
+    """Charge l'index des hash perceptuels: nom WebP -> dHash."""
+    try:
+        with open(PHASH_PATH, 'r') as f:
+            return {name: int(value, 16) for name, value in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_phash_index(index: dict) -> None:
+    """Sauvegarde l'index des hash perceptuels de façon atomique."""
+    tmp_path = PHASH_PATH + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({name: f"{value:016x}" for name, value in sorted(index.items())}, f, indent=2)
+    os.replace(tmp_path, PHASH_PATH)
+
+
+def filter_near_duplicates(jobs: list, index: dict, workers: int, allow: bool = False):
+    """Écarte les images quasi identiques à une image de la galerie ou du lot, avant conversion.
+
+    Renvoie (jobs gardés, {nom WebP: dHash}). Avec `allow`, prévient sans rien écarter.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(lambda job: perceptual_hash(job[0]), jobs))
+
+    # Une image remplacée (même nom WebP) ne compte pas comme doublon d'elle-même
+    replaced = {webp_name for _, webp_name in jobs}
+    tree = BKTree((value, name) for name, value in index.items() if name not in replaced)
+
+    kept = []
+    kept_hashes = {}
+    for (image_path, webp_name), value in zip(jobs, hashes):
+        if value is not None:
+            matches = tree.search(value, PHASH_THRESHOLD)
+            if matches:
+                distance, match = matches[0]
+                print(f"[!] {os.path.basename(image_path)} ressemble a {match} (distance {distance}/64)")
+                if not allow:
+                    print("   Ignoree (--allow-duplicates pour l'ajouter quand meme).")
+                    continue
+            tree.add(value, webp_name)
+            kept_hashes[webp_name] = value
+        kept.append((image_path, webp_name))
+    return kept, kept_hashes
+
+
+def gallery_alias(filename: str) -> str:
+    """Alias de 8 caractères d'une image, identique à getAlias() de gallery.js (lien #alias)."""
+    units = filename.encode('utf-16-le')
+    value = 0
+    for i in range(0, len(units), 2):
+        # Arithmétique 32 bits signée comme `hash |= 0` en JavaScript
+        value = ((value << 5) - value + int.from_bytes(units[i:i + 2], 'little')) & 0xFFFFFFFF
+    if value >= 0x80000000:
+        value -= 0x100000000
+    seed = abs(value)
+    chars = "abcdefghijklmnopqrstuvwxyz0123456789"
+    alias = ""
+    for _ in range(8):
+        seed = (seed * 1664525 + 1013904223) % 4294967296
+        alias += chars[seed % len(chars)]
+    return alias
+
+
+def _write_json(path: str, data, indent=None) -> None:
+    """Écrit un JSON de façon atomique (fichier temporaire + rename)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def manifest_version() -> int:
+    """Version du manifest sur disque (1 pour l'ancienne liste de noms, 0 s'il n'existe pas)."""
+    try:
+        with open(MANIFEST_PATH, 'r') as f:
+            data = json.load(f)
+    except OSError:
+        return 0
+    return data.get("version", 2) if isinstance(data, dict) else 1
+
+
+def load_manifest() -> list:
+    """Charge le manifest existant (v3 paginé, v2 ou ancienne liste de noms) en liste d'entrées."""
+    if not os.path.exists(MANIFEST_PATH):
+        return []
+    with open(MANIFEST_PATH, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "pages" in data:
+        images = []
+        for page in range(data["pages"]):
+            with open(os.path.join(PAGES_DIR, f"{page}.json"), 'r') as f:
+                images.extend(json.load(f)["images"])
+    else:
+        images = data["images"] if isinstance(data, dict) else data
+    return [{"file": entry} if isinstance(entry, str) else entry for entry in images]
+
+
+def save_manifest(manifest: list) -> None:
+    """Sauvegarde le manifest: pages de PAGE_SIZE entrées, tables d'alias, puis l'index.
+
+    L'index est écrit en dernier (rename atomique) pour ne jamais référencer une page
+    pas encore écrite ; les pages et tables devenues inutiles sont supprimées ensuite.
+    """
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    pages = [manifest[i:i + PAGE_SIZE] for i in range(0, len(manifest), PAGE_SIZE)]
+    buckets = {}
+    written = set()
+    for page, entries in enumerate(pages):
+        _write_json(os.path.join(PAGES_DIR, f"{page}.json"), {"page": page, "images": entries})
+        written.add(f"{page}.json")
+        for entry in entries:
+            alias = gallery_alias(entry["file"])
+            buckets.setdefault(alias[0], {})[alias] = page
+    for key, aliases in buckets.items():
+        _write_json(os.path.join(PAGES_DIR, f"alias-{key}.json"), dict(sorted(aliases.items())))
+        written.add(f"alias-{key}.json")
+
+    _write_json(MANIFEST_PATH, {
+        "version": MANIFEST_VERSION,
+        "total": len(manifest),
+        "page_size": PAGE_SIZE,
+        "pages": len(pages),
+    }, indent=2)
+
+    for name in os.listdir(PAGES_DIR):
+        if name.endswith(".json") and name not in written:
+            os.remove(os.path.join(PAGES_DIR, name))
+
+
+def collect_images(paths: list) -> list:
+    """Développe les dossiers et garde les fichiers d'image valides, dans l'ordre donné."""
+    images = []
+    for path in paths:
+        path = os.path.abspath(os.path.expanduser(path))  # Supporte ~/
+        if os.path.isdir(path):
+            entries = sorted(os.path.join(path, name) for name in os.listdir(path))
+            images.extend(p for p in entries
+                          if os.path.isfile(p) and p.lower().endswith(VALID_EXTENSIONS))
+        elif not os.path.isfile(path):
+            print(f"[-] Fichier non trouve: {path}")
+        elif not path.lower().endswith(VALID_EXTENSIONS):
+            print(f"[-] Extension non supportee: {os.path.splitext(path)[1]}")
+            print(f"   Extensions valides: {', '.join(VALID_EXTENSIONS)}")
+        else:
+            images.append(path)
+    return images
+
+
+def plan_conversions(images: list, overwrite=None) -> list:
+    """Associe chaque image à son nom WebP et règle les conflits avant toute conversion.
+
+    `overwrite` à True/False répond d'office aux conflits avec la galerie ;
+    à None, les questions sont toutes posées ici, avant de lancer le lot.
+    """
+    jobs = []
+    seen = set()
+    for image_path in images:
+        # Nom du fichier WebP final
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        webp_name = f"{base_name}.webp"
+        if webp_name in seen:
+            print(f"[!] {os.path.basename(image_path)} ignoree: {webp_name} est deja dans ce lot.")
+            continue
+        seen.add(webp_name)
+
+        # Vérifie si l'image existe déjà
+        if os.path.exists(os.path.join(GALLERY_DIR, webp_name)):
+            if overwrite is None:
+                print(f"[!] L'image {webp_name} existe deja dans la galerie.")
+                replace = input("   Écraser? [o/N] ").strip().lower() == 'o'
+            else:
+                replace = overwrite
+            if not replace:
+                print(f"   {webp_name} ignoree.")
+                continue
+        jobs.append((image_path, webp_name))
+    return jobs
+
+
+def variant_outputs(webp_name: str, overwrite: bool = True) -> list:
+    """Sorties (chemin, largeur) des variantes réduites d'une image, dossiers créés."""
+    outputs = []
+    for width in VARIANT_WIDTHS:
+        dest_path = variant_path(webp_name, width)
+        if not overwrite and os.path.exists(dest_path):
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        outputs.append((dest_path, width))
+    return outputs
+
+
+def convert_variants(source_path: str, webp_name: str, overwrite: bool = True) -> bool:
+    """Génère les variantes réduites d'une image."""
+    outputs = variant_outputs(webp_name, overwrite)
+    return not outputs or get_encoder().encode(source_path, outputs)
+
+
+def _convert_job(job: tuple):
+    """Convertit une image du lot ; renvoie (entrée du manifest, taille source) ou None."""
+    image_path, webp_name = job
+    original_size = os.path.getsize(image_path)
+    if original_size == 0:
+        print(f"[-] {os.path.basename(image_path)}: fichier vide, ignore")
+        return None
+    # Pleine taille et variantes en un seul appel: Pillow ne décode la source qu'une fois
+    outputs = [(os.path.join(GALLERY_DIR, webp_name), None)] + variant_outputs(webp_name)
+    if not get_encoder().encode(image_path, outputs):
+        return None
+    return manifest_entry(webp_name), original_size
+
+
+def add_images(paths: list, overwrite=None, workers: int = None, allow_duplicates: bool = False) -> bool:
+    """Ajoute un lot d'images: conversions WebP en parallèle, puis une seule écriture du manifest."""
+    images = collect_images(paths)
+    if not images:
+        print("[-] Aucune image a ajouter.")
+        return False
+
     # Crée le dossier gallery si nécessaire
     os.makedirs(GALLERY_DIR, exist_ok=True)
-    
-    # Nom du fichier WebP final
-    base_name = os.path.splitext(os.path.basename(image_path))[0]
-    webp_name = f"{base_name}.webp"
-    webp_path = os.path.join(GALLERY_DIR, webp_name)
-    
-    # Vérifie si l'image existe déjà
-    if os.path.exists(webp_path):
-        print(f"[!] L'image {webp_name} existe deja dans la galerie.")
-        response = input("   Écraser? [o/N] ").strip().lower()
-        if response != 'o':
-            print("   Annulé.")
-            sys.exit(0)
-    
-    # Convertit en WebP
-    print(f"[*] Conversion de {os.path.basename(image_path)} en WebP...")
-    if not convert_to_webp(image_path, webp_path):
-        sys.exit(1)
-    
-    # Taille du fichier
-    original_size = os.path.getsize(image_path) / 1024
-    webp_size = os.path.getsize(webp_path) / 1024
-    reduction = ((original_size - webp_size) / original_size) * 100
-    print(f"[+] Converti: {original_size:.1f}KB -> {webp_size:.1f}KB ({reduction:.1f}% de reduction)")
-    
-    # Met à jour le manifest
-    print("[*] Mise a jour du manifest...")
-    
-    # Charge le manifest existant ou crée une liste vide
-    if os.path.exists(MANIFEST_PATH):
-        with open(MANIFEST_PATH, 'r') as f:
-            manifest = json.load(f)
+
+    # Conversions CPU: au plus une par coeur (process magick ou encodage Pillow hors GIL)
+    workers = workers or os.cpu_count() or 1
+
+    jobs = plan_conversions(images, overwrite)
+    phash_index = load_phash_index()
+    jobs, phashes = filter_near_duplicates(jobs, phash_index, workers, allow_duplicates)
+    if not jobs:
+        print("   Annulé.")
+        return True
+
+    print(f"[*] Conversion de {len(jobs)} image(s) en WebP ({min(workers, len(jobs))} en parallele, "
+          f"backend {get_encoder().name})...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_convert_job, jobs))
+
+    added = []
+    for result in results:
+        if result is None:
+            continue
+        entry, original_size = result
+        webp_size = entry["bytes"]
+        reduction = ((original_size - webp_size) / original_size) * 100
+        print(f"[+] {entry['file']}: {original_size / 1024:.1f}KB -> {webp_size / 1024:.1f}KB "
+              f"({reduction:.1f}% de reduction)")
+        added.append(entry)
+
+    if added:
+        # Met à jour le manifest
+        print("[*] Mise a jour du manifest...")
+        manifest = load_manifest()
+
+        # Retire les images déjà présentes (pour éviter les doublons) et ajoute le lot en haut
+        added_names = {entry["file"] for entry in added}
+        manifest = added + [entry for entry in manifest if entry["file"] not in added_names]
+        save_manifest(manifest)
+        phash_index.update((name, phashes[name]) for name in added_names if name in phashes)
+        save_phash_index(phash_index)
+
+        print(f"[+] {len(added)} image(s) ajoutee(s) en haut du manifest ({len(manifest)} images au total)")
+        print(f"\n[*] N'oublie pas: git add . && git commit -m 'feat: add {len(added)} image(s)' && git push")
+
+    failed = len(jobs) - len(added)
+    if failed:
+        print(f"[-] {failed} conversion(s) en echec.")
+    return failed == 0
+
+
+def build_variants(workers: int = None, overwrite: bool = False) -> bool:
+    """Génère les variantes manquantes de toute la galerie et réécrit le manifest au format v3 (paginé)."""
+    manifest = load_manifest()
+    names = [entry["file"] for entry in manifest]
+
+    def job(entry):
+        name = entry["file"]
+        ok = convert_variants(os.path.join(GALLERY_DIR, name), name, overwrite)
+        return ok, manifest_entry(name, entry)
+
+    workers = workers or os.cpu_count() or 1
+    print(f"[*] Generation des variantes {', '.join(f'{w}w' for w in VARIANT_WIDTHS)} "
+          f"pour {len(names)} image(s)...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(job, manifest))
+
+    save_manifest([entry for _, entry in results])
+
+    # Complète l'index des hash perceptuels pour les images qui n'y sont pas encore
+    phash_index = load_phash_index()
+    missing = [name for name in names if name not in phash_index]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, value in zip(missing, pool.map(
+                lambda name: perceptual_hash(os.path.join(GALLERY_DIR, name)), missing)):
+            if value is not None:
+                phash_index[name] = value
+    save_phash_index(phash_index)
+
+    full_size = sum(os.path.getsize(os.path.join(GALLERY_DIR, name)) for name in names)
+    thumb_size = sum(os.path.getsize(variant_path(name, VARIANT_WIDTHS[0])) for name in names
+                     if os.path.exists(variant_path(name, VARIANT_WIDTHS[0])))
+    print(f"[+] Manifest mis a jour: {full_size / 1024:.0f}KB en pleine taille, "
+          f"{thumb_size / 1024:.0f}KB en miniatures {VARIANT_WIDTHS[0]}w")
+
+    failed = sum(not ok for ok, _ in results)
+    if failed:
+        print(f"[-] {failed} image(s) en echec.")
+    return failed == 0
+
+
+def scan_gallery() -> dict:
+    """Liste les images à la racine de la galerie en un seul parcours: nom -> stat."""
+    stats = {}
+    with os.scandir(GALLERY_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(VALID_EXTENSIONS):
+                stats[entry.name] = entry.stat()
+    return stats
+
+
+def hash_files(stats: dict) -> dict:
+    """sha256 du contenu de chaque fichier, réutilisé du cache tant que taille et mtime sont identiques."""
+    try:
+        with open(HASH_CACHE_PATH, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    hashes = {}
+    fresh = {}
+    for name, stat in stats.items():
+        cached = cache.get(name)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            digest = cached[2]
+        else:
+            with open(os.path.join(GALLERY_DIR, name), 'rb') as f:
+                digest = hashlib.file_digest(f, 'sha256').hexdigest()
+        hashes[name] = digest
+        fresh[name] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    if fresh != cache:
+        tmp_path = HASH_CACHE_PATH + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(fresh, f)
+        os.replace(tmp_path, HASH_CACHE_PATH)
+    return hashes
+
+
+def reindex(write: bool = True) -> bool:
+    """Réconcilie le manifest avec le contenu de la galerie.
+
+    Garde l'ordre du manifest, retire les entrées sans fichier, les doublons de contenu
+    et les originaux non-WebP qui ont leur version .webp, puis ajoute à la fin les
+    fichiers absents du manifest. Avec `write=False`, se contente du rapport et
+    renvoie False si le manifest n'est pas à jour.
+    """
+    start = time.perf_counter()
+    stats = scan_gallery()
+    hashes = hash_files(stats)
+    manifest = load_manifest()
+    previous = {entry["file"]: entry for entry in manifest}
+
+    listed = [entry["file"] for entry in manifest]
+    missing = [name for name in listed if name not in stats]
+    orphans = sorted(name for name in stats if name not in previous)
+
+    kept = []
+    seen = {}  # sha256 -> premier fichier gardé
+    wasted_duplicates = wasted_originals = 0
+    for name in [name for name in listed if name in stats] + orphans:
+        base_name, ext = os.path.splitext(name)
+        size = stats[name].st_size
+        if ext.lower() != '.webp' and f"{base_name}.webp" in stats:
+            print(f"[!] Original non-WebP: {name} ({size / 1024:.1f}KB), {base_name}.webp existe")
+            wasted_originals += size
+            continue
+        digest = hashes[name]
+        if digest in seen:
+            print(f"[!] Doublon: {name} ({size / 1024:.1f}KB) identique a {seen[digest]}")
+            wasted_duplicates += size
+            continue
+        seen[digest] = name
+        kept.append(name)
+
+    for name in missing:
+        print(f"[!] Fichier manquant, retire du manifest: {name}")
+    for name in orphans:
+        if name in kept:
+            print(f"[+] Fichier absent du manifest, ajoute a la fin: {name}")
+
+    # Un manifest d'un ancien format est réécrit même si la liste n'a pas changé
+    up_to_date = kept == listed and manifest_version() == MANIFEST_VERSION
+    if write and not up_to_date:
+        save_manifest([manifest_entry(name, previous.get(name), preview=False) for name in kept])
+        print(f"[+] Manifest reecrit ({len(kept)} images)")
+        phash_index = load_phash_index()
+        if set(phash_index) - set(kept):
+            save_phash_index({name: value for name, value in phash_index.items() if name in kept})
+    elif up_to_date:
+        print(f"[+] Manifest a jour ({len(kept)} images)")
     else:
-        manifest = []
-    
-    # Retire l'image si elle existe déjà (pour éviter les doublons)
-    manifest = [img for img in manifest if img != webp_name]
-    
-    # Ajoute en haut du manifest
-    manifest.insert(0, webp_name)
-    
-    # Sauvegarde le manifest
-    with open(MANIFEST_PATH, 'w') as f:
-        json.dump(manifest, f, indent=2)
-    
-    print(f"[+] {webp_name} ajoute en haut du manifest ({len(manifest)} images au total)")
-    print(f"\n[*] N'oublie pas: git add . && git commit -m 'feat: add {base_name}' && git push")
+        print("[-] Manifest a corriger: lance python scripts/update.py --reindex")
 
+    elapsed = time.perf_counter() - start
+    print(f"[*] {len(stats)} fichier(s) analyse(s) en {elapsed * 1000:.0f} ms: "
+          f"{wasted_duplicates / 1024:.1f}KB en doublons, "
+          f"{wasted_originals / 1024:.1f}KB en originaux non-WebP")
+    return write or up_to_date
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python update.py /chemin/absolu/vers/image.jpg")
-        print("\nExemple:")
-        print("  python scripts/update.py ~/Images/photo.jpg")
+
+def add_image(image_path: str) -> None:
+    """Ajoute une image à la galerie: copie, convertit en WebP, et met à jour le manifest."""
+    if not add_images([image_path]):
         sys.exit(1)
-    
-    image_path = os.path.expanduser(sys.argv[1])  # Supporte ~/
-    image_path = os.path.abspath(image_path)      # Convertit en chemin absolu
-    
-    add_image(image_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ajoute des images à la galerie (conversion WebP + manifest).",
+        epilog="Exemple: python scripts/update.py ~/Images/photo.jpg ~/Images/lot/ --skip-existing",
+    )
+    parser.add_argument("paths", nargs="*", help="images ou dossiers d'images")
+    parser.add_argument("--variants", action="store_true",
+                        help="génère les variantes manquantes de toute la galerie et "
+                             "met à jour les métadonnées du manifest")
+    parser.add_argument("--reindex", action="store_true",
+                        help="réconcilie le manifest avec les fichiers de la galerie "
+                             "(manquants, orphelins, doublons)")
+    parser.add_argument("--verify", action="store_true",
+                        help="comme --reindex, sans écrire ; code de sortie 1 si le manifest est à corriger")
+    choice = parser.add_mutually_exclusive_group()
+    choice.add_argument("-y", "--yes", dest="overwrite", action="store_const", const=True,
+                        help="écrase les images déjà présentes sans demander")
+    choice.add_argument("--skip-existing", dest="overwrite", action="store_const", const=False,
+                        help="ignore les images déjà présentes sans demander")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="nombre de conversions simultanées (défaut: nombre de coeurs)")
+    parser.add_argument("--encoder", choices=["auto", *ENCODERS], default="auto",
+                        help="backend d'encodage (défaut: Pillow si installé, sinon ImageMagick)")
+    parser.add_argument("--allow-duplicates", action="store_true",
+                        help="ajoute aussi les images quasi identiques à une image existante")
+    args = parser.parse_args()
+    get_encoder(args.encoder)
+
+    if args.reindex or args.verify:
+        sys.exit(0 if reindex(write=args.reindex) else 1)
+    if args.variants:
+        sys.exit(0 if build_variants(workers=args.jobs, overwrite=bool(args.overwrite)) else 1)
+    if not args.paths:
+        parser.error("au moins une image ou un dossier est requis")
+
+    success = add_images(args.paths, overwrite=args.overwrite, workers=args.jobs,
+                         allow_duplicates=args.allow_duplicates)
+    sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
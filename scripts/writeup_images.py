@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Images des writeups: variantes AVIF/WebP et <picture> responsive.
+Usage: python writeup_images.py [writeup ...] [--workers N] [--check]
+
+Pour chaque image d'une <figure class="image"> d'un writeup (captures Notion en
+PNG le plus souvent), des variantes AVIF et WebP sont écrites à côté de l'original
+aux largeurs WIDTHS (jamais au-delà de la largeur d'origine), avec le même encodeur
+que la galerie (update.get_encoder). Leur nom contient le hash du contenu de
+l'original et des réglages (image-960w.<hash>.webp): une variante déjà présente
+n'est pas réencodée, et celles d'une ancienne version de l'image sont supprimées.
+
+L'<img> de la figure devient un <picture> (une <source> par format, srcset/sizes),
+avec width/height (pas de décalage de mise en page), loading="lazy" et
+decoding="async". L'original reste le src de secours. Sans encodeur (ni Pillow ni
+ImageMagick), seules les dimensions et le chargement différé sont ajoutés.
+
+add_writeup.py l'applique aux writeups qu'il génère ; sans argument, ce script
+rattrape tous les dossiers de writeups/ (les conversions tournent en parallèle).
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import html
+import hashlib
+import argparse
+from pathlib import Path
+from urllib.parse import quote, unquote
+from concurrent.futures import ThreadPoolExecutor
+
+import update
+
+# Racines du projet
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
+WRITEUPS_DIR = PROJECT_ROOT / "writeups"
+
+# Largeurs des variantes, formats par ordre de préférence, qualité d'encodage
+WIDTHS = (480, 960, 1600)
+FORMATS = ("avif", "webp")
+QUALITY = {"avif": 55, "webp": 80}
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+HASH_LENGTH = 10
+
+# Colonne de contenu des writeups: .writeups-container (900px, 1.5rem de marge de chaque côté)
+SIZES = "(max-width: 900px) 100vw, 852px"
+
+_MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+_FIGURE_RE = re.compile(r'(<figure\b[^>]*class="[^"]*\bimage\b[^"]*"[^>]*>)(.*?)(</figure>)', re.DOTALL)
+_IMAGE_RE = re.compile(r'<picture>.*?</picture>|<img\b[^>]*>', re.DOTALL)
+_IMG_RE = re.compile(r'<img\b[^>]*>')
+_ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def _settings() -> bytes:
+    return json.dumps([WIDTHS, FORMATS, QUALITY]).encode('utf-8')
+
+
+def variant_widths(width: int) -> list:
+    """Largeurs des variantes d'une image de `width` pixels (au moins une, à sa taille)."""
+    return sorted({min(w, width) for w in WIDTHS})
+
+
+def plan_variants(path: Path, width: int) -> dict:
+    """Format -> [(largeur, chemin de la variante)] pour une image, d'après son contenu."""
+    digest = hashlib.sha256(path.read_bytes() + _settings()).hexdigest()[:HASH_LENGTH]
+    return {fmt: [(w, path.with_name(f"{path.stem}-{w}w.{digest}.{fmt}")) for w in variant_widths(width)]
+            for fmt in FORMATS}
+
+
+def stale_variants(path: Path, current: dict) -> list:
+    """Variantes d'anciennes versions de l'image (même nom, autre hash)."""
+    keep = {variant for variants in current.values() for _, variant in variants}
+    found = []
+    for fmt in FORMATS:
+        pattern = f"{glob.escape(path.stem)}-*w.*.{fmt}"
+        found.extend(p for p in path.parent.glob(pattern) if p not in keep
+                     and re.fullmatch(rf'-\d+w\.[0-9a-f]{{{HASH_LENGTH}}}', p.name[len(path.stem):-len(fmt) - 1]))
+    return found
+
+
+def optimize_image(path: Path, check: bool = False) -> dict:
+    """Variantes d'une image (créées si besoin) ; renvoie {width, height, variants, encoded, missing}.
+
+    Les variantes déjà présentes servent même sans encodeur ; en mode check rien
+    n'est écrit et `missing` compte celles qui manquent.
+    """
+    dimensions = update.read_dimensions(str(path))
+    if not dimensions:
+        return None
+    width, height = dimensions
+    encoder = update.get_encoder()
+    variants = plan_variants(path, width)
+    # Un format que l'encodeur installé ne sait pas produire n'est pas compté comme manquant
+    missing = {fmt: [(str(variant), w) for w, variant in items if not variant.exists()]
+               for fmt, items in variants.items() if not encoder.available() or encoder.supports(fmt)}
+    encoded = 0
+    if not check and encoder.available():
+        # Un seul décodage de l'original par format
+        for fmt, outputs in missing.items():
+            if outputs and encoder.encode(str(path), outputs, QUALITY[fmt]):
+                encoded += len(outputs)
+        for old in stale_variants(path, variants):
+            old.unlink()
+    variants = {fmt: [(w, v) for w, v in items if v.exists()] for fmt, items in variants.items()}
+    return {"width": width, "height": height, "variants": {fmt: v for fmt, v in variants.items() if v},
+            "encoded": encoded, "missing": sum(map(len, missing.values())) if check else 0}
+
+
+def picture_html(img_tag: str, info: dict) -> str:
+    """<picture> (sources AVIF/WebP) autour de l'<img> d'origine, avec dimensions et lazy loading."""
+    attrs = dict(_ATTR_RE.findall(img_tag))
+    for name in ("width", "height", "loading", "decoding"):
+        attrs.pop(name, None)
+    img_attrs = {"src": attrs.pop("src"), "alt": attrs.pop("alt", ""),
+                 "width": str(info["width"]), "height": str(info["height"]),
+                 "loading": "lazy", "decoding": "async", **attrs}
+    img = "<img " + " ".join(f'{name}="{value}"' for name, value in img_attrs.items()) + ">"
+    sources = []
+    for fmt in FORMATS:
+        variants = info["variants"].get(fmt)
+        if variants:
+            srcset = ", ".join(f"{quote(variant.name)} {w}w" for w, variant in variants)
+            sources.append(f'<source type="{_MIME_TYPES[fmt]}" srcset="{srcset}" sizes="{SIZES}">')
+    if not sources:
+        return img
+    return f"<picture>{''.join(sources)}{img}</picture>"
+
+
+def figure_images(content: str) -> list:
+    """Noms de fichiers (décodés) des images de figures d'une page."""
+    names = []
+    for figure in _FIGURE_RE.finditer(content):
+        img = _IMG_RE.search(figure.group(2))
+        src = img and dict(_ATTR_RE.findall(img.group(0))).get("src")
+        if src and '/' not in src and not src.startswith('data:'):
+            names.append(unquote(html.unescape(src)))
+    return names
+
+
+def rewrite_figures(content: str, images: dict) -> tuple:
+    """Remplace l'image des figures par son <picture> ; renvoie (contenu, figures modifiées)."""
+    rewritten = 0
+
+    def replace_figure(match):
+        nonlocal rewritten
+        open_tag, inner, close_tag = match.groups()
+        element = _IMAGE_RE.search(inner)
+        img = element and _IMG_RE.search(element.group(0))
+        if not img:
+            return match.group(0)
+        src = dict(_ATTR_RE.findall(img.group(0))).get("src", "")
+        info = images.get(unquote(html.unescape(src)))
+        if not info:
+            return match.group(0)
+        picture = picture_html(img.group(0), info)
+        if picture == element.group(0):
+            return match.group(0)
+        rewritten += 1
+        return f"{open_tag}{inner[:element.start()]}{picture}{inner[element.end():]}{close_tag}"
+
+    return _FIGURE_RE.sub(replace_figure, content), rewritten
+
+
+def optimize_images(paths: list, workers: int = None, check: bool = False) -> dict:
+    """Variantes de plusieurs images en parallèle ; renvoie chemin -> infos (None si illisible)."""
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return dict(zip(paths, pool.map(lambda path: optimize_image(path, check), paths)))
+
+
+def process_content(content: str, writeup_dir: Path, workers: int = None, check: bool = False):
+    """Optimise les images d'une page et réécrit ses figures ; renvoie (contenu, {nom: infos})."""
+    paths = [writeup_dir / name for name in dict.fromkeys(figure_images(content))
+             if name.lower().endswith(IMAGE_EXTENSIONS) and (writeup_dir / name).is_file()]
+    results = optimize_images(paths, workers, check)
+    images = {path.name: info for path, info in results.items() if info}
+    content, _ = rewrite_figures(content, images)
+    return content, images
+
+
+def _report(path: Path, info: dict) -> str:
+    original = path.stat().st_size
+    parts = [f"{path.relative_to(PROJECT_ROOT)} {original / 1024:.0f}KB ({info['width']}x{info['height']})"]
+    for fmt, variants in info["variants"].items():
+        sizes = [variant.stat().st_size for _, variant in variants]
+        parts.append(f"{fmt} {min(sizes) / 1024:.0f}-{max(sizes) / 1024:.0f}KB")
+    return " -> ".join(parts[:1]) + (" -> " + ", ".join(parts[1:]) if parts[1:] else " (pas de variante)")
+
+
+def build(writeups: list = None, workers: int = None, check: bool = False) -> bool:
+    """Rattrapage des writeups existants ; en mode check, renvoie False si quelque chose manquait."""
+    encoder = update.get_encoder()
+    if not encoder.available():
+        print("[!] Ni Pillow ni ImageMagick: dimensions et lazy loading seulement, pas de variantes")
+    pages = [WRITEUPS_DIR / name / "index.html" for name in writeups] if writeups \
+        else sorted(WRITEUPS_DIR.glob("*/index.html"))
+
+    # Toutes les images de tous les writeups dans un seul pool
+    contents = {page: page.read_text(encoding='utf-8') for page in pages}
+    paths = [page.parent / name for page, content in contents.items()
+             for name in dict.fromkeys(figure_images(content))
+             if name.lower().endswith(IMAGE_EXTENSIONS) and (page.parent / name).is_file()]
+    results = optimize_images(paths, workers, check)
+
+    stale = 0
+    for path, info in results.items():
+        if info:
+            stale += info["missing"]
+            print(f"[{'+' if info['encoded'] else '*'}] {_report(path, info)}")
+    for page, content in contents.items():
+        images = {path.name: info for path, info in results.items() if info and path.parent == page.parent}
+        new_content, rewritten = rewrite_figures(content, images)
+        if not rewritten:
+            continue
+        stale += 1
+        print(f"[{'-' if check else '+'}] {page.relative_to(PROJECT_ROOT)}: {rewritten} figure(s) mise(s) a jour")
+        if not check:
+            page.write_text(new_content, encoding='utf-8')
+    encoded = sum(info["encoded"] for info in results.values() if info)
+    print(f"[*] {len(paths)} image(s), {encoded} variante(s) encodee(s)")
+    return not (check and stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Variantes AVIF/WebP et <picture> pour les images des writeups.")
+    parser.add_argument("writeups", nargs="*", help="dossiers de writeups/ à traiter (défaut: tous)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="conversions en parallèle")
+    parser.add_argument("--check", action="store_true", help="vérifie seulement (code 1 si quelque chose manque)")
+    args = parser.parse_args()
+    if not build(args.writeups, args.workers, args.check):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
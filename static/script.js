@@ -38,9 +38,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // Initial call to set position
     updateParallax();
 
-    // Dynamic Navbar Loading and Mobile Menu Initialization
-    const navbarPlaceholder = document.getElementById('navbar-placeholder');
-
+    // Mobile Menu Initialization (the navbar is inlined in every page at build time, see scripts/navbar.py)
     function initMobileMenu() {
         const mobileMenuToggle = document.getElementById('mobile-menu-toggle');
         const navLinks = document.getElementById('nav-links');
@@ -77,40 +75,5 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function highlightActiveLink() {
-        const path = window.location.pathname;
-        const links = document.querySelectorAll('.nav-link');
-        links.forEach(link => {
-            const href = link.getAttribute('href');
-            link.classList.remove('active');
-            if (href === '/' && (path === '/' || path === '/index.html' || path.endsWith('/'))) {
-                 // Exact match for home, handled carefully
-                 if (path === '/' || path === '/index.html') link.classList.add('active');
-            } else if (href !== '/' && path.includes(href)) {
-                link.classList.add('active');
-            }
-        });
-        
-        // Custom check: if we are in writeups (which we are if checking this script in that context)
-        // ensure writeups link is active if path contains 'writeups'
-        if (path.includes('/writeups/')) {
-            const writeupsLink = document.querySelector('.nav-link[href="/writeups/"]');
-            if (writeupsLink) writeupsLink.classList.add('active');
-        }
-    }
-
-    if (navbarPlaceholder) {
-        fetch('/writeups/navbar.html')
-            .then(response => response.text())
-            .then(html => {
-                navbarPlaceholder.innerHTML = html;
-                highlightActiveLink();
-                initMobileMenu();
-            })
-            .catch(err => console.error('Failed to load navbar:', err));
-    } else {
-        // If navbar is already there (static), just init
-        initMobileMenu();
-        // optionally highlight active link if not hardcoded, but static usually has it hardcoded.
-    }
+    initMobileMenu();
 });
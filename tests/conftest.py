@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Les scripts du site s'importent entre eux par leur nom (import fingerprint, ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
@@ -0,0 +1,63 @@
+import re
+import json
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import update
+
+GALLERY_JS = Path(__file__).resolve().parent.parent / "Portfolio" / "gallery.js"
+NAMES = ["photo.webp", "IMG_2024-01-01 (1).webp", "été à Paris.webp", "😀.webp", "a" * 300 + ".webp", ""]
+
+
+def test_gallery_alias_known_values():
+    # Valeurs de getAlias() relevées dans node
+    assert [update.gallery_alias(name) for name in NAMES] == [
+        "hwvutw32", "ji5ojy94", "i9kj6xsj", "adgfqtwv", "filw3e5w", "h0buh43q"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+def test_gallery_alias_matches_get_alias():
+    source = GALLERY_JS.read_text(encoding="utf-8")
+    get_alias = re.search(r'^function getAlias\(.*?^}', source, re.MULTILINE | re.DOTALL).group(0)
+    script = f"{get_alias}\nconsole.log(JSON.stringify({json.dumps(NAMES)}.map(getAlias)))"
+    result = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == [update.gallery_alias(name) for name in NAMES]
+
+
+def _riff(chunk: bytes, payload: bytes) -> bytes:
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+HEADERS = {
+    "png": (b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 1920, 1080) + b"\x08\x06\0\0\0", (1920, 1080)),
+    "gif": (b"GIF89a" + struct.pack("<HH", 320, 200) + b"\0" * 8, (320, 200)),
+    # APP0 puis DHT avant le SOF2 (progressif) qui porte les dimensions
+    "jpeg": (b"\xff\xd8" + b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+             + b"\xff\xc4" + struct.pack(">H", 2)
+             + b"\xff\xc2" + struct.pack(">HBHH", 17, 8, 600, 800) + b"\0" * 12, (800, 600)),
+    "webp-lossy": (_riff(b"VP8 ", b"\0\0\0\x9d\x01\x2a" + struct.pack("<HH", 1024, 768) + b"\0" * 4), (1024, 768)),
+    "webp-lossless": (_riff(b"VP8L", b"\x2f" + ((640 - 1) | (480 - 1) << 14).to_bytes(4, "little") + b"\0" * 8),
+                      (640, 480)),
+    "webp-extended": (_riff(b"VP8X", b"\0" * 4 + (5000 - 1).to_bytes(3, "little") + (3000 - 1).to_bytes(3, "little")),
+                      (5000, 3000)),
+}
+
+
+@pytest.mark.parametrize("kind", sorted(HEADERS))
+def test_read_dimensions(kind, tmp_path):
+    data, expected = HEADERS[kind]
+    path = tmp_path / f"image.{kind}"
+    path.write_bytes(data)
+    assert tuple(update.read_dimensions(str(path))) == expected
+
+
+@pytest.mark.parametrize("data", [b"", b"not an image", b"\xff\xd8\xff"])
+def test_read_dimensions_unknown(data, tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(data)
+    assert update.read_dimensions(str(path)) is None
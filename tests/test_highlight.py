@@ -0,0 +1,31 @@
+import pytest
+
+import highlight
+
+pytestmark = pytest.mark.skipif(not highlight.pygments_available(), reason="Pygments absent")
+
+
+def test_json_booleans_keys_and_null():
+    html = highlight.highlight_code('{"debug": true, "user": null}', "json")
+    assert '<span class="token property">"debug"</span>' in html
+    assert '<span class="token boolean">true</span>' in html
+    assert '<span class="token boolean">null</span>' in html
+    assert "token tag" not in html
+
+
+def test_non_json_in_json_block_is_plain_text():
+    # JsonLexer étiquette les lettres de true/false/null isolées en Keyword.Constant au milieu d'Error
+    code = 'GET /auth_status HTTP/1.1\nHost: <x>'
+    assert highlight.highlight_code(code, "json") == "GET /auth_status HTTP/1.1\nHost: &lt;x&gt;"
+
+
+def test_python_constants():
+    html = highlight.highlight_code("x = True if y is None else False\n", "python")
+    assert html.count('class="token boolean"') == 3
+
+
+def test_highlight_html_is_idempotent_and_recolors_stale_spans():
+    stale = '<pre class="code"><code class="language-json">{<span class="token tag">"a"</span>: 1}</code></pre>'
+    content, pending, count = highlight.highlight_html(stale, highlight=True)
+    assert '<span class="token property">"a"</span>' in content and not pending and count == 1
+    assert highlight.highlight_html(content, highlight=True) == (content, set(), 0)
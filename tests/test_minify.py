@@ -0,0 +1,62 @@
+import shutil
+import subprocess
+
+import pytest
+
+import minify
+
+
+def test_css_comments_blanks_and_last_semicolon():
+    css = "/* titre */\n.a ,\n.b > p {\n  color: red ;\n  margin: 0 auto;\n}\n"
+    assert minify.minify_css(css) == ".a,.b>p{color:red;margin:0 auto}\n"
+
+
+def test_css_space_before_colon_is_kept():
+    # "a :hover" (descendant) et "a:hover" ne sont pas le même sélecteur
+    assert minify.minify_css("a :hover, a:focus { color: red }") == "a :hover,a:focus{color:red}\n"
+
+
+def test_css_keeps_significant_spaces_and_strings():
+    css = 'a :hover { width: calc(100% - 2px) } p::before { content: "a  /* b */ ;" }'
+    assert minify.minify_css(css) == 'a :hover{width:calc(100% - 2px)}p::before{content:"a  /* b */ ;"}\n'
+
+
+@pytest.mark.parametrize("source,expected", [
+    # Le saut de ligne termine l'instruction: il doit rester
+    ("let a = b\n(c || d).run()", "let a=b\n(c||d).run()"),
+    ("function f() {\n  return\n  42\n}", "function f(){return\n42}"),
+    ("a\n++b", "a\n++b"),
+    ("x = 1\nlet y = 2", "x=1\nlet y=2"),
+    # ... mais pas là où l'expression continue forcément
+    ("call(\n  a,\n  b\n)\n.then(done)", "call(a,b).then(done)"),
+    ("const o = {\n  k: 1,\n}", "const o={k:1,}"),
+])
+def test_js_asi_newlines(source, expected):
+    assert minify.minify_js(source) == expected + "\n"
+
+
+def test_js_operators_regex_strings_and_templates():
+    source = ("a = b + +c - -d; // commentaire\n"
+              "r = /\\/*[a-z]+/g.test(s) / 2\n"
+              "s = '/* pas un commentaire */' + `// ${x} ok`")
+    assert minify.minify_js(source) == ("a=b+ +c- -d;r=/\\/*[a-z]+/g.test(s)/2\n"
+                                         "s='/* pas un commentaire */'+`// ${x} ok`\n")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+def test_js_same_result_in_node():
+    source = """
+    const out = []
+    let a = 1
+    let b = a
+    ++b
+    out.push(a, b)
+    const f = function () { return
+      'perdu' }
+    out.push(f())
+    const re = /[/]+/g
+    out.push('a//b'.replace(re, '-'), 10 / 2 / 5)
+    console.log(JSON.stringify(out))
+    """
+    run = lambda js: subprocess.run(["node", "-e", js], capture_output=True, text=True, check=True).stdout
+    assert run(minify.minify_js(source)) == run(source) == '[1,2,null,"a-b",1]\n'
@@ -0,0 +1,104 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import titles
+
+
+def feed_bytes(stream, data, size):
+    for i in range(0, len(data), size):
+        if stream.feed(data[i:i + size]):
+            break
+    return stream.close()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 4096])
+def test_title_split_across_chunks(size):
+    page = b"<html><head><meta charset=utf-8><TITLE>Hack &amp; <b>Learn</b> | Blog</TITLE></head>"
+    assert feed_bytes(titles.TitleStream("text/html"), page, size) == "Hack & Learn - Blog"
+
+
+def test_stops_after_title():
+    stream = titles.TitleStream()
+    assert stream.feed(b"<title>a</title>" + b" " * titles.SNIFF_BYTES) is True
+    assert stream.close() == "a"
+
+
+def test_body_without_title_stops_reading():
+    stream = titles.TitleStream()
+    assert stream.feed(b"<html><head></head><body>" + b"x" * titles.SNIFF_BYTES) is True
+    assert stream.close() is None
+
+
+def test_meta_charset_sniffed():
+    page = '<meta charset="iso-8859-1"><title>Café</title>'.encode('cp1252')
+    assert feed_bytes(titles.TitleStream("text/html"), page, 1) == "Café"
+
+
+def test_header_charset_wins_over_meta():
+    page = '<meta charset="utf-8"><title>Café</title>'.encode('cp1252')
+    assert feed_bytes(titles.TitleStream("text/html; charset=windows-1252"), page, 2) == "Café"
+
+
+def test_multibyte_character_split_between_chunks():
+    page = "<title>Déjà vu — ok</title>".encode('utf-8')
+    assert feed_bytes(titles.TitleStream("text/html; charset=utf-8"), page, 1) == "Déjà vu — ok"
+
+
+@pytest.mark.parametrize("prefix,content_type,expected", [
+    (b"\xef\xbb\xbf<title>", "", "utf-8-sig"),
+    (b"\xff\xfe<\x00", "", "utf-16"),
+    (b"", "text/html; charset=ISO-8859-1", "cp1252"),
+    (b"<meta http-equiv=Content-Type content='text/html; charset=Shift_JIS'>", "", "shift_jis"),
+    (b"<meta charset=bogus>", "", "utf-8"),
+    (b"<p>", "", "utf-8"),
+])
+def test_sniff_charset(prefix, content_type, expected):
+    assert titles.sniff_charset(prefix, content_type) == expected
+
+
+class DroppingHandler(BaseHTTPRequestHandler):
+    """Répond en keep-alive (HTTP/1.1, sans Connection: close) puis ferme quand même la connexion."""
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        DroppingHandler.connections.add(self.client_address)
+        body = f"<title>page {self.path}</title>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def dropping_server():
+    DroppingHandler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DroppingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_host_pool_reconnects_after_dropped_keep_alive(dropping_server, tmp_path, monkeypatch):
+    reused = []
+    run = titles.HostPool.run
+    monkeypatch.setattr(titles.HostPool, "run",
+                        lambda self, key, conn, was_reused, exchange:
+                        reused.append(was_reused) or run(self, key, conn, was_reused, exchange))
+    urls = [f"{dropping_server}/{i}" for i in range(3)]
+    cache = titles.TitleCache(tmp_path / "cache.json")
+    # Une seule requête à la fois: chaque URL reprend la connexion que le serveur vient de fermer
+    result, stats = titles.fetch_titles(urls, cache, jobs=1, per_host=1)
+    assert result == {url: f"page /{i}" for i, url in enumerate(urls)}
+    assert stats["failed"] == 0
+    assert reused == [False, True, True]
+    assert len(DroppingHandler.connections) == 3